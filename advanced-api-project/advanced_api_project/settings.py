@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 
+from api.database import sqlite_database
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -43,6 +45,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its total covers the rest of the stack.
+    'api.profiling.ProfilingMiddleware',
+    # Read replicas and read-your-writes (api.routers).
+    'api.routers.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -75,20 +81,108 @@ WSGI_APPLICATION = 'advanced_api_project.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# SQLite tuned for serving (api.database): mmap, persistent connections...
+# 'read' opens the same file read-only. Tests run on an in-memory database
+# either way. SQLITE_WAL switches the file to WAL journaling, which persists
+# in the file and adds -wal and -shm files next to it: turn it on where the
+# server runs, not in a checkout.
+SQLITE_WAL = False
+# Seconds a connection is reused for, when served through wsgi.py. Set it to
+# 0 when serving through asgi.py: Django asks for persistent connections to
+# be off under ASGI.
+SQLITE_CONN_MAX_AGE = 600
 DATABASES = {
+    'default': sqlite_database(
+        BASE_DIR / 'db.sqlite3', profile='production', conn_max_age=SQLITE_CONN_MAX_AGE, wal=SQLITE_WAL,
+    ),
+    'read': sqlite_database(
+        BASE_DIR / 'db.sqlite3', profile='production', read_only=True, conn_max_age=SQLITE_CONN_MAX_AGE,
+        wal=SQLITE_WAL,
+    ),
+}
+
+# Reads of safe requests go to one of DATABASE_REPLICAS, writes to
+# 'default' (api.routers). A client that wrote reads from 'default' for
+# DATABASE_REPLICA_STICKY_SECONDS, to outlast the replication lag. List
+# PostgreSQL replicas here in production, or e.g. ['read'] locally.
+DATABASE_ROUTERS = ['api.routers.ReplicaRouter']
+DATABASE_REPLICAS = []
+DATABASE_REPLICA_STICKY_SECONDS = 5
+# Clients sending an Authorization header are also pinned by an entry in
+# this cache, as API clients often drop the cookie: use a shared cache when
+# running several workers.
+DATABASE_REPLICA_STICKY_CACHE = 'default'
+
+# Cache for anonymous Book list responses (api.cache). Any backend works; a
+# shared one keeps the entries and their invalidation consistent across
+# workers, e.g.
+#   'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': '/var/tmp/books-cache'
+#   'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://127.0.0.1:6379'
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-        'NAME': ':memory:',  # Use in-memory database for testing
-    }
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'books': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'books',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+BOOK_LIST_CACHE = 'books'
+# Upper bound on staleness for writes that skip the invalidation (QuerySet.update()).
+BOOK_LIST_CACHE_TIMEOUT = 300
+
+# Share of requests profiled by api.profiling.ProfilingMiddleware (0 = off,
+# 1 = all). Profiled responses get a Server-Timing header and a JSON line on
+# the 'api.profiling' logger.
+API_PROFILING_SAMPLE_RATE = 0.01
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'api.profiling': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
 }
 
 REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend'
-    ]
+    ],
+    # Bulk endpoints report errors keyed by item position: {3: {'title': [...]}}.
+    'LIST_SERIALIZER_ERRORS_AS_DICT': True,
+    # JSON goes through orjson when it is installed, with the same output as
+    # DRF's JSONRenderer/JSONParser (see api.renderers and api.parsers).
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    # Rate limits per scope (see api.throttling): anonymous reads per client
+    # address, writes per user, and bulk requests (BookBulkView) per user.
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.throttling.AnonReadThrottle',
+        'api.throttling.UserWriteThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'anon_read': '600/min',
+        'user_write': '120/min',
+        'bulk': '30/min',
+    },
 }
 
+# Where api.throttling keeps its counters: None for this process only, or
+# the alias of a cache shared by the workers (memcached, Redis, a file
+# cache...) when running several of them.
+API_THROTTLE_STORE = None
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -0,0 +1,328 @@
+"""
+Async (ASGI-native) versions of DRF's APIView and generic views.
+
+DRF views are sync: under ASGI, Django runs each of them on its
+thread-sensitive executor, so every request in flight holds a worker
+thread, slow clients included. These classes keep DRF's serializers,
+parsers, renderers, filters and pagination, but dispatch as coroutines:
+
+- authentication awaits `aauthenticate(request)` when the authenticator
+  has one, reads the session user with `request.auser()` for
+  SessionAuthentication, and runs any other authenticator with
+  sync_to_async
+- permissions are awaited the same way (`ahas_permission()` /
+  `ahas_object_permission()`). DRF's request-only permissions (AllowAny,
+  IsAuthenticated...) run inline
+- rows are read and written with the async ORM (aiterator, aget, acreate,
+  asave, adelete). Serializer validation, which may query related rows, and
+  the filter backends run through sync_to_async
+- responses are rendered in the event loop. Only non-HTML renderers are
+  offered, since the browsable API renders its forms with sync queries
+
+Django's async ORM still runs every query on its sync thread, so queries
+get no faster. What changes is that a request waiting on the network costs
+a coroutine instead of a thread.
+"""
+import inspect
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.http import Http404, HttpResponse
+from rest_framework import exceptions, generics, mixins, permissions, serializers, status
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils import model_meta
+from rest_framework.views import APIView
+
+from .profiling import measure
+
+# Permissions that only read request.user and the method: no query, so they
+# run in the event loop.
+INLINE_PERMISSIONS = (
+    permissions.AllowAny, permissions.IsAuthenticated, permissions.IsAdminUser,
+    permissions.IsAuthenticatedOrReadOnly,
+)
+
+
+async def aauthenticate(authenticator, request):
+    if hasattr(authenticator, 'aauthenticate'):
+        return await authenticator.aauthenticate(request)
+    if type(authenticator) is SessionAuthentication and hasattr(request._request, 'auser'):
+        # SessionAuthentication.authenticate(), with the user loaded by the async ORM.
+        user = await request._request.auser()
+        if not user or not user.is_active:
+            return None
+        authenticator.enforce_csrf(request)
+        return (user, None)
+    return await sync_to_async(authenticator.authenticate)(request)
+
+
+async def ahas_permission(permission, request, view):
+    if hasattr(permission, 'ahas_permission'):
+        return await permission.ahas_permission(request, view)
+    if type(permission) in INLINE_PERMISSIONS:
+        return permission.has_permission(request, view)
+    return await sync_to_async(permission.has_permission)(request, view)
+
+
+async def ahas_object_permission(permission, request, view, obj):
+    if hasattr(permission, 'ahas_object_permission'):
+        return await permission.ahas_object_permission(request, view, obj)
+    if type(permission) in INLINE_PERMISSIONS:
+        return permission.has_object_permission(request, view, obj)
+    return await sync_to_async(permission.has_object_permission)(request, view, obj)
+
+
+def saves_plainly(serializer, method):
+    """
+    Whether serializer.create() / update() (`method`) is ModelSerializer's,
+    on data without many-to-many values, so the async ORM can do the same
+    write.
+    """
+    if getattr(type(serializer), method) is not getattr(serializers.ModelSerializer, method):
+        return False
+    relations = model_meta.get_field_info(serializer.Meta.model).relations
+    return not any(
+        name in relations and relations[name].to_many for name in serializer.validated_data
+    )
+
+
+class AsyncAPIView(APIView):
+    """APIView whose handlers (get, post...) are coroutines."""
+    renderer_classes = [
+        renderer for renderer in api_settings.DEFAULT_RENDERER_CLASSES
+        if not issubclass(renderer, BrowsableAPIRenderer)
+    ]
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.ainitial(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            response = handler(request, *args, **kwargs)
+            if inspect.isawaitable(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.render_response(self.response)
+
+    async def ainitial(self, request, *args, **kwargs):
+        """APIView.initial(), awaiting authentication, permissions and throttles."""
+        self.format_kwarg = self.get_format_suffix(**kwargs)
+        request.accepted_renderer, request.accepted_media_type = self.perform_content_negotiation(request)
+        request.version, request.versioning_scheme = self.determine_version(request, *args, **kwargs)
+        await self.aperform_authentication(request)
+        await self.acheck_permissions(request)
+        await self.acheck_throttles(request)
+
+    async def aperform_authentication(self, request):
+        # Request._authenticate(), setting the same attributes.
+        for authenticator in request.authenticators:
+            try:
+                user_auth_tuple = await aauthenticate(authenticator, request)
+            except exceptions.APIException:
+                request._not_authenticated()
+                raise
+            if user_auth_tuple is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = user_auth_tuple
+                return
+        request._not_authenticated()
+
+    async def acheck_permissions(self, request):
+        for permission in self.get_permissions():
+            if not await ahas_permission(permission, request, self):
+                self.permission_denied(
+                    request,
+                    message=getattr(permission, 'message', None),
+                    code=getattr(permission, 'code', None),
+                )
+
+    async def acheck_object_permissions(self, request, obj):
+        for permission in self.get_permissions():
+            if not await ahas_object_permission(permission, request, self, obj):
+                self.permission_denied(
+                    request,
+                    message=getattr(permission, 'message', None),
+                    code=getattr(permission, 'code', None),
+                )
+
+    async def acheck_throttles(self, request):
+        # APIView.check_throttles(), awaiting `aallow_request()` when the
+        # throttle has one: DRF's throttles use the cache synchronously.
+        durations = []
+        for throttle in self.get_throttles():
+            if hasattr(throttle, 'aallow_request'):
+                allowed = await throttle.aallow_request(request, self)
+            else:
+                allowed = await sync_to_async(throttle.allow_request)(request, self)
+            if not allowed:
+                durations.append(throttle.wait())
+        if durations:
+            self.throttled(request, max((duration for duration in durations if duration is not None), default=None))
+
+    def options(self, request, *args, **kwargs):
+        # The metadata class checks permissions and may load the object,
+        # synchronously: it gets its own thread.
+        return sync_to_async(super().options)(request, *args, **kwargs)
+
+    def render_response(self, response):
+        """
+        Renders a DRF Response here, in the event loop: Django would render it
+        on its sync thread. `data` stays available to tests.
+        """
+        if not isinstance(response, Response):
+            return response
+        with measure('render'):
+            response.render()
+        rendered = HttpResponse(response.content, status=response.status_code, headers=response.headers)
+        rendered.cookies = response.cookies
+        rendered.data = response.data
+        return rendered
+
+
+class AsyncGenericAPIView(AsyncAPIView, generics.GenericAPIView):
+    """GenericAPIView with async counterparts of its data access methods."""
+    # Rows fetched per query when a list is read without pagination.
+    list_chunk_size = 2000
+
+    async def afilter_queryset(self, queryset):
+        if not self.filter_backends:
+            return self.filter_queryset(queryset)
+        # Filter backends are sync, and may query (django-filter validates
+        # model choices against the database).
+        return await sync_to_async(self.filter_queryset)(queryset)
+
+    async def aget_object(self):
+        queryset = await self.afilter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        filter_kwargs = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        # Same 404s as rest_framework.generics.get_object_or_404().
+        try:
+            obj = await queryset.aget(**filter_kwargs)
+        except queryset.model.DoesNotExist:
+            raise Http404(f'No {queryset.model._meta.object_name} matches the given query.')
+        except (TypeError, ValueError, ValidationError):
+            raise Http404
+        await self.acheck_object_permissions(self.request, obj)
+        return obj
+
+    def get_list_queryset(self, queryset):
+        """The queryset list rows are read from (e.g. values() rows, see FastListViewMixin)."""
+        return queryset
+
+    async def apaginate_queryset(self, queryset):
+        if self.paginator is None:
+            return None
+        if hasattr(self.paginator, 'apaginate_queryset'):
+            return await self.paginator.apaginate_queryset(queryset, self.request, view=self)
+        return await sync_to_async(self.paginator.paginate_queryset)(queryset, self.request, view=self)
+
+
+class AsyncListModelMixin(mixins.ListModelMixin):
+    async def list(self, request, *args, **kwargs):
+        queryset = self.get_list_queryset(await self.afilter_queryset(self.get_queryset()))
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        rows = [row async for row in queryset.aiterator(chunk_size=self.list_chunk_size)]
+        return Response(self.get_serializer(rows, many=True).data)
+
+
+class AsyncCreateModelMixin(mixins.CreateModelMixin):
+    async def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+        await self.aperform_create(serializer)
+        headers = self.get_success_headers(serializer.data)
+        return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
+
+    async def aperform_create(self, serializer):
+        if not saves_plainly(serializer, 'create'):
+            await sync_to_async(serializer.save)()
+            return
+        model = serializer.Meta.model
+        serializer.instance = await model._default_manager.acreate(**serializer.validated_data)
+
+
+class AsyncRetrieveModelMixin(mixins.RetrieveModelMixin):
+    async def retrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        return Response(self.get_serializer(instance).data)
+
+
+class AsyncUpdateModelMixin(mixins.UpdateModelMixin):
+    async def update(self, request, *args, **kwargs):
+        partial = kwargs.pop('partial', False)
+        instance = await self.aget_object()
+        serializer = self.get_serializer(instance, data=request.data, partial=partial)
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+        await self.aperform_update(serializer)
+        if getattr(instance, '_prefetched_objects_cache', None):
+            instance._prefetched_objects_cache = {}
+        return Response(serializer.data)
+
+    async def partial_update(self, request, *args, **kwargs):
+        kwargs['partial'] = True
+        return await self.update(request, *args, **kwargs)
+
+    async def aperform_update(self, serializer):
+        if not saves_plainly(serializer, 'update'):
+            await sync_to_async(serializer.save)()
+            return
+        instance = serializer.instance
+        for attr, value in serializer.validated_data.items():
+            setattr(instance, attr, value)
+        await instance.asave()
+
+
+class AsyncDestroyModelMixin(mixins.DestroyModelMixin):
+    async def destroy(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        await self.aperform_destroy(instance)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    async def aperform_destroy(self, instance):
+        await instance.adelete()
+
+
+class AsyncListAPIView(AsyncListModelMixin, AsyncGenericAPIView):
+    async def get(self, request, *args, **kwargs):
+        return await self.list(request, *args, **kwargs)
+
+
+class AsyncListCreateAPIView(AsyncListModelMixin, AsyncCreateModelMixin, AsyncGenericAPIView):
+    async def get(self, request, *args, **kwargs):
+        return await self.list(request, *args, **kwargs)
+
+    async def post(self, request, *args, **kwargs):
+        return await self.create(request, *args, **kwargs)
+
+
+class AsyncRetrieveUpdateDestroyAPIView(
+    AsyncRetrieveModelMixin, AsyncUpdateModelMixin, AsyncDestroyModelMixin, AsyncGenericAPIView,
+):
+    async def get(self, request, *args, **kwargs):
+        return await self.retrieve(request, *args, **kwargs)
+
+    async def put(self, request, *args, **kwargs):
+        return await self.update(request, *args, **kwargs)
+
+    async def patch(self, request, *args, **kwargs):
+        return await self.partial_update(request, *args, **kwargs)
+
+    async def delete(self, request, *args, **kwargs):
+        return await self.destroy(request, *args, **kwargs)
@@ -0,0 +1,118 @@
+"""
+Response cache for the public Book list (see ListCacheMixin).
+
+Entries are tagged, and every tag has a generation counter in the cache:
+- 'books': every list response depends on it unless it is filtered by
+  author or publication year
+- 'author:<id>': lists filtered with '?author=<id>'
+- 'year:<year>': lists filtered with '?publication_year=<year>'
+
+An entry is only served while the generation it was stored under is still
+current, so invalidating means incrementing the counters of the tags a write
+touched (`invalidate()`): nothing is deleted or flushed, stale entries are
+simply never read again and expire with their timeout.
+
+The cache alias is settings.BOOK_LIST_CACHE, so the backend (locmem, file,
+Redis...) is chosen in settings.CACHES.
+"""
+import hashlib
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+TAG_ALL = 'books'
+
+# Hits, misses and invalidations of this process.
+stats = Counter()
+
+
+def get_cache():
+    return caches[getattr(settings, 'BOOK_LIST_CACHE', 'default')]
+
+
+def book_tags(author_id, publication_year):
+    """Tags of the list responses a book with these values can appear in."""
+    return {TAG_ALL, f'author:{author_id}', f'year:{publication_year}'}
+
+
+def author_tags(author_id, publication_years=()):
+    """
+    Tags of the list responses that can show this author (expanded or
+    searched): besides its own, the years of its books, whose lists embed
+    the author through '?expand=author' or match it in '?search='.
+    """
+    return {TAG_ALL, f'author:{author_id}', *(f'year:{year}' for year in publication_years)}
+
+
+def generation_key(tag):
+    return f'books:generation:{tag}'
+
+
+def entry_key(tag, params):
+    digest = hashlib.md5(repr(params).encode()).hexdigest()
+    return f'books:list:{tag}:{digest}'
+
+
+def invalidate(tags):
+    """Moves the given tags to a new generation, retiring their entries."""
+    cache = get_cache()
+    for tag in tags:
+        key = generation_key(tag)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # The counter was never set or got evicted: start somewhere no
+            # entry can have been stored under.
+            cache.set(key, time.time_ns(), None)
+    stats['invalidations'] += len(tags)
+
+
+def invalidate_write(tags):
+    """
+    invalidate() for a database write: once now, and once more when the
+    transaction commits, so a response cached from the old rows in between is
+    retired as well.
+    """
+    invalidate(tags)
+    transaction.on_commit(lambda: invalidate(tags))
+
+
+def lookup(tag, key):
+    """
+    Returns (entry, generation): the cached entry, or None on a miss, and the
+    current generation of `tag`, which a new entry must be stored with.
+    """
+    cache = get_cache()
+    values = cache.get_many([generation_key(tag), key])
+    generation = values.get(generation_key(tag))
+    if generation is None:
+        cache.add(generation_key(tag), time.time_ns(), None)
+        generation = cache.get(generation_key(tag))
+    entry = values.get(key)
+    if entry is not None and entry['generation'] == generation:
+        stats['hits'] += 1
+        return entry, generation
+    stats['misses'] += 1
+    return None, generation
+
+
+def store(key, generation, content, content_type, headers):
+    get_cache().set(key, {
+        'generation': generation,
+        'content': content,
+        'content_type': content_type,
+        'headers': headers,
+    }, getattr(settings, 'BOOK_LIST_CACHE_TIMEOUT', 300))
+
+
+def get_stats():
+    lookups = stats['hits'] + stats['misses']
+    return {
+        'hits': stats['hits'],
+        'misses': stats['misses'],
+        'hit_rate': stats['hits'] / lookups if lookups else None,
+        'invalidations': stats['invalidations'],
+    }
@@ -0,0 +1,75 @@
+"""
+SQLite connection profiles for settings.DATABASES.
+
+sqlite_database() builds a DATABASES entry for a SQLite file, with the
+PRAGMAs of a profile applied to every new connection (apply_pragmas(),
+connected to connection_created in ApiConfig.ready()):
+
+- 'default': SQLite's own settings (rollback journal, synchronous=FULL)
+- 'production': the file memory-mapped and a larger page cache;
+  busy_timeout so a writer waits for the lock instead of failing with
+  "database is locked"; and temporary tables and indexes kept in memory
+
+`wal=True` (settings.SQLITE_WAL) adds WAL journaling, so readers no longer
+block the writer nor each other, with synchronous=NORMAL: one fsync per
+checkpoint instead of per commit (a power loss may undo the last commits,
+never corrupt the file). It is opt-in because it is a property of the file
+itself, not of the connection: every connection, `manage.py` commands
+included, would convert the database and leave -wal and -shm files next
+to it.
+
+`conn_max_age` (CONN_MAX_AGE, with health checks) keeps connections open
+across requests, so the PRAGMAs and the page cache are not rebuilt on every
+request. It defaults to 0, Django's own default, because persistent
+connections only pay off under WSGI, where a worker thread reuses its
+connection. Under ASGI, Django's documentation asks for them to be turned
+off. `read_only=True` opens the same file read-only, for a separate
+alias safe requests can read from (a replica, see api.routers). Under
+tests it mirrors 'default'.
+"""
+PROFILES = {
+    'default': {},
+    'production': {
+        'mmap_size': 256 * 1024 * 1024,
+        # Negative: in KiB, i.e. 64 MiB.
+        'cache_size': -64 * 1024,
+        'busy_timeout': 5000,
+        'temp_store': 'MEMORY',
+    },
+}
+
+WAL_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+}
+
+# PRAGMAs that change the database file: the read-write connections set them.
+FILE_PRAGMAS = {'journal_mode'}
+
+
+def sqlite_database(name, profile='production', read_only=False, conn_max_age=0, wal=False):
+    pragmas = dict(PROFILES[profile])
+    if wal:
+        pragmas.update(WAL_PRAGMAS)
+    database = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': name,
+        'CONN_MAX_AGE': conn_max_age,
+        'CONN_HEALTH_CHECKS': conn_max_age != 0,
+        'PRAGMAS': pragmas,
+    }
+    if read_only:
+        for pragma in FILE_PRAGMAS:
+            pragmas.pop(pragma, None)
+        database['NAME'] = f'file:{name}?mode=ro'
+        database['TEST'] = {'MIRROR': 'default'}
+    return database
+
+
+def apply_pragmas(sender, connection, **kwargs):
+    """connection_created receiver: runs the PRAGMAs of the connection's profile."""
+    if connection.vendor != 'sqlite':
+        return
+    # On the raw connection, so that they are not logged as queries.
+    for pragma, value in connection.settings_dict.get('PRAGMAS', {}).items():
+        connection.connection.execute(f'PRAGMA {pragma} = {value}')
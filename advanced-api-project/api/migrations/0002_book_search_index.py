@@ -0,0 +1,16 @@
+# Full-text index for the Book search; see _search_index.py for the SQL.
+
+from django.db import migrations
+
+from ._search_index import create_search_index, drop_search_index
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:08
+
+from django.db import migrations, models
+
+from ._search_index import drop_search_triggers, restore_search_index
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_book_search_index'),
+    ]
+
+    operations = [
+        # SQLite adds these columns by rebuilding the tables, which does not
+        # work with the search index triggers in place.
+        migrations.RunPython(drop_search_triggers, restore_search_index),
+        migrations.AddField(
+            model_name='author',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.RunPython(restore_search_index, drop_search_triggers),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_book_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookSearchIndex',
+            fields=[
+                ('book', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='api.book')),
+            ],
+            options={
+                'db_table': 'api_book_fts',
+                'managed': False,
+            },
+        ),
+    ]
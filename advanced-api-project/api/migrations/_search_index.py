@@ -0,0 +1,179 @@
+"""
+SQL for the full-text index behind api.search.FullTextSearchFilter.
+
+The index lives in its own table (api_book_fts), one row per book with its
+title and its author's name, and is maintained by triggers on api_book and
+api_author. Triggers also cover writes that skip model signals, such as
+bulk_create(), QuerySet.update() and cascading deletes.
+
+Only SQLite (FTS5) and PostgreSQL (tsvector + GIN) get an index; on other
+databases, or on an SQLite build without FTS5, nothing is created and the
+search falls back to icontains lookups.
+
+SQLite implements many ALTER TABLE operations by rebuilding the table, which
+trips over (and then loses) the triggers, so migrations that rebuild api_book
+or api_author must run drop_search_triggers() before the schema change and
+restore_search_index() after it. The module name starts with an underscore so
+the migration loader does not treat it as a migration.
+"""
+from django.db import OperationalError
+
+
+SQLITE_TABLE = """
+    CREATE VIRTUAL TABLE api_book_fts USING fts5(
+        title, author_name, tokenize = 'unicode61 remove_diacritics 2'
+    )
+"""
+
+SQLITE_POPULATE = [
+    'DELETE FROM api_book_fts',
+    """
+    INSERT INTO api_book_fts (rowid, title, author_name)
+    SELECT api_book.id, api_book.title, api_author.name
+    FROM api_book JOIN api_author ON api_author.id = api_book.author_id
+    """,
+]
+
+SQLITE_TRIGGERS = [
+    """
+    CREATE TRIGGER api_book_fts_insert AFTER INSERT ON api_book BEGIN
+        INSERT INTO api_book_fts (rowid, title, author_name)
+        VALUES (new.id, new.title, (SELECT name FROM api_author WHERE id = new.author_id));
+    END
+    """,
+    """
+    CREATE TRIGGER api_book_fts_update AFTER UPDATE OF title, author_id ON api_book BEGIN
+        DELETE FROM api_book_fts WHERE rowid = old.id;
+        INSERT INTO api_book_fts (rowid, title, author_name)
+        VALUES (new.id, new.title, (SELECT name FROM api_author WHERE id = new.author_id));
+    END
+    """,
+    """
+    CREATE TRIGGER api_book_fts_delete AFTER DELETE ON api_book BEGIN
+        DELETE FROM api_book_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER api_author_fts_update AFTER UPDATE OF name ON api_author BEGIN
+        UPDATE api_book_fts SET author_name = new.name
+        WHERE rowid IN (SELECT id FROM api_book WHERE author_id = new.id);
+    END
+    """,
+]
+
+SQLITE_DROP_TRIGGERS = [
+    'DROP TRIGGER IF EXISTS api_author_fts_update',
+    'DROP TRIGGER IF EXISTS api_book_fts_delete',
+    'DROP TRIGGER IF EXISTS api_book_fts_update',
+    'DROP TRIGGER IF EXISTS api_book_fts_insert',
+]
+
+POSTGRESQL_TABLE = [
+    """
+    CREATE TABLE api_book_fts (
+        rowid bigint PRIMARY KEY REFERENCES api_book (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,
+        document tsvector NOT NULL
+    )
+    """,
+    'CREATE INDEX api_book_fts_document ON api_book_fts USING GIN (document)',
+    # Title words weigh more than author words in ts_rank().
+    """
+    CREATE FUNCTION api_book_fts_document(book_title text, book_author_id bigint) RETURNS tsvector AS $$
+        SELECT setweight(to_tsvector('simple', coalesce(book_title, '')), 'A')
+            || setweight(to_tsvector('simple', coalesce(
+                (SELECT name FROM api_author WHERE id = book_author_id), '')), 'B')
+    $$ LANGUAGE sql STABLE
+    """,
+    """
+    INSERT INTO api_book_fts (rowid, document)
+    SELECT id, api_book_fts_document(title, author_id) FROM api_book
+    """,
+]
+
+POSTGRESQL_TRIGGERS = [
+    """
+    CREATE FUNCTION api_book_fts_sync() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO api_book_fts (rowid, document)
+        VALUES (NEW.id, api_book_fts_document(NEW.title, NEW.author_id))
+        ON CONFLICT (rowid) DO UPDATE SET document = EXCLUDED.document;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER api_book_fts_sync AFTER INSERT OR UPDATE OF title, author_id ON api_book
+    FOR EACH ROW EXECUTE FUNCTION api_book_fts_sync()
+    """,
+    """
+    CREATE FUNCTION api_author_fts_sync() RETURNS trigger AS $$
+    BEGIN
+        UPDATE api_book_fts SET document = api_book_fts_document(api_book.title, api_book.author_id)
+        FROM api_book WHERE api_book.id = api_book_fts.rowid AND api_book.author_id = NEW.id;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER api_author_fts_sync AFTER UPDATE OF name ON api_author
+    FOR EACH ROW EXECUTE FUNCTION api_author_fts_sync()
+    """,
+]
+
+POSTGRESQL_DROP = [
+    'DROP TRIGGER IF EXISTS api_author_fts_sync ON api_author',
+    'DROP TRIGGER IF EXISTS api_book_fts_sync ON api_book',
+    'DROP FUNCTION IF EXISTS api_author_fts_sync()',
+    'DROP FUNCTION IF EXISTS api_book_fts_sync()',
+    'DROP TABLE IF EXISTS api_book_fts',
+    'DROP FUNCTION IF EXISTS api_book_fts_document(text, bigint)',
+]
+
+
+def execute(schema_editor, statements):
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def sqlite_index_exists(schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        return 'api_book_fts' in connection.introspection.table_names(cursor)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        try:
+            schema_editor.execute(SQLITE_TABLE)
+        except OperationalError:
+            # SQLite was built without FTS5: keep the icontains search.
+            return
+        execute(schema_editor, SQLITE_POPULATE + SQLITE_TRIGGERS)
+    elif vendor == 'postgresql':
+        execute(schema_editor, POSTGRESQL_TABLE + POSTGRESQL_TRIGGERS)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        execute(schema_editor, SQLITE_DROP_TRIGGERS + ['DROP TABLE IF EXISTS api_book_fts'])
+    elif vendor == 'postgresql':
+        execute(schema_editor, POSTGRESQL_DROP)
+
+
+def drop_search_triggers(apps, schema_editor):
+    """Drops the SQLite triggers ahead of a migration that rebuilds api_book or api_author."""
+    if schema_editor.connection.vendor == 'sqlite':
+        execute(schema_editor, SQLITE_DROP_TRIGGERS)
+
+
+def restore_search_index(apps, schema_editor):
+    """
+    Recreates the SQLite triggers (and resyncs the index) after a migration
+    rebuilt api_book or api_author. PostgreSQL alters tables in place, so
+    there is nothing to do there.
+    """
+    if schema_editor.connection.vendor != 'sqlite' or not sqlite_index_exists(schema_editor):
+        return
+    execute(schema_editor, SQLITE_DROP_TRIGGERS + SQLITE_POPULATE + SQLITE_TRIGGERS)
@@ -0,0 +1,398 @@
+import hashlib
+
+from django.core.exceptions import ValidationError
+from django.db import router, transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from . import cache, fastpath
+from .renderers import StreamingRenderer
+
+
+class ExpandableFieldsViewMixin:
+    """
+    View side of ExpandableFieldsMixin.
+
+    Reads '?expand=author,books' once per request, hands it to the serializer
+    and adds the matching select_related/prefetch_related to the queryset, so
+    a list costs the same number of queries whatever its size.
+    Expansion only applies to reads: writes keep accepting related IDs.
+    """
+    expand_query_param = 'expand'
+
+    def get_expand(self):
+        if self.request is None or self.request.method not in SAFE_METHODS:
+            return []
+        value = self.request.query_params.get(self.expand_query_param, '')
+        requested = [name.strip() for name in value.split(',') if name.strip()]
+        return self.get_serializer_class().get_valid_expand(requested)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        return self.get_serializer_class().optimize_queryset(queryset, self.get_expand())
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('expand', self.get_expand())
+        return super().get_serializer(*args, **kwargs)
+
+
+class SparseFieldsViewMixin:
+    """
+    View side of SparseFieldsMixin.
+
+    Reads '?fields=id,title' once per request, narrows the serializer and
+    pushes the same narrowing down to SQL with QuerySet.only(), so columns
+    nobody asked for are never fetched. Columns the view itself needs (the
+    primary key, the ordering used by pagination, relations being expanded)
+    are always loaded. Like '?expand=', this only applies to reads.
+    """
+    fields_query_param = 'fields'
+
+    def get_fields(self):
+        if self.request is None or self.request.method not in SAFE_METHODS:
+            return None
+        value = self.request.query_params.get(self.fields_query_param, '')
+        requested = [name.strip() for name in value.split(',') if name.strip()]
+        return self.get_serializer_class().get_valid_fields(requested) or None
+
+    def get_expand(self):
+        # Expanding a field that was not asked for would only cost a join.
+        expand = super().get_expand()
+        fields = self.get_fields()
+        if fields is None:
+            return expand
+        return [field_name for field_name in expand if field_name in fields]
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fields = self.get_fields()
+        if fields is None:
+            return queryset
+        columns = self.get_serializer_class().get_only_fields(fields)
+        for key in queryset.query.order_by:
+            name = key.lstrip('-') if isinstance(key, str) else None
+            # Annotations (e.g. search_rank) and related fields are not columns.
+            if name and '__' not in name and name not in queryset.query.annotations:
+                columns.add(name)
+        return queryset.only(*columns)
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('fields', self.get_fields())
+        return super().get_serializer(*args, **kwargs)
+
+
+class FastListViewMixin:
+    """
+    View side of the serializer fast path (api.fastpath).
+
+    When the list serializer has a compiled plan for the requested fields,
+    pages are read as QuerySet.values() rows instead of model instances,
+    and the serializer builds the representation straight from them.
+    Filters, search, ordering and pagination apply to the queryset as
+    usual. Otherwise the page holds model instances, as before. Async list
+    views (api.async_views) read their rows through get_list_queryset() too.
+    """
+    def get_fast_plan(self):
+        if self.request is None or self.request.method not in SAFE_METHODS:
+            return None
+        return fastpath.get_plan(self.get_serializer())
+
+    def get_list_columns(self):
+        """Columns the view itself reads from the rows, on top of the serializer's."""
+        return []
+
+    def get_list_queryset(self, queryset):
+        plan = self.get_fast_plan()
+        if plan is not None:
+            queryset = plan.values(queryset, self.get_list_columns())
+        return queryset
+
+    def paginate_queryset(self, queryset):
+        return super().paginate_queryset(self.get_list_queryset(queryset))
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = 'The resource has changed since it was last fetched.'
+    default_code = 'precondition_failed'
+
+
+class ConditionalRequestMixin:
+    """
+    ETag and Last-Modified support driven by a per-row version column.
+
+    - Detail: the version is the row's `version_field`; list: the primary
+      key and `version_field` of every row of the page being served, and
+      its links. The version is read from the rows the page query already
+      fetched, so it costs no query of its own. Either way nothing is
+      serialized before the 'If-None-Match' / 'If-Modified-Since' checks,
+      which answer 304.
+    - Expanded relations listed in `version_related_fields` add their own
+      version, so '?expand=author' changes when the author does.
+    - PUT/PATCH/DELETE honour 'If-Match' / 'If-Unmodified-Since' and answer
+      412 when the row has moved on (optimistic concurrency). If-Match takes
+      the ETag of the plain representation (no query parameters).
+
+    The version only moves when the row is saved through the model (auto_now),
+    so code that writes with QuerySet.update() or bulk_update() must set
+    `version_field` itself.
+    """
+    version_field = 'updated_at'
+    version_related_fields = {}
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        loaded, deferred = queryset.query.deferred_loading
+        if loaded and not deferred and self.version_field not in loaded:
+            # '?fields=' narrowed the columns, but the version is always needed.
+            queryset = queryset.only(*loaded, self.version_field)
+        return queryset
+
+    def get_version_lookups(self):
+        """Lookups whose newest value versions the response (own row first)."""
+        lookups = [self.version_field]
+        expand = self.get_expand() if hasattr(self, 'get_expand') else []
+        lookups.extend(
+            lookup for field_name, lookup in self.version_related_fields.items() if field_name in expand
+        )
+        return lookups
+
+    def get_list_columns(self):
+        # values() rows (api.fastpath) carry the version even when the
+        # representation does not.
+        return [*super().get_list_columns(), *self.get_version_lookups()]
+
+    def get_row_version(self, row):
+        """[pk, *versions] of a model instance or a values() row."""
+        if isinstance(row, dict):
+            return [row[self.queryset.model._meta.pk.name], *(row[lookup] for lookup in self.get_version_lookups())]
+        values = [row.pk]
+        for lookup in self.get_version_lookups():
+            value = row
+            for attname in lookup.split('__'):
+                value = getattr(value, attname, None)
+            values.append(value)
+        return values
+
+    def get_object_version(self, instance):
+        version = self.get_row_version(instance)
+        return version, [value for value in version[1:] if value is not None]
+
+    def get_list_version(self, rows, paginated=False):
+        version = [self.get_row_version(row) for row in rows]
+        timestamps = [value for row in version for value in row[1:] if value is not None]
+        if paginated:
+            # The links depend on the rows around the page, too.
+            version.append([self.paginator.get_next_link(), self.paginator.get_previous_link()])
+        return version, timestamps
+
+    def get_etag(self, version):
+        # The representation depends on the renderer and, for reads, on the
+        # query parameters ('?fields=', '?expand=', the page...).
+        request = self.request
+        params = []
+        if request.method in SAFE_METHODS:
+            params = sorted(
+                (key, value) for key, value in request.query_params.lists()
+                if key != api_settings.URL_FORMAT_OVERRIDE
+            )
+        renderer = getattr(request, 'accepted_renderer', None)
+        key = repr((version, params, renderer.format if renderer else None))
+        return '"{}"'.format(hashlib.md5(key.encode()).hexdigest())
+
+    def get_conditional_response(self, version, timestamps):
+        """
+        Checks the request preconditions. Returns a 304 response, raises
+        PreconditionFailed, or returns None when the request should proceed.
+        """
+        etag = self.get_etag(version)
+        last_modified = self.get_last_modified(timestamps)
+        response = get_conditional_response(self.request, etag=etag, last_modified=last_modified)
+        if response is None:
+            return None
+        if response.status_code == status.HTTP_412_PRECONDITION_FAILED:
+            raise PreconditionFailed()
+        return self.set_conditional_headers(response, version, timestamps)
+
+    def get_last_modified(self, timestamps):
+        return int(max(timestamps).timestamp()) if timestamps else None
+
+    def set_conditional_headers(self, response, version, timestamps):
+        response['ETag'] = self.get_etag(version)
+        last_modified = self.get_last_modified(timestamps)
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def has_preconditions(self):
+        meta = self.request.META
+        return 'HTTP_IF_MATCH' in meta or 'HTTP_IF_UNMODIFIED_SINCE' in meta
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method not in SAFE_METHODS and self.has_preconditions():
+            # Lock the row between the precondition check and the write.
+            queryset = queryset.select_for_update()
+        return queryset
+
+    def get_object(self):
+        instance = super().get_object()
+        if self.request.method not in SAFE_METHODS:
+            self.get_conditional_response(*self.get_object_version(instance))
+        return instance
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        version = self.get_object_version(instance)
+        response = self.get_conditional_response(*version)
+        if response is None:
+            response = Response(self.get_serializer(instance).data)
+        return self.set_conditional_headers(response, *version)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        rows = list(queryset) if page is None else page
+        version = self.get_list_version(rows, paginated=page is not None)
+        response = self.get_conditional_response(*version)
+        if response is None:
+            if page is not None:
+                response = self.get_paginated_response(self.get_serializer(page, many=True).data)
+            else:
+                response = Response(self.get_serializer(rows, many=True).data)
+        return self.set_conditional_headers(response, *version)
+
+    def update(self, request, *args, **kwargs):
+        with transaction.atomic(using=router.db_for_write(self.queryset.model)):
+            response = super().update(request, *args, **kwargs)
+        return self.set_conditional_headers(response, *self.get_object_version(self.updated_instance))
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        self.updated_instance = serializer.instance
+
+    def destroy(self, request, *args, **kwargs):
+        with transaction.atomic(using=router.db_for_write(self.queryset.model)):
+            return super().destroy(request, *args, **kwargs)
+
+
+class StreamingExportMixin:
+    """
+    Streams the whole filtered list when the client picks an export format
+    ('?format=ndjson', '?format=csv', or the matching Accept header).
+
+    Filters, search, ordering, '?fields=' and '?expand=' apply as usual, but
+    pagination does not. Rows are read with QuerySet.iterator(chunk_size=...)
+    (as values() rows when the serializer has a fast path), then serialized
+    and written a chunk at a time through a StreamingHttpResponse, so memory
+    stays flat however many rows there are.
+    """
+    export_chunk_size = 2000
+    export_filename = 'export'
+
+    def list(self, request, *args, **kwargs):
+        renderer = request.accepted_renderer
+        if not isinstance(renderer, StreamingRenderer):
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        # One serializer for every row, instead of a ListSerializer holding all of them.
+        serializer = self.get_serializer()
+        plan = fastpath.get_plan(serializer)
+        if plan is not None:
+            build = plan.bind()
+            rows = (build(row) for row in plan.values(queryset).iterator(chunk_size=self.export_chunk_size))
+        else:
+            rows = (
+                serializer.to_representation(instance)
+                for instance in queryset.iterator(chunk_size=self.export_chunk_size)
+            )
+        response = StreamingHttpResponse(
+            renderer.render_stream(rows, list(serializer.fields)),
+            content_type=f'{renderer.media_type}; charset={renderer.charset}',
+        )
+        response['Content-Disposition'] = f'attachment; filename="{self.export_filename}.{renderer.format}"'
+        return response
+
+
+class ListCacheMixin:
+    """
+    Caches rendered list responses for anonymous clients (see api.cache).
+
+    Entries are keyed on the normalized query parameters and the renderer, and
+    tagged with the narrowest filter in the request ('?author=', then
+    '?publication_year=', else the whole catalog), so a write only retires the
+    entries whose results it can change. Hits skip the database altogether;
+    the cached ETag still answers 'If-None-Match'. Responses carry 'X-Cache: HIT' or 'X-Cache: MISS'.
+    """
+    cache_formats = ('json',)
+    # Filter parameters (fields of the model) with their own tag, narrowest first.
+    cache_tag_params = (('author', 'author'), ('publication_year', 'year'))
+    cached_headers = ('ETag', 'Last-Modified')
+
+    def is_cacheable(self, request):
+        return (
+            request.method == 'GET'
+            and not request.user.is_authenticated
+            and request.accepted_renderer.format in self.cache_formats
+        )
+
+    def get_cache_tag(self):
+        """
+        The tag of the narrowest filter, on the value as the filter reads it
+        ('?author=01' and '?author= 1' are author 1). A value the model field
+        does not accept falls back to the whole catalog, which every write
+        retires.
+        """
+        params = self.request.query_params
+        for param, prefix in self.cache_tag_params:
+            values = [value.strip() for value in params.getlist(param)]
+            if len(values) == 1 and values[0]:
+                field = self.queryset.model._meta.get_field(param)
+                try:
+                    value = getattr(field, 'target_field', field).to_python(values[0])
+                except ValidationError:
+                    return cache.TAG_ALL
+                return f'{prefix}:{value}'
+        return cache.TAG_ALL
+
+    def get_cache_params(self):
+        params = sorted(
+            (key, value.strip()) for key, values in self.request.query_params.lists()
+            if key != api_settings.URL_FORMAT_OVERRIDE
+            for value in values if value.strip()
+        )
+        return params, self.request.accepted_renderer.format
+
+    def list(self, request, *args, **kwargs):
+        if not self.is_cacheable(request):
+            return super().list(request, *args, **kwargs)
+        tag = self.get_cache_tag()
+        key = cache.entry_key(tag, self.get_cache_params())
+        entry, generation = cache.lookup(tag, key)
+        if entry is not None:
+            response = HttpResponse(entry['content'], content_type=entry['content_type'])
+            for header, value in entry['headers'].items():
+                response[header] = value
+            response['X-Cache'] = 'HIT'
+            return get_conditional_response(
+                request,
+                etag=response.get('ETag'),
+                last_modified=parse_http_date_safe(response.get('Last-Modified', '')),
+                response=response,
+            )
+
+        response = super().list(request, *args, **kwargs)
+        response['X-Cache'] = 'MISS'
+        if response.status_code == status.HTTP_200_OK and isinstance(response, Response):
+            def store(rendered):
+                headers = {header: rendered[header] for header in self.cached_headers if header in rendered}
+                cache.store(key, generation, rendered.content, rendered['Content-Type'], headers)
+            response.add_post_render_callback(store)
+        return response
+
@@ -2,6 +2,7 @@ from django.db import models
 
 class Author(models.Model): # Defines the Author model
     name = models.CharField(max_length = 200) # Stores the author's name
+    updated_at = models.DateTimeField(auto_now = True) # Last change, used for ETags of expanded books
 
     def __str__(self): # String representation of the Author model
         return self.name # Returns the author's name
@@ -10,6 +11,27 @@ class Book(models.Model): # Defines the Book model
     title = models.CharField(max_length = 200) # Stores the book's title
     publication_year = models.IntegerField() # Stores the publication year of the book
     author = models.ForeignKey(Author, related_name='books', on_delete=models.CASCADE) # Foreign key relationship to Author model
+    updated_at = models.DateTimeField(auto_now = True, db_index = True) # Row version: drives ETag and Last-Modified
+
+    class Meta:
+        # Composite indexes for the filters and orderings of the Book API. The
+        # trailing 'id' matches the keyset pagination tie-breaker, so pages
+        # ordered by title or year are index seeks rather than scans and sorts.
+        indexes = [
+            models.Index(fields = ['publication_year', 'id'], name = 'api_book_year_id_idx'), # ?publication_year= and ?ordering=publication_year
+            models.Index(fields = ['title', 'id'], name = 'api_book_title_id_idx'), # ?ordering=title
+            models.Index(fields = ['author', 'publication_year'], name = 'api_book_author_year_idx'), # ?author= with ?publication_year= or ?ordering=publication_year
+        ]
 
     def __str__(self): # String representation of the Book model
         return self.title # Returns the book's title
+
+
+class BookSearchIndex(models.Model): # The full-text index of api.search, one row per book
+    # The index table is created by migration 0002 and kept current by database
+    # triggers, not by Django: the model only lets querysets join it.
+    book = models.OneToOneField(Book, primary_key = True, db_column = 'rowid', db_constraint = False, related_name = 'search_index', on_delete = models.DO_NOTHING) # rowid = book id
+
+    class Meta:
+        managed = False
+        db_table = 'api_book_fts'
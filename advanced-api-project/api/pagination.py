@@ -0,0 +1,246 @@
+import base64
+import json
+from urllib import parse
+
+from django.core.exceptions import FieldError, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination for the Book list.
+
+    Instead of skipping rows with OFFSET, each page remembers the ordering
+    values of its last row and the next page asks for the rows that sort
+    after them, e.g. for '?ordering=title':
+
+        WHERE title >= 'Dune' AND (title > 'Dune' OR id > 42)
+        ORDER BY title, id LIMIT 21
+
+    so page N costs the same index seek as page 1.
+
+    - The ordering comes from the queryset itself, so it follows whatever
+      OrderingFilter applied ('?ordering=-publication_year') or the view's
+      default ordering. The primary key is appended as a tie-breaker, in
+      the direction of the last key, so a descending ordering walks the
+      (column, id) indexes backwards instead of sorting ties.
+    - Cursors are opaque base64 tokens. They carry the ordering they were
+      issued for, and a cursor reused with another ordering is rejected.
+    - Filters and search are untouched: they are already part of the
+      queryset, and the 'next'/'previous' links keep the request's query
+      string.
+    - Pagination is a mode: it only kicks in when the client sends
+      '?page_size=' or '?cursor=', so existing clients keep receiving the
+      plain list.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = 20
+    max_page_size = 1000
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_queryset = self.get_page_queryset(queryset, request)
+        if page_queryset is None:
+            return None
+        return self.set_page(list(page_queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        # paginate_queryset() for async views: the page is read with the async ORM.
+        page_queryset = self.get_page_queryset(queryset, request)
+        if page_queryset is None:
+            return None
+        return self.set_page([row async for row in page_queryset])
+
+    def get_page_queryset(self, queryset, request):
+        """
+        Returns the queryset of the requested page, or None when the request
+        does not ask for pagination.
+        """
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+
+        cursor = self.decode_cursor(request)
+        self.reverse = cursor is not None and cursor['reverse']
+        self.has_cursor = cursor is not None
+        ordering = self.ordering
+        if self.reverse:
+            ordering = [self.invert(key) for key in ordering]
+
+        queryset = queryset.order_by(*ordering)
+        if cursor is not None:
+            values = self.clean_values(queryset, cursor['values'])
+            queryset = queryset.filter(self.seek(ordering, values))
+
+        # Fetch one extra row to find out whether there is another page.
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, results):
+        """Takes the rows read from get_page_queryset() and returns the page."""
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if self.reverse:
+            results.reverse()
+
+        self.has_next = has_more if not self.reverse else self.has_cursor
+        self.has_previous = self.has_cursor if not self.reverse else has_more
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_ordering(self, queryset):
+        """
+        Returns the ordering applied to the queryset (by OrderingFilter or the
+        model/view default) with the primary key appended as a tie-breaker, so
+        every row has a unique position. The tie-breaker follows the direction
+        of the last key: '-title' becomes ['-title', '-id'], which an index on
+        (title, id) serves read backwards.
+        """
+        pk_name = queryset.model._meta.pk.name
+        ordering = []
+        for key in queryset.query.order_by or queryset.model._meta.ordering:
+            if key.lstrip('-') == 'pk':
+                key = key.replace('pk', pk_name)
+            ordering.append(key)
+        if pk_name not in {key.lstrip('-') for key in ordering}:
+            descending = bool(ordering) and ordering[-1].startswith('-')
+            ordering.append('-' + pk_name if descending else pk_name)
+        return ordering
+
+    def invert(self, key):
+        return key[1:] if key.startswith('-') else '-' + key
+
+    def seek(self, ordering, values):
+        """
+        Builds the "rows after this position" condition for the given
+        ordering. The leading column gets a plain range test of its own so the
+        database can seek straight to the position through an index.
+        """
+        clauses = Q()
+        for index, key in enumerate(ordering):
+            name = key.lstrip('-')
+            lookup = 'lt' if key.startswith('-') else 'gt'
+            clause = Q(**{f'{name}__{lookup}': values[index]})
+            for previous_key, previous_value in zip(ordering[:index], values):
+                clause &= Q(**{previous_key.lstrip('-'): previous_value})
+            clauses |= clause
+
+        first = ordering[0]
+        first_lookup = 'lte' if first.startswith('-') else 'gte'
+        return Q(**{f'{first.lstrip("-")}__{first_lookup}': values[0]}) & clauses
+
+    def get_field(self, queryset, name):
+        """The model field, or annotation output field, that `name` orders by."""
+        if name in queryset.query.annotations:
+            try:
+                return queryset.query.annotations[name].output_field
+            except FieldError:
+                # e.g. RawSQL without an output_field: compared as is.
+                return None
+        model = queryset.model
+        for attr in name.split('__'):
+            field = model._meta.get_field(attr)
+            model = field.related_model
+        # Foreign keys are compared by their primary key.
+        return getattr(field, 'target_field', field)
+
+    def clean_values(self, queryset, values):
+        """
+        Converts the cursor values to the Python types of their fields.
+        decode_cursor() only checks the cursor's shape: a forged one can
+        still carry a string where the id goes.
+        """
+        cleaned = []
+        for key, value in zip(self.ordering, values):
+            field = self.get_field(queryset, key.lstrip('-'))
+            try:
+                cleaned.append(value if field is None or value is None else field.to_python(value))
+            except (TypeError, ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+        return cleaned
+
+    def position(self, obj):
+        return [self.get_value(obj, key.lstrip('-')) for key in self.ordering]
+
+    def get_value(self, obj, name):
+        if isinstance(obj, dict):
+            # A QuerySet.values() row: foreign keys already hold the primary key.
+            return obj[name]
+        value = obj
+        for attr in name.split('__'):
+            value = getattr(value, attr)
+        # Foreign keys are ordered (and compared) by their primary key.
+        return getattr(value, 'pk', value)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.position(self.page[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.position(self.page[0]), reverse=True)
+
+    def encode_cursor(self, values, reverse):
+        payload = {'o': self.ordering, 'v': values}
+        if reverse:
+            payload['r'] = 1
+        data = json.dumps(payload, separators=(',', ':'), default=str)
+        token = base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(parse.unquote(token).encode('ascii')))
+            ordering, values = payload['o'], payload['v']
+            reverse = bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if ordering != self.ordering or len(values) != len(ordering):
+            # The cursor was issued for a different '?ordering='.
+            raise NotFound(self.invalid_cursor_message)
+        return {'values': values, 'reverse': reverse}
+
+    def to_html(self):
+        return ''
+
@@ -0,0 +1,60 @@
+import io
+import json
+import re
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+
+try:
+    import orjson
+except ImportError:  # Optional: FastJSONParser falls back to the stdlib decoder.
+    orjson = None
+
+# orjson reads integers past 64 bits as floats; json.loads() keeps them exact.
+LONG_NUMBER = re.compile(rb'[0-9]{19,}')
+
+
+class NDJSONParser(BaseParser):
+    """
+    Parses newline-delimited JSON (one JSON value per line) into a list, so
+    feeds can be posted as they are exported, without wrapping them in an
+    array. Blank lines are skipped.
+    """
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        items = []
+        # Reading line by line keeps only one undecoded line in memory.
+        for line_number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                items.append(json.loads(line.decode(encoding)))
+            except ValueError as exc:
+                raise ParseError(f'NDJSON parse error on line {line_number} - {exc}')
+        return items
+
+
+class FastJSONParser(JSONParser):
+    """
+    Drop-in JSONParser that decodes UTF-8 bodies with orjson when it is
+    installed. Bodies orjson rejects, or that hold numbers it would read
+    differently (integers past 64 bits), go through JSONParser itself, so
+    results and error messages are the same as DRF's.
+    """
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace('_', '-') not in ('utf-8', 'utf8'):
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read()
+        if not LONG_NUMBER.search(body):
+            try:
+                return orjson.loads(body)
+            except orjson.JSONDecodeError:
+                pass
+        return super().parse(io.BytesIO(body), media_type, parser_context)
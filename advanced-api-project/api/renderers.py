@@ -0,0 +1,245 @@
+import csv
+import io
+import json
+import re
+import threading
+
+from rest_framework.compat import SHORT_SEPARATORS
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # Optional: FastJSONRenderer falls back to the stdlib encoder.
+    orjson = None
+
+# Where orjson and json.dumps() format a float differently: exponents
+# (1e16 / 1e+16) and small values (0.00001 / 1e-05). See float_mismatch().
+EXPONENT = re.compile(rb'e[-0-9]')
+# U+2028 / U+2029 in UTF-8, which JSONRenderer escapes.
+LINE_SEPARATORS = re.compile(b'\xe2\x80[\xa8\xa9]')
+
+_buffers = threading.local()
+
+
+def float_mismatch(ret):
+    """
+    Tells whether orjson output `ret` may hold a float that json.dumps()
+    writes differently. Strings can match too; that only costs a stdlib
+    render. Both scans start from a literal byte, which keeps them fast.
+    """
+    if b'0.0000' in ret:
+        return True
+    return any(ret[match.start() - 1:match.start()].isdigit() for match in EXPONENT.finditer(ret))
+
+
+class StreamingRenderer(BaseRenderer):
+    """
+    Base class for export formats that can be written one row at a time.
+
+    `render_stream()` turns an iterable of serialized rows into an iterable
+    of byte chunks for StreamingHttpResponse (see StreamingExportMixin), so
+    only one chunk of rows is held in memory. `render()` covers the ordinary
+    Response path (errors, small payloads) with the same format.
+    """
+    charset = 'utf-8'
+    # Rows per yielded chunk: fewer, larger writes to the client.
+    rows_per_chunk = 500
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        rows = data if isinstance(data, list) else [data]
+        return b''.join(self.render_stream(rows))
+
+    def render_stream(self, rows, fields=()):
+        raise NotImplementedError
+
+
+class NDJSONRenderer(StreamingRenderer):
+    """Newline-delimited JSON: one object per line ('?format=ndjson')."""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+    def render_stream(self, rows, fields=()):
+        encoder = json.JSONEncoder(
+            default=encoders.JSONEncoder().default,
+            ensure_ascii=not api_settings.UNICODE_JSON,
+            separators=(',', ':'),
+        )
+        lines = []
+        for row in rows:
+            lines.append(encoder.encode(row))
+            if len(lines) >= self.rows_per_chunk:
+                yield ('\n'.join(lines) + '\n').encode(self.charset)
+                lines = []
+        if lines:
+            yield ('\n'.join(lines) + '\n').encode(self.charset)
+
+
+class CSVRenderer(StreamingRenderer):
+    """
+    CSV with a header row ('?format=csv'). Nested objects, such as an
+    expanded author, are flattened into dotted columns ('author.name').
+
+    Text that a spreadsheet would read as a formula (starting with =, +, -,
+    @, a tab or a carriage return) is prefixed with a quote, so a book title
+    cannot run code in the spreadsheet of whoever opens the export.
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+    formula_prefixes = ('=', '+', '-', '@', '\t', '\r')
+
+    def render_stream(self, rows, fields=()):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        header = None
+        count = 0
+        for row in rows:
+            row = self.flatten(row)
+            if header is None:
+                header = list(row)
+                writer.writerow(header)
+            writer.writerow([self.format_value(row.get(column)) for column in header])
+            count += 1
+            if count % self.rows_per_chunk == 0:
+                yield self.drain(buffer)
+        if header is None and fields:
+            writer.writerow(fields)
+        if buffer.tell():
+            yield self.drain(buffer)
+
+    def flatten(self, row, prefix=''):
+        if not isinstance(row, dict):
+            return {prefix.rstrip('.') or 'value': row}
+        flat = {}
+        for key, value in row.items():
+            if isinstance(value, dict):
+                flat.update(self.flatten(value, f'{prefix}{key}.'))
+            else:
+                flat[f'{prefix}{key}'] = value
+        return flat
+
+    def format_value(self, value):
+        if value is None:
+            return ''
+        if isinstance(value, (list, tuple)):
+            return json.dumps(value, default=encoders.JSONEncoder().default)
+        if isinstance(value, str) and value.startswith(self.formula_prefixes):
+            return "'" + value
+        return value
+
+    def drain(self, buffer):
+        chunk = buffer.getvalue().encode(self.charset)
+        buffer.seek(0)
+        buffer.truncate()
+        return chunk
+
+
+class RenderBuffer:
+    """
+    Output buffer reused by the renders of one thread. Chunks overwrite the
+    space the previous render already allocated, so rendering a large list
+    again does not grow a new buffer from scratch. Buffers over
+    `max_retained` bytes are released after use.
+    """
+    max_retained = 16 * 1024 * 1024
+
+    def __init__(self):
+        self.data = bytearray()
+        self.size = 0
+        self.in_use = False
+
+    @classmethod
+    def acquire(cls):
+        buffer = getattr(_buffers, 'buffer', None)
+        if buffer is None or buffer.in_use:
+            buffer = _buffers.buffer = cls()
+        buffer.in_use = True
+        return buffer
+
+    def write(self, chunk):
+        end = self.size + len(chunk)
+        # Overwrites in place, and grows the bytearray past its end.
+        self.data[self.size:end] = chunk
+        self.size = end
+
+    def getvalue(self):
+        return bytes(memoryview(self.data)[:self.size])
+
+    def release(self):
+        """Hands the buffer back for the next render."""
+        if len(self.data) > self.max_retained:
+            self.data = bytearray()
+        self.size = 0
+        self.in_use = False
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Drop-in JSONRenderer that encodes with orjson when it is installed.
+
+    The output is byte for byte DRF's:
+    - dates, times and other types orjson would format its own way go
+      through DRF's JSONEncoder.default (OPT_PASSTHROUGH_DATETIME). That
+      covers Decimals too (rendered as floats, as DRF does).
+    - chunks whose floats orjson writes differently, or that orjson refuses
+      (integers over 64 bits, non-string keys), are encoded with the stdlib.
+    - U+2028/U+2029 are escaped as in JSONRenderer.
+
+    Large lists are encoded `chunk_size` items at a time into a RenderBuffer,
+    so only one chunk's intermediate output is alive at a time. Without
+    orjson, the chunks go through json.dumps(). Indented output ('indent='
+    in the Accept header, the browsable API), ensure_ascii and non-compact
+    settings use JSONRenderer itself.
+
+    Unlike JSONRenderer with STRICT_JSON, orjson writes NaN and infinity as
+    null instead of failing.
+    """
+    chunk_size = 1000
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        renderer_context = renderer_context or {}
+        if self.ensure_ascii or not self.compact or self.get_indent(accepted_media_type, renderer_context) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if isinstance(data, (list, tuple)) and len(data) > self.chunk_size:
+            buffer = RenderBuffer.acquire()
+            try:
+                buffer.write(b'[')
+                for start in range(0, len(data), self.chunk_size):
+                    if start:
+                        buffer.write(b',')
+                    # Each chunk is a non-empty array: keep what is between the brackets.
+                    buffer.write(memoryview(self.encode(data[start:start + self.chunk_size]))[1:-1])
+                buffer.write(b']')
+                ret = buffer.getvalue()
+            finally:
+                buffer.release()
+        else:
+            ret = self.encode(data)
+
+        if LINE_SEPARATORS.search(ret):
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+    def encode(self, value):
+        ret = None
+        if orjson is not None:
+            try:
+                ret = orjson.dumps(
+                    value,
+                    default=self.encoder_class().default,
+                    option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS,
+                )
+            except orjson.JSONEncodeError:
+                pass
+        if ret is None or float_mismatch(ret):
+            ret = json.dumps(
+                value, cls=self.encoder_class, ensure_ascii=False,
+                allow_nan=not self.strict, separators=SHORT_SEPARATORS,
+            ).encode()
+        return ret
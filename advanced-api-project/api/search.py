@@ -0,0 +1,147 @@
+import re
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import BooleanField
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+from rest_framework import filters
+
+# Name of the search index table. It holds one row per book (rowid = book id)
+# with the book's title and its author's name, and is kept current by database
+# triggers on api_book and api_author (see migration 0002_book_search_index).
+SEARCH_INDEX_TABLE = 'api_book_fts'
+
+
+class LikeSearchBackend:
+    """
+    The plain SearchFilter behaviour: one icontains lookup per search field,
+    across the author join. Used when no full-text index is available.
+    """
+    def search(self, search_filter, request, queryset, view):
+        return filters.SearchFilter.filter_queryset(search_filter, request, queryset, view)
+
+
+class FullTextSearchBackend:
+    """
+    Base class for the index-backed backends.
+
+    The index table (the unmanaged BookSearchIndex model) is joined on
+    `rowid = book id` and filtered with the full-text match, so the database
+    starts from the index and only visits matching books. Results are annotated with `search_rank`, where lower
+    means more relevant.
+    """
+    match_sql = ''
+    rank_sql = ''
+
+    def search(self, search_filter, request, queryset, view):
+        query = self.build_query(search_filter.get_search_terms(request))
+        if query is None:
+            return queryset.none()
+        # Filtering through the BookSearchIndex relation joins the index table
+        # (under its own name, which the SQL below refers to) on rowid = book id.
+        return queryset.filter(
+            RawSQL(self.match_sql, [query], output_field=BooleanField()),
+            search_index__isnull=False,
+        ).annotate(
+            search_rank=RawSQL(self.rank_sql, [query] if '%s' in self.rank_sql else []),
+        )
+
+    def build_query(self, terms):
+        raise NotImplementedError
+
+
+class SQLiteFTS5SearchBackend(FullTextSearchBackend):
+    """
+    SQLite FTS5 backend. Every search term becomes a quoted prefix query, so
+    'Prej' matches 'Prejudice' and the terms are ANDed like SearchFilter does.
+    Results are ranked with bm25().
+    """
+    match_sql = f'{SEARCH_INDEX_TABLE} MATCH %s'
+    rank_sql = f'bm25({SEARCH_INDEX_TABLE})'
+
+    def build_query(self, terms):
+        if not terms:
+            return None
+        # Quoting turns FTS5 operators typed by the client into plain text.
+        return ' '.join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+
+
+class PostgresSearchBackend(FullTextSearchBackend):
+    """
+    PostgreSQL backend: a tsvector per book in a GIN-indexed table, matched
+    with a prefix tsquery and ranked with ts_rank().
+    """
+    match_sql = f"{SEARCH_INDEX_TABLE}.document @@ to_tsquery('simple', %s)"
+    rank_sql = f"-ts_rank({SEARCH_INDEX_TABLE}.document, to_tsquery('simple', %s))"
+
+    def build_query(self, terms):
+        words = [word for term in terms for word in re.findall(r'\w+', term)]
+        if not words:
+            return None
+        return ' & '.join(f'{word}:*' for word in words)
+
+
+VENDOR_BACKENDS = {
+    'sqlite': SQLiteFTS5SearchBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+_index_available = {}
+
+
+def has_search_index(alias):
+    """Whether the search index table exists on the database `alias`."""
+    if alias not in _index_available:
+        connection = connections[alias]
+        with connection.cursor() as cursor:
+            tables = connection.introspection.table_names(cursor)
+        _index_available[alias] = SEARCH_INDEX_TABLE in tables
+    return _index_available[alias]
+
+
+def get_search_backend(alias):
+    """
+    Returns the search backend for the database `alias`.
+
+    settings.BOOK_SEARCH_BACKEND (a dotted path) forces a backend; otherwise
+    the full-text backend for the database vendor is used when its index
+    exists, and the icontains search when it does not.
+    """
+    backend_path = getattr(settings, 'BOOK_SEARCH_BACKEND', None)
+    if backend_path:
+        return import_string(backend_path)()
+    backend_class = VENDOR_BACKENDS.get(connections[alias].vendor)
+    if backend_class is None or not has_search_index(alias):
+        return LikeSearchBackend()
+    return backend_class()
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    SearchFilter for the Book API backed by a full-text index.
+
+    Takes the same '?search=' parameter as SearchFilter, but looks the terms
+    up in the index instead of running `ILIKE '%term%'` over every row, and
+    annotates the results with `search_rank` for RelevanceOrderingFilter.
+
+    Terms match the start of words, not any substring: 'Emm' finds 'Emma'
+    but 'mma' does not. BOOK_SEARCH_BACKEND = 'api.search.LikeSearchBackend'
+    brings the substring search back, at the cost of reading every row.
+    """
+    def filter_queryset(self, request, queryset, view):
+        if not self.get_search_fields(view, request) or not self.get_search_terms(request):
+            return queryset
+        backend = get_search_backend(queryset.db)
+        return backend.search(self, request, queryset, view)
+
+
+class RelevanceOrderingFilter(filters.OrderingFilter):
+    """
+    OrderingFilter that sorts search results by relevance (best match first,
+    then the view's default ordering) unless the client passed '?ordering='.
+    """
+    def filter_queryset(self, request, queryset, view):
+        if 'search_rank' in queryset.query.annotations and not request.query_params.get(self.ordering_param):
+            return queryset.order_by('search_rank', *(self.get_default_ordering(view) or []))
+        return super().filter_queryset(request, queryset, view)
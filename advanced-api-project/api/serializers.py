@@ -1,24 +1,227 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.utils import timezone
 from rest_framework import serializers
+from .fastpath import FastListSerializerMixin
 from .models import Book, Author
+from .profiling import ProfiledListSerializer, ProfiledSerializerMixin
 
 # --- Fix 1: Serializer Assertion Error ---
-# The assertion error "Add an explicit fields = '__all__' to the BookSerializer serializer" 
+# The assertion error "Add an explicit fields = '__all__' to the BookSerializer serializer"
 # is fixed by adding fields = '__all__'.
 
-class AuthorSerializer(serializers.ModelSerializer):
-    """Serializer for the Author model."""
+class ExpandableFieldsMixin:
+    """
+    Lets clients ask for related objects inline ('?expand=author') instead of
+    making one extra request per row.
+
+    `expandable_fields` maps a field name to:
+    - 'serializer': name of the serializer class (in this module) used when expanded
+    - 'many': whether the relation holds several objects
+    - 'select_related' / 'prefetch_related': the lookup the view queryset needs
+      so that the expanded field costs a fixed number of queries
+    """
+    expandable_fields = {}
+
+    def __init__(self, *args, **kwargs):
+        expand = kwargs.pop('expand', ())
+        super().__init__(*args, **kwargs)
+        for field_name in self.get_valid_expand(expand):
+            options = self.expandable_fields[field_name]
+            serializer_class = globals()[options['serializer']]
+            # Nested serializers are read-only and never expand further.
+            self.fields[field_name] = serializer_class(many=options.get('many', False), read_only=True)
+
+    @classmethod
+    def get_valid_expand(cls, expand):
+        """Keeps the requested names this serializer knows how to expand."""
+        return [field_name for field_name in expand if field_name in cls.expandable_fields]
+
+    @classmethod
+    def optimize_queryset(cls, queryset, expand):
+        """Adds the select_related/prefetch_related calls needed for `expand`."""
+        for field_name in cls.get_valid_expand(expand):
+            options = cls.expandable_fields[field_name]
+            if 'select_related' in options:
+                queryset = queryset.select_related(options['select_related'])
+            if 'prefetch_related' in options:
+                queryset = queryset.prefetch_related(options['prefetch_related'])
+        return queryset
+
+
+class SparseFieldsMixin:
+    """
+    Lets clients ask for a subset of the fields ('?fields=id,title').
+
+    Unrequested fields are dropped from the serializer, and
+    `get_only_fields()` tells the view which columns it still has to load.
+    """
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
+    @classmethod
+    def get_field_sources(cls):
+        """Maps each field name to the model attribute it reads (built once per class)."""
+        if '_field_sources' not in cls.__dict__:
+            sources = {field_name: field_name for field_name in getattr(cls, 'expandable_fields', {})}
+            sources.update(
+                (field_name, field.source.split('.')[0]) for field_name, field in cls().fields.items()
+            )
+            cls._field_sources = sources
+        return cls._field_sources
+
+    @classmethod
+    def get_valid_fields(cls, fields):
+        """Keeps the requested names that are fields of this serializer."""
+        sources = cls.get_field_sources()
+        return [field_name for field_name in fields if field_name in sources]
+
+    @classmethod
+    def get_only_fields(cls, fields):
+        """Returns the model columns backing `fields`, for QuerySet.only()."""
+        model = cls.Meta.model
+        columns = {model._meta.pk.name}
+        for field_name in fields:
+            try:
+                model_field = model._meta.get_field(cls.get_field_sources()[field_name])
+            except (KeyError, FieldDoesNotExist):
+                continue
+            # Reverse relations and many-to-many fields have no column here.
+            if model_field.concrete and not model_field.many_to_many:
+                columns.add(model_field.name)
+        return columns
+
+
+class PrefetchedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    PrimaryKeyRelatedField that can be handed the related objects up front
+    (`prefetched`, a dict of pk -> object, set by a bulk ListSerializer), so a
+    batch of N items costs one query instead of N `get()` calls.
+    """
+    def __init__(self, **kwargs):
+        self.prefetched = None
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if self.prefetched is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            return self.prefetched[int(data)]
+        except KeyError:
+            self.fail('does_not_exist', pk_value=data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+
+class BookListSerializer(ProfiledSerializerMixin, FastListSerializerMixin, serializers.ListSerializer):
+    """
+    ListSerializer of BookSerializer.
+
+    - Reads go through the compiled fast path (api.fastpath) whenever the
+      requested fields allow it.
+    - Bulk writes: related ids of the whole batch are looked up with one
+      `in_bulk()` per relation before the items are validated.
+    - create() writes with bulk_create(); update() matches each item to an
+      instance by its 'id' and writes with bulk_update().
+    - Both run in the caller's transaction, so a batch is all or nothing.
+    """
+    # None lets Django size the INSERT/UPDATE batches for the database.
+    batch_size = None
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            self.prefetch_related_objects(data)
+        if self.instance is not None:
+            self.instances_by_pk = {instance.pk: instance for instance in self.instance}
+            self.updated_instances = []
+        return super().to_internal_value(data)
+
+    def prefetch_related_objects(self, data):
+        for field_name, field in self.child.fields.items():
+            if not isinstance(field, PrefetchedPrimaryKeyRelatedField) or field.read_only:
+                continue
+            pks = set()
+            for item in data:
+                value = item.get(field_name) if isinstance(item, dict) else None
+                if isinstance(value, (int, str)) and not isinstance(value, bool) and str(value).isdigit():
+                    pks.add(int(value))
+            field.prefetched = field.get_queryset().in_bulk(pks)
+
+    def run_child_validation(self, data):
+        if self.instance is None:
+            return super().run_child_validation(data)
+        pk = data.get('id') if isinstance(data, dict) else None
+        instance = self.instances_by_pk.get(pk) if isinstance(pk, int) else None
+        if instance is None:
+            raise serializers.ValidationError({'id': ['No book with this id.']})
+        if instance in self.updated_instances:
+            raise serializers.ValidationError({'id': ['Duplicate id in the batch.']})
+        self.child.instance = instance
+        self.child.initial_data = data
+        validated = super().run_child_validation(data)
+        self.updated_instances.append(instance)
+        return validated
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        return model.objects.bulk_create(
+            [model(**attrs) for attrs in validated_data], batch_size=self.batch_size,
+        )
+
+    def update(self, instances, validated_data):
+        model = self.child.Meta.model
+        # bulk_update() does not run auto_now, so the row version is set here.
+        now = timezone.now()
+        fields = {'updated_at'}
+        for instance, attrs in zip(self.updated_instances, validated_data):
+            for attr, value in attrs.items():
+                setattr(instance, attr, value)
+                fields.add(attr)
+            instance.updated_at = now
+        model.objects.bulk_update(self.updated_instances, sorted(fields), batch_size=self.batch_size)
+        return self.updated_instances
+
+
+class AuthorSerializer(ProfiledSerializerMixin, SparseFieldsMixin, ExpandableFieldsMixin, serializers.ModelSerializer):
+    """
+    Serializer for the Author model.
+    '?expand=books' nests the author's books; '?fields=' narrows the output.
+    """
+    expandable_fields = {
+        'books': {'serializer': 'BookSerializer', 'many': True, 'prefetch_related': 'books'},
+    }
+
     class Meta:
         model = Author
-        fields = '__all__'
+        # updated_at only versions the row (ETags), it is not part of the API.
+        fields = ('id', 'name')
+        list_serializer_class = ProfiledListSerializer
 
-class BookSerializer(serializers.ModelSerializer):
+class BookSerializer(ProfiledSerializerMixin, SparseFieldsMixin, ExpandableFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for the Book model.
-    The 'author' field is inherited from the ModelSerializer and will expect 
+    The 'author' field is inherited from the ModelSerializer and will expect
     the Author ID on write operations (POST/PUT).
+    '?expand=author' replaces the ID with the nested author on reads, and
+    '?fields=id,title' narrows the output (and the columns loaded).
+    With many=True it reads lists through the compiled fast path and
+    validates and writes whole batches (BookListSerializer).
     """
+    expandable_fields = {
+        'author': {'serializer': 'AuthorSerializer', 'select_related': 'author'},
+    }
+    # Lets BookListSerializer resolve the authors of a batch in one query.
+    serializer_related_field = PrefetchedPrimaryKeyRelatedField
+
     class Meta:
         model = Book
+        list_serializer_class = BookListSerializer
         # MANDATORY FIX: Explicitly define fields to resolve DRF AssertionError
-        fields = '__all__'
-        read_only_fields = ('id',)
\ No newline at end of file
+        # (updated_at only versions the row for ETags: it is not part of the API).
+        fields = ('id', 'title', 'publication_year', 'author')
+        read_only_fields = ('id',)
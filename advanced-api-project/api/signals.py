@@ -0,0 +1,42 @@
+"""
+Keeps the Book list cache (api.cache) current: saving or deleting a Book or
+an Author retires the list responses it can appear in.
+
+Writes that send no signals (bulk_create, bulk_update, QuerySet.update) have
+to call api.cache.invalidate_write() themselves, as BookBulkView does.
+"""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import cache
+from .models import Author, Book
+
+
+@receiver(pre_save, sender=Book)
+def remember_book_tags(sender, instance, **kwargs):
+    """Records the tags of the stored row, which a move to another author/year also affects."""
+    instance._cache_tags = set()
+    if instance.pk is not None and not instance._state.adding:
+        old = Book.objects.filter(pk=instance.pk).values('author_id', 'publication_year').first()
+        if old is not None:
+            instance._cache_tags = cache.book_tags(old['author_id'], old['publication_year'])
+
+
+@receiver(post_save, sender=Book)
+def invalidate_saved_book(sender, instance, **kwargs):
+    tags = getattr(instance, '_cache_tags', set())
+    cache.invalidate_write(tags | cache.book_tags(instance.author_id, instance.publication_year))
+
+
+@receiver(post_delete, sender=Book)
+def invalidate_deleted_book(sender, instance, **kwargs):
+    cache.invalidate_write(cache.book_tags(instance.author_id, instance.publication_year))
+
+
+@receiver(post_save, sender=Author)
+@receiver(post_delete, sender=Author)
+def invalidate_author(sender, instance, **kwargs):
+    # Once the author is deleted its books are gone too, and their own
+    # post_delete has retired the lists of their years.
+    years = Book.objects.filter(author_id=instance.pk).values_list('publication_year', flat=True).distinct()
+    cache.invalidate_write(cache.author_tags(instance.pk, years))
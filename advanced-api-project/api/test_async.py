@@ -0,0 +1,102 @@
+import asyncio
+
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.test import override_settings
+from django.contrib.auth import get_user_model
+from django.urls import resolve, reverse
+from . import throttling
+from .models import Book, Author
+
+User = get_user_model()
+
+
+@override_settings(API_PROFILING_SAMPLE_RATE=0)
+class AsyncBookViewTests(APITestCase):
+    """
+    Test suite for the async (ASGI-native) book views: same responses as
+    BookListCreateView / BookRetrieveUpdateDestroyView, served by coroutines.
+    """
+    def setUp(self):
+        throttling.local_store.clear()
+        self.user = User.objects.create_user(username='authuser', password='password123')
+        self.author_austen = Author.objects.create(name='Jane Austen')
+        self.author_martin = Author.objects.create(name='George R. R. Martin')
+        self.book_pride = Book.objects.create(title='Pride and Prejudice', publication_year=1813, author=self.author_austen)
+        Book.objects.create(title='Emma', publication_year=1815, author=self.author_austen)
+        Book.objects.create(title='A Game of Thrones', publication_year=1996, author=self.author_martin)
+        self.list_url = reverse('async-book-list')
+        self.detail_url = reverse('async-book-detail', kwargs={'pk': self.book_pride.pk})
+        self.valid_payload = {'title': 'Sense and Sensibility', 'publication_year': 1811, 'author': self.author_austen.id}
+
+    def test_views_are_coroutines(self):
+        """Test both views are async, so ASGI runs them in the event loop."""
+        for url in [self.list_url, self.detail_url]:
+            self.assertTrue(asyncio.iscoroutinefunction(resolve(url).func))
+
+    def test_list_matches_sync_view(self):
+        """Test filters, search, ordering, expand, fields and pages answer like /books/."""
+        queries = [
+            '', '?publication_year=1815', f'?author={self.author_austen.id}', '?author=999', '?search=Prejudice',
+            '?ordering=-title', '?expand=author', '?fields=id,title', '?page_size=2', '?page_size=2&ordering=title',
+        ]
+        for query in queries:
+            with self.subTest(query=query):
+                expected = self.client.get(reverse('book-list') + query, HTTP_ACCEPT='application/json')
+                response = self.client.get(self.list_url + query)
+                self.assertEqual(response.status_code, expected.status_code)
+                self.assertEqual(
+                    response.content.replace(b'/async/books/', b'/books/'), expected.content,
+                )
+
+    def test_pagination_follows_cursor(self):
+        """Test the 'next' link of a page leads to the following page."""
+        first = self.client.get(f'{self.list_url}?page_size=2')
+        second = self.client.get(first.data['next'])
+        ids = [book['id'] for book in first.data['results'] + second.data['results']]
+        self.assertEqual(ids, list(Book.objects.order_by('id').values_list('id', flat=True)))
+        self.assertIsNone(second.data['next'])
+
+    def test_retrieve_matches_sync_view(self):
+        """Test GET of one book, and of a missing one, answer like /books/<pk>/."""
+        for pk in [self.book_pride.pk, 999]:
+            with self.subTest(pk=pk):
+                expected = self.client.get(reverse('book-detail', kwargs={'pk': pk}) + '?expand=author')
+                response = self.client.get(reverse('async-book-detail', kwargs={'pk': pk}) + '?expand=author')
+                self.assertEqual(response.status_code, expected.status_code)
+                self.assertEqual(response.data, expected.data)
+
+    def test_writes_require_authentication(self):
+        """Test POST, PUT and DELETE are refused to anonymous clients (403)."""
+        self.assertEqual(self.client.post(self.list_url, self.valid_payload, format='json').status_code, 403)
+        self.assertEqual(self.client.put(self.detail_url, self.valid_payload, format='json').status_code, 403)
+        self.assertEqual(self.client.delete(self.detail_url).status_code, 403)
+        self.assertEqual(Book.objects.count(), 3)
+
+    def test_create_update_delete(self):
+        """Test an authenticated client can create, update and delete books."""
+        self.client.login(username='authuser', password='password123')
+        response = self.client.post(self.list_url, self.valid_payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['title'], 'Sense and Sensibility')
+        created = Book.objects.get(pk=response.data['id'])
+
+        response = self.client.patch(self.detail_url, {'title': 'Pride and Prejudice, 2nd ed.'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.book_pride.refresh_from_db()
+        self.assertEqual(self.book_pride.title, 'Pride and Prejudice, 2nd ed.')
+
+        response = self.client.put(self.detail_url, {**self.valid_payload, 'author': 999}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('author', response.data)
+
+        response = self.client.delete(reverse('async-book-detail', kwargs={'pk': created.pk}))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Book.objects.filter(pk=created.pk).exists())
+
+    async def test_served_in_event_loop(self):
+        """Test a session-authenticated create through the async client (ASGI request path)."""
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.post(self.list_url, self.valid_payload, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(await Book.objects.acount(), 4)
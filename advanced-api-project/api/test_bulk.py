@@ -0,0 +1,115 @@
+import json
+
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.test import override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from . import throttling
+from .models import Book, Author
+
+User = get_user_model()
+
+
+@override_settings(API_PROFILING_SAMPLE_RATE=0)
+class BookBulkTests(APITestCase):
+    """
+    Test suite for /books/bulk/: batched create, update and delete, with
+    per-item errors and all-or-nothing writes.
+    """
+    def setUp(self):
+        throttling.local_store.clear()
+        self.user = User.objects.create_user(username='authuser', password='password123')
+        self.client.force_authenticate(user=self.user)
+        self.austen = Author.objects.create(name='Jane Austen')
+        self.stoker = Author.objects.create(name='Bram Stoker')
+        self.url = reverse('book-bulk')
+
+    def test_requires_authentication(self):
+        """Test anonymous bulk writes are rejected."""
+        self.client.force_authenticate(user=None)
+        response = self.client.post(self.url, [], format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_bulk_create(self):
+        """Test POST creates the whole batch with a constant number of queries."""
+        data = [
+            {'title': f'Book {index}', 'publication_year': 1800 + index, 'author': self.austen.id}
+            for index in range(50)
+        ]
+        # The author lookup, then one INSERT inside the transaction (savepoint in tests).
+        with self.assertNumQueries(4):
+            response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 50)
+        self.assertTrue(all(item['id'] for item in response.data))
+        self.assertEqual(Book.objects.count(), 50)
+
+    def test_bulk_create_ndjson(self):
+        """Test POST accepts NDJSON, one book per line."""
+        lines = [
+            json.dumps({'title': 'Emma', 'publication_year': 1815, 'author': self.austen.id}),
+            '',
+            json.dumps({'title': 'Dracula', 'publication_year': 1897, 'author': self.stoker.id}),
+        ]
+        response = self.client.post(self.url, '\n'.join(lines), content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(sorted(Book.objects.values_list('title', flat=True)), ['Dracula', 'Emma'])
+
+    def test_bulk_create_invalid_ndjson(self):
+        """Test a malformed NDJSON line is reported with its line number."""
+        response = self.client.post(self.url, '{"title": "Emma"}\n{oops', content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('line 2', response.data['detail'])
+
+    def test_bulk_create_is_all_or_nothing(self):
+        """Test one invalid item rejects the batch with errors keyed by position."""
+        data = [
+            {'title': 'Emma', 'publication_year': 1815, 'author': self.austen.id},
+            {'title': 'Nobody', 'publication_year': 1900, 'author': 9999},
+            {'title': 'Dracula', 'author': self.stoker.id},
+        ]
+        response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(set(response.data), {1, 2})
+        self.assertIn('author', response.data[1])
+        self.assertIn('publication_year', response.data[2])
+        self.assertFalse(Book.objects.exists())
+
+    def test_bulk_update(self):
+        """Test PATCH updates each book by id and bumps its version."""
+        emma = Book.objects.create(title='Emma', publication_year=1815, author=self.austen)
+        dracula = Book.objects.create(title='Dracula', publication_year=1897, author=self.stoker)
+        data = [
+            {'id': emma.id, 'title': 'Emma (Annotated)'},
+            {'id': dracula.id, 'author': self.austen.id},
+        ]
+        response = self.client.patch(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        emma_after = Book.objects.get(pk=emma.pk)
+        self.assertEqual(emma_after.title, 'Emma (Annotated)')
+        self.assertGreater(emma_after.updated_at, emma.updated_at)
+        self.assertEqual(Book.objects.get(pk=dracula.pk).author, self.austen)
+
+    def test_bulk_update_unknown_id(self):
+        """Test PUT with an unknown or duplicate id fails for that item only."""
+        emma = Book.objects.create(title='Emma', publication_year=1815, author=self.austen)
+        item = {'id': emma.id, 'title': 'Changed', 'publication_year': 1815, 'author': self.austen.id}
+        data = [item, {**item, 'id': 9999}, item]
+        response = self.client.put(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(set(response.data), {1, 2})
+        self.assertEqual(Book.objects.get(pk=emma.pk).title, 'Emma')
+
+    def test_bulk_delete(self):
+        """Test DELETE removes the listed books, or none if one id is unknown."""
+        books = Book.objects.bulk_create([
+            Book(title=f'Book {index}', publication_year=1900, author=self.austen) for index in range(3)
+        ])
+        response = self.client.delete(self.url, [books[0].id, 9999], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(list(response.data), [1])
+        self.assertEqual(Book.objects.count(), 3)
+        response = self.client.delete(self.url, [books[0].id, books[1].id], format='json')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(list(Book.objects.values_list('id', flat=True)), [books[2].id])
@@ -0,0 +1,142 @@
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.test import override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from . import cache, throttling
+from .models import Book, Author
+
+User = get_user_model()
+
+
+@override_settings(API_PROFILING_SAMPLE_RATE=0)
+class ListCacheTests(APITestCase):
+    """
+    Test suite for the anonymous Book list cache: hits, and invalidation of
+    only the entries a write can affect.
+    """
+    def setUp(self):
+        throttling.local_store.clear()
+        cache.get_cache().clear()
+        self.austen = Author.objects.create(name='Jane Austen')
+        self.stoker = Author.objects.create(name='Bram Stoker')
+        self.emma = Book.objects.create(title='Emma', publication_year=1815, author=self.austen)
+        self.dracula = Book.objects.create(title='Dracula', publication_year=1897, author=self.stoker)
+        self.url = reverse('book-list')
+        self.austen_url = f'{self.url}?author={self.austen.id}'
+        self.stoker_url = f'{self.url}?author={self.stoker.id}'
+
+    def assertCache(self, url, expected):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['X-Cache'], expected)
+        return response
+
+    def test_second_request_is_a_hit(self):
+        """Test a repeated anonymous list is served from the cache without queries."""
+        first = self.assertCache(self.url, 'MISS')
+        with self.assertNumQueries(0):
+            second = self.assertCache(self.url, 'HIT')
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_normalized_parameters(self):
+        """Test parameter order and empty parameters do not split the cache."""
+        self.assertCache(f'{self.url}?ordering=title&search=', 'MISS')
+        self.assertCache(f'{self.url}?search=&ordering=title', 'HIT')
+        self.assertCache(f'{self.url}?ordering=-title', 'MISS')
+
+    def test_authenticated_requests_bypass_the_cache(self):
+        """Test authenticated lists are never cached."""
+        self.client.force_authenticate(user=User.objects.create_user(username='reader'))
+        self.client.get(self.url)
+        self.assertNotIn('X-Cache', self.client.get(self.url))
+
+    def test_save_invalidates_only_affected_entries(self):
+        """Test saving a book retires its author's and the unfiltered lists, not other authors'."""
+        for url in (self.url, self.austen_url, self.stoker_url):
+            self.assertCache(url, 'MISS')
+        self.emma.title = 'Emma (Annotated)'
+        self.emma.save()
+        response = self.assertCache(self.austen_url, 'MISS')
+        self.assertEqual(response.data[0]['title'], 'Emma (Annotated)')
+        self.assertCache(self.url, 'MISS')
+        self.assertCache(self.stoker_url, 'HIT')
+
+    def test_moving_a_book_invalidates_both_authors(self):
+        """Test a book moved to another author leaves the old author's list."""
+        self.assertCache(self.austen_url, 'MISS')
+        self.assertCache(self.stoker_url, 'MISS')
+        self.emma.author = self.stoker
+        self.emma.save()
+        self.assertEqual(self.assertCache(self.austen_url, 'MISS').data, [])
+        self.assertEqual(len(self.assertCache(self.stoker_url, 'MISS').data), 2)
+
+    def test_year_filter_invalidation(self):
+        """Test '?publication_year=' entries follow the books of that year only."""
+        url_1815 = f'{self.url}?publication_year=1815'
+        url_1897 = f'{self.url}?publication_year=1897'
+        self.assertCache(url_1815, 'MISS')
+        self.assertCache(url_1897, 'MISS')
+        Book.objects.create(title='Mansfield Park', publication_year=1815, author=self.austen)
+        self.assertEqual(len(self.assertCache(url_1815, 'MISS').data), 2)
+        self.assertCache(url_1897, 'HIT')
+
+    def test_author_changes_invalidate(self):
+        """Test renaming or deleting an author retires the lists that show it."""
+        expanded_url = f'{self.austen_url}&expand=author'
+        self.assertCache(expanded_url, 'MISS')
+        self.austen.name = 'J. Austen'
+        self.austen.save()
+        self.assertEqual(self.assertCache(expanded_url, 'MISS').data[0]['author']['name'], 'J. Austen')
+        self.assertCache(self.url, 'MISS')
+        self.stoker.delete()
+        self.assertEqual(len(self.assertCache(self.url, 'MISS').data), 1)
+
+    def test_author_changes_invalidate_year_lists(self):
+        """Test renaming an author retires the year lists that embed or search it."""
+        urls = [f'{self.url}?publication_year=1815&expand=author', f'{self.url}?publication_year=1815&search=Austen']
+        for url in urls:
+            self.assertCache(url, 'MISS')
+        self.austen.name = 'Cassandra Austen'
+        self.austen.save()
+        response = self.assertCache(urls[0], 'MISS')
+        self.assertEqual(response.data[0]['author']['name'], 'Cassandra Austen')
+        self.assertCache(urls[1], 'MISS')
+        self.assertCache(f'{self.url}?publication_year=1897', 'MISS')
+        self.assertCache(f'{self.url}?publication_year=1897', 'HIT')
+
+    def test_filter_values_are_normalized(self):
+        """Test zero-padded and padded filter values are tagged, and invalidated, like the plain value."""
+        variants = [f'{self.url}?author=0{self.austen.id}', f'{self.url}?author=%20{self.austen.id}',
+                    f'{self.url}?publication_year=01815', f'{self.url}?publication_year=1815%20']
+        for url in variants:
+            self.assertCache(url, 'MISS')
+        self.emma.title = 'Emma (Annotated)'
+        self.emma.save()
+        for url in variants:
+            with self.subTest(url=url):
+                self.assertEqual(self.assertCache(url, 'MISS').data[0]['title'], 'Emma (Annotated)')
+
+    def test_bulk_writes_invalidate(self):
+        """Test bulk creates and updates, which send no signals, still invalidate."""
+        bulk_url = reverse('book-bulk')
+        self.assertCache(self.stoker_url, 'MISS')
+        self.client.force_authenticate(user=User.objects.create_user(username='editor'))
+        self.client.post(bulk_url, [{'title': 'The Jewel', 'publication_year': 1903, 'author': self.stoker.id}], format='json')
+        self.client.patch(bulk_url, [{'id': self.emma.id, 'author': self.stoker.id}], format='json')
+        self.client.force_authenticate(user=None)
+        self.assertEqual(len(self.assertCache(self.stoker_url, 'MISS').data), 3)
+
+    def test_stats(self):
+        """Test the hit/miss counters are exposed to staff only."""
+        stats_url = reverse('cache-stats')
+        self.assertEqual(self.client.get(stats_url).status_code, status.HTTP_403_FORBIDDEN)
+        hits = cache.stats['hits']
+        self.client.get(self.url)
+        self.client.get(self.url)
+        self.client.force_authenticate(user=User.objects.create_user(username='admin', is_staff=True))
+        response = self.client.get(stats_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['hits'], hits + 1)
+        self.assertIn('hit_rate', response.data)
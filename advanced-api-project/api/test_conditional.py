@@ -0,0 +1,114 @@
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.test import override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from . import throttling
+from .models import Book, Author
+
+User = get_user_model()
+
+
+@override_settings(API_PROFILING_SAMPLE_RATE=0)
+class ConditionalRequestTests(APITestCase):
+    """
+    Test suite for ETag / Last-Modified on the Book endpoints: 304 on reads
+    that match, 412 on writes that do not.
+    """
+    def setUp(self):
+        throttling.local_store.clear()
+        self.user = User.objects.create_user(username='authuser', password='password123')
+        self.author = Author.objects.create(name='Jane Austen')
+        self.book = Book.objects.create(title='Emma', publication_year=1815, author=self.author)
+        Book.objects.create(title='Persuasion', publication_year=1817, author=self.author)
+        self.list_url = reverse('book-list')
+        self.detail_url = reverse('book-detail', kwargs={'pk': self.book.pk})
+
+    def test_detail_not_modified(self):
+        """Test a matching If-None-Match on GET /books/<pk>/ is a one-query 304."""
+        response = self.client.get(self.detail_url)
+        self.assertIn('Last-Modified', response)
+        etag = response['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_list_not_modified(self):
+        """Test a matching If-None-Match on GET /books/ is a one-query 304."""
+        # Authenticated requests bypass the list cache.
+        self.client.force_authenticate(user=self.user)
+        etag = self.client.get(self.list_url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_cached_list_not_modified(self):
+        """Test the list cache answers a matching If-None-Match without any query."""
+        etag = self.client.get(self.list_url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_etag_changes_with_the_data(self):
+        """Test saving, adding and deleting books changes the ETags."""
+        detail_etag = self.client.get(self.detail_url)['ETag']
+        list_etag = self.client.get(self.list_url)['ETag']
+        self.book.title = 'Emma (Annotated)'
+        self.book.save()
+        self.assertNotEqual(self.client.get(self.detail_url)['ETag'], detail_etag)
+        self.assertNotEqual(self.client.get(self.list_url)['ETag'], list_etag)
+        list_etag = self.client.get(self.list_url)['ETag']
+        Book.objects.exclude(pk=self.book.pk).delete()
+        self.assertNotEqual(self.client.get(self.list_url)['ETag'], list_etag)
+
+    def test_page_etag_follows_its_rows(self):
+        """Test a keyset page's ETag only changes with the rows it serves."""
+        url = f'{self.list_url}?ordering=title&page_size=1'
+        etag = self.client.get(url)['ETag']
+        Book.objects.get(title='Persuasion').save()
+        self.assertEqual(self.client.get(url)['ETag'], etag)
+        self.book.save()
+        self.assertNotEqual(self.client.get(url)['ETag'], etag)
+
+    def test_etag_depends_on_the_representation(self):
+        """Test '?fields=' and '?expand=' responses get their own ETags."""
+        etag = self.client.get(self.detail_url)['ETag']
+        self.assertNotEqual(self.client.get(f'{self.detail_url}?fields=title')['ETag'], etag)
+        expanded_etag = self.client.get(f'{self.detail_url}?expand=author')['ETag']
+        self.assertNotEqual(expanded_etag, etag)
+        # Renaming the author only changes the expanded representation.
+        self.author.name = 'J. Austen'
+        self.author.save()
+        self.assertEqual(self.client.get(self.detail_url)['ETag'], etag)
+        self.assertNotEqual(self.client.get(f'{self.detail_url}?expand=author')['ETag'], expanded_etag)
+
+    def test_filtered_list_etag(self):
+        """Test the list ETag only follows the rows matching the filters."""
+        url = f'{self.list_url}?publication_year=1817'
+        etag = self.client.get(url)['ETag']
+        self.book.save()
+        self.assertEqual(self.client.get(url)['ETag'], etag)
+
+    def test_update_with_matching_if_match(self):
+        """Test PATCH with the current ETag succeeds and returns the new ETag."""
+        self.client.login(username='authuser', password='password123')
+        etag = self.client.get(self.detail_url)['ETag']
+        response = self.client.patch(self.detail_url, {'title': 'Emma'}, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(self.client.get(self.detail_url)['ETag'], response['ETag'])
+
+    def test_update_with_stale_if_match(self):
+        """Test PUT/PATCH/DELETE with a stale If-Match get 412 and change nothing."""
+        self.client.login(username='authuser', password='password123')
+        etag = self.client.get(self.detail_url)['ETag']
+        Book.objects.get(pk=self.book.pk).save()
+        data = {'title': 'Lost Update', 'publication_year': 1815, 'author': self.author.id}
+        response = self.client.put(self.detail_url, data, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        response = self.client.patch(self.detail_url, {'title': 'Lost Update'}, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        response = self.client.delete(self.detail_url, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.assertEqual(Book.objects.get(pk=self.book.pk).title, 'Emma')
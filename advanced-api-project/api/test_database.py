@@ -0,0 +1,76 @@
+import os
+import tempfile
+
+from django.db import OperationalError
+from django.db.utils import ConnectionHandler
+from django.test import SimpleTestCase
+from .database import sqlite_database
+
+
+class SQLiteProfileTests(SimpleTestCase):
+    """
+    Test suite for the SQLite connection profiles (api.database), on a
+    throwaway database file.
+    """
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'db.sqlite3')
+
+    def connect(self, **databases):
+        # Connections of their own, outside of the test databases.
+        handler = ConnectionHandler({'default': {'ENGINE': 'django.db.backends.dummy'}, **databases})
+        self.addCleanup(handler.close_all)
+        return handler
+
+    def pragma(self, connection, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_production_profile(self):
+        """Test new connections get mmap, cache, busy timeout and memory temp store, and keep the journal."""
+        connection = self.connect(primary=sqlite_database(self.path))['primary']
+        self.assertEqual(self.pragma(connection, 'journal_mode'), 'delete')
+        self.assertEqual(self.pragma(connection, 'synchronous'), 2)
+        self.assertFalse(os.path.exists(self.path + '-wal'))
+        self.assertEqual(self.pragma(connection, 'mmap_size'), 256 * 1024 * 1024)
+        self.assertEqual(self.pragma(connection, 'cache_size'), -64 * 1024)
+        self.assertEqual(self.pragma(connection, 'busy_timeout'), 5000)
+        self.assertEqual(self.pragma(connection, 'temp_store'), 2)
+        self.assertEqual(connection.settings_dict['CONN_MAX_AGE'], 0)
+
+    def test_persistent_connections(self):
+        """Test conn_max_age keeps connections open, with health checks."""
+        settings_dict = sqlite_database(self.path, conn_max_age=600)
+        self.assertEqual(settings_dict['CONN_MAX_AGE'], 600)
+        self.assertTrue(settings_dict['CONN_HEALTH_CHECKS'])
+
+    def test_wal(self):
+        """Test wal=True switches the file to WAL with synchronous=NORMAL."""
+        connection = self.connect(primary=sqlite_database(self.path, wal=True))['primary']
+        self.assertEqual(self.pragma(connection, 'journal_mode'), 'wal')
+        self.assertEqual(self.pragma(connection, 'synchronous'), 1)
+
+    def test_default_profile(self):
+        """Test the default profile leaves SQLite's settings alone."""
+        connection = self.connect(primary=sqlite_database(self.path, profile='default'))['primary']
+        self.assertEqual(self.pragma(connection, 'journal_mode'), 'delete')
+        self.assertEqual(self.pragma(connection, 'synchronous'), 2)
+        self.assertFalse(connection.settings_dict['CONN_HEALTH_CHECKS'])
+
+    def test_read_only_alias(self):
+        """Test the read-only alias reads the primary's rows and refuses writes."""
+        connections = self.connect(
+            primary=sqlite_database(self.path, wal=True), replica=sqlite_database(self.path, read_only=True, wal=True),
+        )
+        with connections['primary'].cursor() as cursor:
+            cursor.execute('CREATE TABLE book (title TEXT)')
+            cursor.execute("INSERT INTO book VALUES ('Emma')")
+        with connections['replica'].cursor() as cursor:
+            cursor.execute('SELECT title FROM book')
+            self.assertEqual(cursor.fetchall(), [('Emma',)])
+            with self.assertRaises(OperationalError):
+                cursor.execute("INSERT INTO book VALUES ('Persuasion')")
+        self.assertEqual(connections['replica'].settings_dict['TEST']['MIRROR'], 'default')
+
@@ -0,0 +1,120 @@
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.test import override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from . import cache, throttling
+from .models import Book, Author
+
+User = get_user_model()
+
+
+@override_settings(API_PROFILING_SAMPLE_RATE=0)
+class ExpandableFieldsTests(APITestCase):
+    """
+    Test suite for '?expand=' on the Book and Author endpoints.
+    """
+    def setUp(self):
+        throttling.local_store.clear()
+        self.user = User.objects.create_user(username='authuser', password='password123')
+        self.author = Author.objects.create(name='Jane Austen')
+        self.book = Book.objects.create(title='Emma', publication_year=1815, author=self.author)
+        self.book_list_url = reverse('book-list')
+        self.book_detail_url = reverse('book-detail', kwargs={'pk': self.book.pk})
+        self.author_detail_url = reverse('author-detail', kwargs={'pk': self.author.pk})
+
+    def test_author_is_an_id_by_default(self):
+        """Test the author stays a plain ID without '?expand='."""
+        response = self.client.get(self.book_detail_url)
+        self.assertEqual(response.data['author'], self.author.id)
+
+    def test_expand_author_on_detail(self):
+        """Test '?expand=author' nests the author on GET /books/<pk>/."""
+        response = self.client.get(f'{self.book_detail_url}?expand=author')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['author'], {
+            'id': self.author.id, 'name': 'Jane Austen',
+        })
+
+    def test_expand_author_on_list(self):
+        """Test '?expand=author' nests the author on GET /books/."""
+        response = self.client.get(f'{self.book_list_url}?expand=author')
+        self.assertEqual(response.data[0]['author']['name'], 'Jane Austen')
+
+    def test_expand_books_on_author(self):
+        """Test '?expand=books' nests the author's books on GET /authors/<pk>/."""
+        response = self.client.get(f'{self.author_detail_url}?expand=books')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([book['title'] for book in response.data['books']], ['Emma'])
+        # Nested books do not expand their author again.
+        self.assertEqual(response.data['books'][0]['author'], self.author.id)
+
+    def test_unknown_expand_is_ignored(self):
+        """Test names that cannot be expanded are ignored."""
+        response = self.client.get(f'{self.book_detail_url}?expand=publisher')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['author'], self.author.id)
+
+    def test_writes_ignore_expand(self):
+        """Test POST with '?expand=author' still accepts the author ID."""
+        self.client.force_authenticate(user=self.user)
+        payload = {'title': 'Persuasion', 'publication_year': 1817, 'author': self.author.id}
+        response = self.client.post(f'{self.book_list_url}?expand=author', payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['author'], self.author.id)
+
+
+@override_settings(API_PROFILING_SAMPLE_RATE=0)
+class ListQueryCountTests(APITestCase):
+    """
+    Query-count regression tests: list endpoints must run a constant number of
+    queries whatever the number of rows, with and without '?expand='.
+    """
+    def setUp(self):
+        throttling.local_store.clear()
+
+    def create_books(self, authors, books_per_author):
+        for author_index in range(authors):
+            author = Author.objects.create(name=f'Author {author_index}')
+            Book.objects.bulk_create([
+                Book(title=f'Book {author_index}-{index}', publication_year=1900 + index, author=author)
+                for index in range(books_per_author)
+            ])
+
+    def assertConstantQueries(self, url, expected):
+        """Checks the query count for url on a small and a ten times larger catalog."""
+        for authors in (2, 20):
+            Book.objects.all().delete()
+            Author.objects.all().delete()
+            self.create_books(authors, books_per_author=3)
+            # Warm up once-per-process lookups such as the search index check,
+            # then drop the cached response so the database path is measured.
+            self.client.get(url)
+            cache.get_cache().clear()
+            with self.assertNumQueries(expected):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_book_list(self):
+        """Test GET /books/ is a single query (the ETag comes from its rows)."""
+        self.assertConstantQueries(reverse('book-list'), 1)
+
+    def test_book_list_expand_author(self):
+        """Test GET /books/?expand=author joins the author into the same query."""
+        self.assertConstantQueries(f"{reverse('book-list')}?expand=author", 1)
+
+    def test_book_list_expand_author_paginated(self):
+        """Test keyset pages with ?expand=author are a single query."""
+        self.assertConstantQueries(f"{reverse('book-list')}?expand=author&page_size=10", 1)
+
+    def test_book_list_search_expand_author(self):
+        """Test searching with ?expand=author stays a single query."""
+        self.assertConstantQueries(f"{reverse('book-list')}?expand=author&search=Author", 1)
+
+    def test_author_list(self):
+        """Test GET /authors/ is a single query."""
+        self.assertConstantQueries(reverse('author-list'), 1)
+
+    def test_author_list_expand_books(self):
+        """Test GET /authors/?expand=books adds exactly one prefetch query."""
+        self.assertConstantQueries(f"{reverse('author-list')}?expand=books", 2)
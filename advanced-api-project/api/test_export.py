@@ -0,0 +1,85 @@
+import csv
+import io
+import json
+
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.test import override_settings
+from django.urls import reverse
+from . import throttling
+from .models import Book, Author
+
+
+@override_settings(API_PROFILING_SAMPLE_RATE=0)
+class StreamingExportTests(APITestCase):
+    """
+    Test suite for the streaming NDJSON/CSV export of GET /books/.
+    """
+    def setUp(self):
+        throttling.local_store.clear()
+        self.austen = Author.objects.create(name='Jane Austen')
+        self.stoker = Author.objects.create(name='Bram Stoker')
+        Book.objects.create(title='Emma', publication_year=1815, author=self.austen)
+        Book.objects.create(title='Dracula', publication_year=1897, author=self.stoker)
+        Book.objects.create(title='Persuasion', publication_year=1817, author=self.austen)
+        self.url = reverse('book-list')
+
+    def get_stream(self, url, **extra):
+        response = self.client.get(url, **extra)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_ndjson_export(self):
+        """Test '?format=ndjson' streams one JSON object per line."""
+        response, body = self.get_stream(f'{self.url}?format=ndjson')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([row['title'] for row in rows], ['Emma', 'Dracula', 'Persuasion'])
+
+    def test_ndjson_by_accept_header(self):
+        """Test the export format can be picked with the Accept header."""
+        _, body = self.get_stream(self.url, HTTP_ACCEPT='application/x-ndjson')
+        self.assertEqual(len(body.splitlines()), 3)
+
+    def test_csv_export(self):
+        """Test '?format=csv' streams a header row and one row per book."""
+        response, body = self.get_stream(f'{self.url}?format=csv&fields=id,title')
+        self.assertIn('books.csv', response['Content-Disposition'])
+        rows = list(csv.reader(io.StringIO(body)))
+        self.assertEqual(rows[0], ['id', 'title'])
+        self.assertEqual([row[1] for row in rows[1:]], ['Emma', 'Dracula', 'Persuasion'])
+
+    def test_csv_flattens_expanded_author(self):
+        """Test an expanded author becomes dotted CSV columns."""
+        _, body = self.get_stream(f'{self.url}?format=csv&fields=title,author&expand=author')
+        rows = list(csv.DictReader(io.StringIO(body)))
+        self.assertEqual(rows[0]['author.name'], 'Jane Austen')
+
+    def test_csv_escapes_formulas(self):
+        """Test text a spreadsheet would run as a formula is prefixed with a quote."""
+        titles = ['=HYPERLINK("http://example.com")', '+1', '-1', '@SUM(A1)', '\tTab', '\rReturn']
+        for title in titles:
+            Book.objects.create(title=title, publication_year=2000, author=self.stoker)
+        _, body = self.get_stream(f'{self.url}?format=csv&fields=title,publication_year&ordering=publication_year')
+        rows = list(csv.reader(io.StringIO(body, newline='')))
+        self.assertEqual([row[0] for row in rows[4:]], ["'" + title for title in titles])
+        # Only text is escaped: numbers and plain titles are left alone.
+        self.assertEqual(rows[1], ['Emma', '1815'])
+
+    def test_empty_csv_has_header(self):
+        """Test an export with no rows still has its header."""
+        _, body = self.get_stream(f'{self.url}?format=csv&fields=id,title&search=zeppelin')
+        self.assertEqual(body.strip(), 'id,title')
+
+    def test_export_applies_filters_search_and_ordering(self):
+        """Test filters, search and ordering apply to the export, pagination does not."""
+        _, body = self.get_stream(f'{self.url}?format=ndjson&author={self.austen.id}&ordering=-title&page_size=1')
+        self.assertEqual([json.loads(line)['title'] for line in body.splitlines()], ['Persuasion', 'Emma'])
+        _, body = self.get_stream(f'{self.url}?format=ndjson&search=Dracula')
+        self.assertEqual([json.loads(line)['title'] for line in body.splitlines()], ['Dracula'])
+
+    def test_export_is_one_query(self):
+        """Test the export reads the rows with a single query, even when expanded."""
+        with self.assertNumQueries(1):
+            self.get_stream(f'{self.url}?format=ndjson&expand=author')
@@ -0,0 +1,88 @@
+from unittest import mock
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from . import fastpath, throttling
+from .models import Book, Author
+from .serializers import AuthorSerializer, BookSerializer
+
+User = get_user_model()
+
+REPRESENTATIONS = [
+    {},
+    {'fields': ['title']},
+    {'fields': ['id', 'author']},
+    {'expand': ['author']},
+    {'fields': ['title', 'author'], 'expand': ['author']},
+]
+
+
+@override_settings(API_PROFILING_SAMPLE_RATE=0)
+class FastPathTests(APITestCase):
+    """
+    Test suite for the compiled list serializer (api.fastpath): its output
+    must be byte for byte what BookSerializer renders field by field.
+    """
+    def setUp(self):
+        throttling.local_store.clear()
+        # Authenticated, so the list cache does not answer instead of the view.
+        self.client.force_authenticate(user=User.objects.create_user(username='authuser'))
+        self.austen = Author.objects.create(name='Jane Austen')
+        self.bronte = Author.objects.create(name='Charlotte Brontë')
+        Book.objects.create(title='Emma', publication_year=1815, author=self.austen)
+        Book.objects.create(title='Jane Eyre', publication_year=1847, author=self.bronte)
+        Book.objects.create(title='Persuasion', publication_year=1817, author=self.austen)
+        self.url = reverse('book-list')
+
+    def render(self, data):
+        return JSONRenderer().render(data)
+
+    def test_identical_to_field_by_field(self):
+        """Test the fast path renders every field set exactly like BookSerializer."""
+        queryset = Book.objects.select_related('author').order_by('id')
+        for kwargs in REPRESENTATIONS:
+            with self.subTest(**kwargs):
+                serializer = BookSerializer(queryset, many=True, **kwargs)
+                self.assertIsNotNone(fastpath.get_plan(serializer.child))
+                expected = [BookSerializer(book, **kwargs).data for book in queryset]
+                self.assertEqual(self.render(serializer.data), self.render(expected))
+
+    @override_settings(TIME_ZONE='America/New_York')
+    def test_identical_in_another_time_zone(self):
+        """Test datetimes go through the DRF field, time zone included."""
+        queryset = Book.objects.order_by('id')
+        expected = [BookSerializer(book).data for book in queryset]
+        self.assertEqual(self.render(BookSerializer(queryset, many=True).data), self.render(expected))
+
+    def test_no_plan_for_to_many_relations(self):
+        """Test serializers that nest a to-many relation fall back to DRF."""
+        self.assertIsNone(fastpath.get_plan(AuthorSerializer(expand=['books'])))
+        self.assertIsNotNone(fastpath.get_plan(AuthorSerializer()))
+
+    def test_list_views_identical(self):
+        """Test GET /books/ answers the same bytes with and without the fast path."""
+        urls = [
+            self.url,
+            f'{self.url}?expand=author',
+            f'{self.url}?fields=title,author&expand=author',
+            f'{self.url}?page_size=2&ordering=-publication_year',
+            f'{self.url}?search=jane',
+            f'{self.url}?format=ndjson&expand=author',
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                fast = self.client.get(url)
+                with mock.patch('api.fastpath.get_plan', return_value=None):
+                    slow = self.client.get(url)
+                self.assertEqual(fast.getvalue(), slow.getvalue())
+
+    def test_keyset_pages_from_values_rows(self):
+        """Test keyset cursors work when pages are values() rows."""
+        response = self.client.get(f'{self.url}?page_size=2&ordering=title')
+        titles = [book['title'] for book in response.data['results']]
+        response = self.client.get(response.data['next'])
+        titles += [book['title'] for book in response.data['results']]
+        self.assertEqual(titles, ['Emma', 'Jane Eyre', 'Persuasion'])
@@ -0,0 +1,73 @@
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.test import override_settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from . import throttling
+from .models import Book, Author
+
+
+@override_settings(API_PROFILING_SAMPLE_RATE=0)
+class SparseFieldsTests(APITestCase):
+    """
+    Test suite for '?fields=' on the Book and Author endpoints: the output is
+    narrowed and the unused columns are left out of the SQL.
+    """
+    def setUp(self):
+        throttling.local_store.clear()
+        self.author = Author.objects.create(name='Jane Austen')
+        self.book = Book.objects.create(title='Emma', publication_year=1815, author=self.author)
+        Book.objects.create(title='Persuasion', publication_year=1817, author=self.author)
+        self.list_url = reverse('book-list')
+        self.detail_url = reverse('book-detail', kwargs={'pk': self.book.pk})
+
+    def get_with_sql(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, ' '.join(query['sql'] for query in queries.captured_queries)
+
+    def test_list_fields(self):
+        """Test '?fields=id,title' narrows the list output and the SELECT."""
+        response, sql = self.get_with_sql(f'{self.list_url}?fields=id,title')
+        self.assertEqual(response.data[0], {'id': self.book.id, 'title': 'Emma'})
+        self.assertNotIn('publication_year', sql)
+        self.assertNotIn('author_id', sql)
+
+    def test_detail_fields(self):
+        """Test '?fields=title' narrows GET /books/<pk>/."""
+        response, sql = self.get_with_sql(f'{self.detail_url}?fields=title')
+        self.assertEqual(response.data, {'title': 'Emma'})
+        self.assertNotIn('publication_year', sql)
+
+    def test_unknown_fields_are_ignored(self):
+        """Test unknown names are dropped and an empty selection returns every field."""
+        response = self.client.get(f'{self.detail_url}?fields=title,isbn')
+        self.assertEqual(response.data, {'title': 'Emma'})
+        response = self.client.get(f'{self.detail_url}?fields=isbn')
+        self.assertEqual(set(response.data), {'id', 'title', 'publication_year', 'author'})
+
+    def test_fields_with_ordering_and_pagination(self):
+        """Test keyset pages still work when the ordering column is not requested."""
+        response, _ = self.get_with_sql(f'{self.list_url}?fields=title&ordering=-publication_year&page_size=1')
+        self.assertEqual(response.data['results'], [{'title': 'Persuasion'}])
+        response, _ = self.get_with_sql(response.data['next'])
+        self.assertEqual(response.data['results'], [{'title': 'Emma'}])
+
+    def test_fields_with_expand(self):
+        """Test '?fields=' and '?expand=' combine, and unrequested expansions are skipped."""
+        response = self.client.get(f'{self.detail_url}?fields=title,author&expand=author')
+        self.assertEqual(response.data['title'], 'Emma')
+        self.assertEqual(response.data['author']['name'], 'Jane Austen')
+        self.assertEqual(set(response.data), {'title', 'author'})
+        response, sql = self.get_with_sql(f'{self.detail_url}?fields=title&expand=author')
+        self.assertEqual(response.data, {'title': 'Emma'})
+        self.assertNotIn('api_author', sql)
+
+    def test_author_fields_with_expanded_books(self):
+        """Test an expandable field can be selected with '?fields='."""
+        url = reverse('author-detail', kwargs={'pk': self.author.pk})
+        response = self.client.get(f'{url}?fields=books&expand=books')
+        self.assertEqual(list(response.data), ['books'])
+        self.assertEqual(len(response.data['books']), 2)
@@ -0,0 +1,118 @@
+import re
+
+from rest_framework.test import APITestCase
+from django.test import override_settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from . import throttling
+from .models import Book, Author
+
+User = get_user_model()
+
+FILTERS = ['', 'publication_year=1843', 'author={author}', 'author={author}&publication_year=1843']
+ORDERINGS = ['', 'title', '-title', 'publication_year', '-publication_year']
+
+
+class QueryPlanTestMixin:
+    """
+    Test helpers that EXPLAIN captured queries (EXPLAIN QUERY PLAN on SQLite)
+    and fail on full table scans, index scans included.
+    """
+    def explain(self, sql):
+        """Returns the plan lines for `sql`."""
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                return [row[-1] for row in cursor.fetchall()]
+            if connection.vendor == 'postgresql':
+                # Small test tables make a sequential scan the cheapest plan
+                # even when an index fits; only report scans nothing can avoid.
+                cursor.execute('SET enable_seqscan = off')
+                try:
+                    cursor.execute(f'EXPLAIN {sql}')
+                    return [row[0] for row in cursor.fetchall()]
+                finally:
+                    cursor.execute('SET enable_seqscan = on')
+            self.skipTest(f'No query plan check for {connection.vendor}')
+
+    def full_table_scans(self, sql, plan):
+        """
+        The scans in `plan` that may read the whole table. On SQLite that is
+        every SCAN (of the table or of an index, covering or not) except
+        walks that stop at the LIMIT: the table in its primary key order, or
+        an index in the order of the ORDER BY (no temporary B-tree sorts the
+        rows) when there is no WHERE clause to skip rows with.
+        """
+        limited = re.search(r' LIMIT \d+$', sql) is not None
+        sorted_by_plan = not any('USE TEMP B-TREE' in line for line in plan)
+        scans = []
+        for line in plan:
+            if connection.vendor == 'postgresql':
+                if 'Seq Scan on' in line:
+                    scans.append(line.strip())
+                continue
+            match = re.match(r'SCAN (\w+)( USING (?:COVERING )?INDEX \w+)?', line.strip())
+            if not match:
+                continue
+            table, index = match.groups()
+            if index is None:
+                # SQLite stores a table in its primary key order, so walking
+                # it by the primary key stops at the LIMIT. values() queries
+                # order by position ('ORDER BY 1') instead.
+                if re.search(rf'ORDER BY "{table}"\."id" ASC.* LIMIT \d+$', sql):
+                    continue
+                if re.match(rf'SELECT "{table}"\."id" AS "id",.* ORDER BY 1 ASC.* LIMIT \d+$', sql):
+                    continue
+            elif limited and sorted_by_plan and ' WHERE ' not in sql:
+                continue
+            scans.append(line.strip())
+        return scans
+
+    def assertNoFullTableScan(self, queries):
+        """Fails if the plan of any captured query has a full table scan."""
+        for query in queries:
+            sql = query['sql']
+            if not sql.startswith('SELECT'):
+                continue
+            plan = self.explain(sql)
+            scans = self.full_table_scans(sql, plan)
+            self.assertFalse(scans, f'Full table scan in:\n{sql}\nPlan:\n' + '\n'.join(plan))
+
+
+@override_settings(API_PROFILING_SAMPLE_RATE=0)
+class BookQueryPlanTests(QueryPlanTestMixin, APITestCase):
+    """
+    Query plan regression tests: every filter/ordering combination of
+    GET /books/, on the first and on a following keyset page, must be served
+    by an index.
+    """
+    def setUp(self):
+        throttling.local_store.clear()
+        # Authenticated, so the list cache does not answer instead of the database.
+        self.client.force_authenticate(user=User.objects.create_user(username='authuser'))
+        authors = Author.objects.bulk_create([Author(name=f'Author {index}') for index in range(20)])
+        Book.objects.bulk_create([
+            Book(title=f'Book {index % 97}', publication_year=1800 + index % 100, author=authors[index % 20])
+            for index in range(2000)
+        ])
+        self.author = authors[3]
+        with connection.cursor() as cursor:
+            # Give the SQLite planner statistics, as a production database has.
+            if connection.vendor == 'sqlite':
+                cursor.execute('ANALYZE')
+
+    def test_filter_and_ordering_combinations(self):
+        """Test no filter/ordering combination of the Book list scans the whole table."""
+        for filters in FILTERS:
+            for ordering in ORDERINGS:
+                query = filters.format(author=self.author.id)
+                url = f"{reverse('book-list')}?{query}&ordering={ordering}&page_size=10"
+                with self.subTest(filters=query, ordering=ordering):
+                    with CaptureQueriesContext(connection) as first_page:
+                        response = self.client.get(url)
+                    self.assertNoFullTableScan(first_page.captured_queries)
+                    with CaptureQueriesContext(connection) as next_page:
+                        self.client.get(response.data['next'])
+                    self.assertNoFullTableScan(next_page.captured_queries)
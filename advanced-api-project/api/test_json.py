@@ -0,0 +1,92 @@
+import datetime
+import decimal
+import io
+import uuid
+from unittest import mock
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from . import throttling
+from .models import Book, Author
+from .parsers import FastJSONParser
+from .renderers import FastJSONRenderer
+
+PAYLOADS = [
+    {'when': timezone.now(), 'day': datetime.date(1815, 12, 23), 'at': datetime.time(9, 30, 15, 250)},
+    {'naive': datetime.datetime(2024, 2, 29, 23, 59, 59, 999999), 'span': datetime.timedelta(days=1, seconds=3)},
+    {'price': decimal.Decimal('12.50'), 'tiny': decimal.Decimal('0.00001'), 'huge': decimal.Decimal('1E+20')},
+    {'floats': [0.1, 1 / 3, 1e-05, 1e16, 123.0, -0.0], 'ints': [0, -1, 2 ** 63, 2 ** 70]},
+    {'id': uuid.UUID('12345678-1234-5678-1234-567812345678'), 'none': None, 'flags': [True, False]},
+    {'text': 'Brontë \u2028\u2029 "quoted" \\ \x01 😀', 1: 'integer key'},
+    [{'id': index, 'title': f'Book {index}', 'price': decimal.Decimal(index) / 4} for index in range(2500)],
+    [],
+    'plain string',
+]
+
+
+@override_settings(API_PROFILING_SAMPLE_RATE=0)
+class FastJSONTests(APITestCase):
+    """
+    Test suite for FastJSONRenderer / FastJSONParser: byte for byte the
+    output (and parse results) of DRF's JSONRenderer / JSONParser.
+    """
+    def setUp(self):
+        throttling.local_store.clear()
+
+    def test_render_identical_to_json_renderer(self):
+        """Test dates, decimals, floats, large ints and large lists render like JSONRenderer."""
+        for payload in PAYLOADS:
+            with self.subTest(payload=repr(payload)[:60]):
+                self.assertEqual(FastJSONRenderer().render(payload), JSONRenderer().render(payload))
+
+    def test_render_without_orjson(self):
+        """Test the renderer falls back to the stdlib encoder when orjson is missing."""
+        with mock.patch('api.renderers.orjson', None):
+            for payload in PAYLOADS:
+                self.assertEqual(FastJSONRenderer().render(payload), JSONRenderer().render(payload))
+
+    def test_render_indented(self):
+        """Test 'indent=' in the Accept header is honoured like JSONRenderer does."""
+        media_type = 'application/json; indent=4'
+        payload = PAYLOADS[0]
+        self.assertEqual(
+            FastJSONRenderer().render(payload, media_type), JSONRenderer().render(payload, media_type),
+        )
+
+    def test_list_response_identical(self):
+        """Test GET /books/ answers the same bytes as with DRF's JSONRenderer."""
+        author = Author.objects.create(name='Jane Austen')
+        Book.objects.create(title='Emma', publication_year=1815, author=author)
+        url = f"{reverse('book-list')}?expand=author"
+        response = self.client.get(url)
+        self.assertEqual(response.content, JSONRenderer().render(response.data))
+
+    def test_parse_identical_to_json_parser(self):
+        """Test bodies parse to the same values, big integers included."""
+        bodies = [
+            b'{"title": "Emma", "publication_year": 1815, "author": 1}',
+            b'[1.5, -0, 1e-7, 12345678901234567890123, "\\u00e9\\ud83d\\ude00"]',
+            b'{"a": 1, "a": 2}',
+            '"Brontë"'.encode(),
+        ]
+        for body in bodies:
+            with self.subTest(body=body):
+                expected = JSONParser().parse(io.BytesIO(body))
+                self.assertEqual(FastJSONParser().parse(io.BytesIO(body)), expected)
+                with mock.patch('api.parsers.orjson', None):
+                    self.assertEqual(FastJSONParser().parse(io.BytesIO(body)), expected)
+
+    def test_parse_errors_identical(self):
+        """Test invalid bodies raise JSONParser's ParseError message."""
+        for body in [b'{"title": ', b'[NaN]', b'\xef\xbb\xbf{}']:
+            with self.subTest(body=body):
+                with self.assertRaises(ParseError) as expected:
+                    JSONParser().parse(io.BytesIO(body))
+                with self.assertRaises(ParseError) as raised:
+                    FastJSONParser().parse(io.BytesIO(body))
+                self.assertEqual(str(raised.exception.detail), str(expected.exception.detail))
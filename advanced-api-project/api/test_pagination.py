@@ -0,0 +1,119 @@
+import base64
+import json
+from urllib.parse import parse_qs, urlparse
+
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.test import override_settings
+from django.urls import reverse
+from . import throttling
+from .models import Book, Author
+
+
+@override_settings(API_PROFILING_SAMPLE_RATE=0)
+class BookKeysetPaginationTests(APITestCase):
+    """
+    Test suite for the keyset (cursor) pagination mode of BookListCreateView.
+    Walks the list page by page and checks that every book is returned exactly
+    once, in order, for the default ordering and the '?ordering=' options.
+    """
+    def setUp(self):
+        throttling.local_store.clear()
+        self.list_url = reverse('book-list')
+        self.author_austen = Author.objects.create(name='Jane Austen')
+        self.author_stoker = Author.objects.create(name='Bram Stoker')
+
+        # Repeated titles and years make sure ties are broken by id.
+        titles = ['Emma', 'Dracula', 'Persuasion', 'Emma', 'Lady Susan', 'Dracula', 'Sanditon']
+        years = [1815, 1897, 1817, 1815, 1871, 1897, 1925]
+        self.books = [
+            Book.objects.create(
+                title=title,
+                publication_year=year,
+                author=self.author_austen if index % 2 == 0 else self.author_stoker,
+            )
+            for index, (title, year) in enumerate(zip(titles, years))
+        ]
+
+    def walk(self, url):
+        """Follows 'next' links from url and returns the ids of every page."""
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append([book['id'] for book in response.data['results']])
+            url = response.data['next']
+        return pages
+
+    def test_unpaginated_without_page_size(self):
+        """Test GET /books/ keeps returning the plain list without '?page_size='."""
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), len(self.books))
+
+    def test_default_ordering_pages(self):
+        """Test paging by the default 'id' ordering returns every book once, in order."""
+        pages = self.walk(f'{self.list_url}?page_size=3')
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        ids = [book_id for page in pages for book_id in page]
+        self.assertEqual(ids, [book.id for book in self.books])
+
+    def test_ordering_by_title_with_ties(self):
+        """Test paging by '-title' breaks ties on id and skips no rows."""
+        pages = self.walk(f'{self.list_url}?page_size=2&ordering=-title')
+        ids = [book_id for page in pages for book_id in page]
+        # The appended id follows the direction of the ordering, so equal
+        # titles come by descending id (one backwards walk of the index).
+        expected = sorted(self.books, key=lambda book: (book.title, book.id), reverse=True)
+        self.assertEqual(ids, [book.id for book in expected])
+
+    def test_ordering_by_publication_year(self):
+        """Test paging by 'publication_year' returns books sorted by year, then id."""
+        pages = self.walk(f'{self.list_url}?page_size=2&ordering=publication_year')
+        ids = [book_id for page in pages for book_id in page]
+        expected = sorted(self.books, key=lambda book: (book.publication_year, book.id))
+        self.assertEqual(ids, [book.id for book in expected])
+
+    def test_pagination_respects_filters(self):
+        """Test cursors keep '?author=' filtering on every page."""
+        pages = self.walk(f'{self.list_url}?page_size=2&author={self.author_austen.id}')
+        ids = [book_id for page in pages for book_id in page]
+        self.assertEqual(ids, [book.id for book in self.books if book.author == self.author_austen])
+
+    def test_pagination_respects_search(self):
+        """Test cursors keep '?search=' on every page."""
+        pages = self.walk(f'{self.list_url}?page_size=1&search=Dracula')
+        self.assertEqual(pages, [[self.books[1].id], [self.books[5].id]])
+
+    def test_previous_link_returns_previous_page(self):
+        """Test following 'previous' from the second page returns the first page."""
+        first = self.client.get(f'{self.list_url}?page_size=3&ordering=title')
+        self.assertIsNone(first.data['previous'])
+        second = self.client.get(first.data['next'])
+        previous = self.client.get(second.data['previous'])
+        self.assertEqual(previous.data['results'], first.data['results'])
+        self.assertEqual(previous.data['next'], first.data['next'])
+
+    def test_cursor_rejected_for_other_ordering(self):
+        """Test a cursor issued for one ordering cannot be replayed with another."""
+        first = self.client.get(f'{self.list_url}?page_size=3&ordering=title')
+        response = self.client.get(f"{first.data['next']}&ordering=publication_year")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_malformed_cursor_rejected(self):
+        """Test a garbage cursor returns 404 instead of a server error."""
+        response = self.client.get(f'{self.list_url}?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_tampered_cursor_rejected(self):
+        """Test a well-formed cursor holding values of the wrong type returns 404 instead of a server error."""
+        first = self.client.get(f'{self.list_url}?page_size=3&ordering=publication_year')
+        token = parse_qs(urlparse(first.data['next']).query)['cursor'][0]
+        payload = json.loads(base64.urlsafe_b64decode(token))
+        for values in (['1815', 'not-an-id'], ['not-a-year', 1], [[1815], {'id': 1}]):
+            with self.subTest(values=values):
+                payload['v'] = values
+                forged = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+                for url in (self.list_url, reverse('async-book-list')):
+                    response = self.client.get(f'{url}?ordering=publication_year&cursor={forged}')
+                    self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,44 @@
+import json
+
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.test import override_settings
+from django.urls import reverse
+from . import throttling
+from .models import Book, Author
+
+
+class ProfilingMiddlewareTests(APITestCase):
+    """
+    Test suite for the sampled request profiling: Server-Timing header and
+    the JSON log line.
+    """
+    def setUp(self):
+        throttling.local_store.clear()
+        author = Author.objects.create(name='Jane Austen')
+        Book.objects.create(title='Emma', publication_year=1815, author=author)
+        Book.objects.create(title='Persuasion', publication_year=1817, author=author)
+        self.url = reverse('book-list')
+
+    @override_settings(API_PROFILING_SAMPLE_RATE=1)
+    def test_sampled_request(self):
+        """Test a sampled request reports its queries, timings and size."""
+        with self.assertLogs('api.profiling', level='INFO') as logs:
+            response = self.client.get(f'{self.url}?expand=author&ordering=title')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        metrics = [metric.split(';')[0] for metric in response['Server-Timing'].split(', ')]
+        self.assertEqual(metrics, ['sql', 'serialize', 'render', 'total'])
+        record = json.loads(logs.records[0].getMessage())
+        # The page (the ETag comes from its rows).
+        self.assertEqual(record['queries'], 1)
+        self.assertEqual(record['size'], len(response.content))
+        self.assertEqual(record['path'], self.url)
+        self.assertGreater(record['serialize_ms'], 0)
+        self.assertGreater(record['render_ms'], 0)
+        self.assertGreaterEqual(record['total_ms'], record['sql_ms'] + record['serialize_ms'] + record['render_ms'])
+
+    @override_settings(API_PROFILING_SAMPLE_RATE=0)
+    def test_unsampled_request(self):
+        """Test requests outside the sample are left alone."""
+        response = self.client.get(self.url)
+        self.assertNotIn('Server-Timing', response)
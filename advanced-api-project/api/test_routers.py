@@ -0,0 +1,150 @@
+import asyncio
+import time
+
+from django.db import router
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from . import routers, throttling
+from .models import Author, Book
+
+User = get_user_model()
+
+
+def route_reads(request):
+    """A view that reports where Book reads go before and after a write."""
+    before = router.db_for_read(Book)
+    if request.GET.get('write'):
+        router.db_for_write(Book)
+    return HttpResponse(f'{before} {router.db_for_read(Book)}')
+
+
+@override_settings(DATABASE_REPLICAS=['replica1', 'replica2'])
+class ReplicaRouterTests(SimpleTestCase):
+    """
+    Test suite for ReplicaRouter and ReplicaMiddleware: which database reads
+    and writes go to, within and outside of requests.
+    """
+    def setUp(self):
+        routers.get_sticky_cache().clear()
+        self.factory = RequestFactory()
+        self.middleware = routers.ReplicaMiddleware(route_reads)
+
+    def test_safe_requests_read_from_replicas(self):
+        """Test GET, HEAD and OPTIONS read from a replica."""
+        for method in ['get', 'head', 'options']:
+            with self.subTest(method=method):
+                response = self.middleware(getattr(self.factory, method)('/'))
+                before, after = response.content.decode().split()
+                self.assertIn(before, ['replica1', 'replica2'])
+                self.assertNotIn(routers.STICKY_COOKIE, response.cookies)
+
+    def test_unsafe_requests_use_primary_and_pin(self):
+        """Test POST reads from 'default', and pins the client for the sticky window."""
+        with override_settings(DATABASE_REPLICA_STICKY_SECONDS=30):
+            response = self.middleware(self.factory.post('/'))
+        self.assertEqual(response.content, b'default default')
+        cookie = response.cookies[routers.STICKY_COOKIE]
+        self.assertEqual(cookie['max-age'], 30)
+        self.assertAlmostEqual(float(cookie.value), time.time() + 30, delta=5)
+
+    def test_write_during_safe_request(self):
+        """Test a write in a GET moves the rest of the request to 'default' and pins the client."""
+        response = self.middleware(self.factory.get('/', {'write': 1}))
+        before, after = response.content.decode().split()
+        self.assertIn(before, ['replica1', 'replica2'])
+        self.assertEqual(after, 'default')
+        self.assertIn(routers.STICKY_COOKIE, response.cookies)
+
+    def test_pinned_client_reads_from_primary(self):
+        """Test a client with an unexpired cookie reads from 'default', and from replicas once it expires."""
+        request = self.factory.get('/')
+        request.COOKIES[routers.STICKY_COOKIE] = str(time.time() + 5)
+        self.assertEqual(self.middleware(request).content, b'default default')
+        for value in [str(time.time() - 1), 'not a time']:
+            request = self.factory.get('/')
+            request.COOKIES[routers.STICKY_COOKIE] = value
+            self.assertNotIn(b'default', self.middleware(request).content)
+
+    def test_credentials_pin_without_cookie(self):
+        """Test a client that wrote with an Authorization header reads from 'default' without sending the cookie."""
+        self.middleware(self.factory.post('/', HTTP_AUTHORIZATION='Token writer'))
+        response = self.middleware(self.factory.get('/', HTTP_AUTHORIZATION='Token writer'))
+        self.assertEqual(response.content, b'default default')
+        # Other credentials, and anonymous clients, still read from replicas.
+        for headers in [{'HTTP_AUTHORIZATION': 'Token reader'}, {}]:
+            response = self.middleware(self.factory.get('/', **headers))
+            self.assertNotIn(b'default', response.content)
+
+    def test_credentials_pin_is_a_cache_entry(self):
+        """Test the credentials pin is a cache entry keyed by their digest, and ends with it."""
+        with override_settings(DATABASE_REPLICA_STICKY_SECONDS=30):
+            self.middleware(self.factory.post('/', HTTP_AUTHORIZATION='Token writer'))
+        key = self.middleware.credentials_key(self.factory.get('/', HTTP_AUTHORIZATION='Token writer'))
+        self.assertIsNotNone(routers.get_sticky_cache().get(key))
+        # The key is a digest: the credentials themselves are not stored.
+        self.assertNotIn('writer', key)
+        routers.get_sticky_cache().delete(key)
+        response = self.middleware(self.factory.get('/', HTTP_AUTHORIZATION='Token writer'))
+        self.assertNotIn(b'default', response.content)
+
+    def test_async_requests(self):
+        """Test the middleware routes async requests the same way."""
+        async def view(request):
+            return route_reads(request)
+
+        middleware = routers.ReplicaMiddleware(view)
+        response = asyncio.run(middleware(self.factory.get('/')))
+        self.assertNotIn(b'default', response.content)
+        response = asyncio.run(middleware(self.factory.post('/', HTTP_AUTHORIZATION='Token writer')))
+        self.assertEqual(response.content, b'default default')
+        response = asyncio.run(middleware(self.factory.get('/', HTTP_AUTHORIZATION='Token writer')))
+        self.assertEqual(response.content, b'default default')
+
+    def test_outside_requests(self):
+        """Test reads outside of a request (commands, shell) and writes always use 'default'."""
+        self.assertEqual(router.db_for_read(Book), 'default')
+        self.assertEqual(router.db_for_write(Book), 'default')
+
+    def test_instance_hint(self):
+        """Test related reads follow the database their object was loaded from."""
+        author = Author(name='Jane Austen')
+        author._state.db = 'replica2'
+        self.assertEqual(router.db_for_read(Book, instance=author), 'replica2')
+
+    def test_migrations_only_on_primary(self):
+        """Test replicas are never migrated."""
+        self.assertFalse(router.allow_migrate('replica1', 'api', model_name='book'))
+        self.assertTrue(router.allow_migrate('default', 'api', model_name='book'))
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas(self):
+        """Test everything stays on 'default', without cookies, when no replica is configured."""
+        response = self.middleware(self.factory.post('/'))
+        self.assertEqual(response.content, b'default default')
+        self.assertNotIn(routers.STICKY_COOKIE, response.cookies)
+        self.assertEqual(self.middleware(self.factory.get('/')).content, b'default default')
+
+
+@override_settings(DATABASE_REPLICAS=['read'], API_PROFILING_SAMPLE_RATE=0)
+class ReplicaStickinessViewTests(APITestCase):
+    """Test suite for read-your-writes on the Book API."""
+    def setUp(self):
+        throttling.local_store.clear()
+        self.user = User.objects.create_user(username='authuser', password='password123')
+        self.author = Author.objects.create(name='Jane Austen')
+
+    def test_write_pins_client(self):
+        """Test creating a book pins the client, whose next reads then come from 'default'."""
+        self.client.force_authenticate(self.user)
+        response = self.client.post(
+            reverse('book-list'), {'title': 'Emma', 'publication_year': 1815, 'author': self.author.id}, format='json',
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertIn(routers.STICKY_COOKIE, response.cookies)
+        # The test client sends the cookie back: this read must not touch the replica.
+        response = self.client.get(reverse('book-detail', kwargs={'pk': response.data['id']}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['title'], 'Emma')
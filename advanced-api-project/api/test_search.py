@@ -0,0 +1,92 @@
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.test import override_settings
+from django.urls import reverse
+from . import throttling
+from .models import Book, Author
+
+
+@override_settings(API_PROFILING_SAMPLE_RATE=0)
+class FullTextSearchTests(APITestCase):
+    """
+    Test suite for the full-text '?search=' backend of BookListCreateView:
+    relevance ranking, prefix matching and keeping the index current.
+    """
+    def setUp(self):
+        throttling.local_store.clear()
+        self.list_url = reverse('book-list')
+        self.author_stoker = Author.objects.create(name='Bram Stoker')
+        self.author_austen = Author.objects.create(name='Jane Austen')
+        # Created first, so it sorts first by id, but the longer title makes it
+        # a weaker match for 'Dracula' than the book below.
+        self.book_guest = Book.objects.create(
+            title="Dracula's Guest and Other Weird Stories",
+            publication_year=1914,
+            author=self.author_stoker,
+        )
+        self.book_dracula = Book.objects.create(title='Dracula', publication_year=1897, author=self.author_stoker)
+        self.book_emma = Book.objects.create(title='Emma', publication_year=1815, author=self.author_austen)
+
+    def search(self, term, extra=''):
+        response = self.client.get(f'{self.list_url}?search={term}{extra}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [book['title'] for book in response.data]
+
+    def test_results_ranked_by_relevance(self):
+        """Test the closest match comes first when no '?ordering=' is given."""
+        self.assertEqual(self.search('Dracula'), ['Dracula', "Dracula's Guest and Other Weird Stories"])
+
+    def test_explicit_ordering_wins_over_relevance(self):
+        """Test '?ordering=' still decides the order of search results."""
+        self.assertEqual(
+            self.search('Dracula', '&ordering=publication_year'),
+            ['Dracula', "Dracula's Guest and Other Weird Stories"],
+        )
+        self.assertEqual(
+            self.search('Dracula', '&ordering=-publication_year'),
+            ["Dracula's Guest and Other Weird Stories", 'Dracula'],
+        )
+
+    def test_prefix_and_multiple_terms(self):
+        """Test terms match word prefixes and are combined with AND."""
+        self.assertEqual(self.search('Aust'), ['Emma'])
+        # Word prefixes only, unlike icontains.
+        self.assertEqual(self.search('mma'), [])
+        self.assertEqual(self.search('Stoker weird'), ["Dracula's Guest and Other Weird Stories"])
+
+    def test_search_syntax_is_escaped(self):
+        """Test FTS operators and quotes in the search are treated as text."""
+        for term in ['"', 'NEAR(', 'title:Emma', 'Emma OR']:
+            response = self.client.get(self.list_url, {'search': term})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_index_follows_book_writes(self):
+        """Test created, renamed and deleted books are reflected in the results."""
+        book = Book.objects.create(title='Persuasion', publication_year=1817, author=self.author_austen)
+        self.assertEqual(self.search('Persuasion'), ['Persuasion'])
+        book.title = 'Sanditon'
+        book.save()
+        self.assertEqual(self.search('Persuasion'), [])
+        self.assertEqual(self.search('Sanditon'), ['Sanditon'])
+        book.delete()
+        self.assertEqual(self.search('Sanditon'), [])
+
+    def test_index_follows_bulk_writes(self):
+        """Test bulk_create() and QuerySet.update() are indexed too."""
+        Book.objects.bulk_create([Book(title='Lady Susan', publication_year=1871, author=self.author_austen)])
+        self.assertEqual(self.search('Susan'), ['Lady Susan'])
+        Book.objects.filter(title='Lady Susan').update(title='The Watsons')
+        self.assertEqual(self.search('Watsons'), ['The Watsons'])
+
+    def test_index_follows_author_writes(self):
+        """Test renaming an author updates the search on their books."""
+        self.author_austen.name = 'J. Austen-Leigh'
+        self.author_austen.save()
+        self.assertEqual(self.search('Leigh'), ['Emma'])
+        self.author_austen.delete()
+        self.assertEqual(self.search('Leigh'), [])
+
+    @override_settings(BOOK_SEARCH_BACKEND='api.search.LikeSearchBackend')
+    def test_icontains_backend(self):
+        """Test the icontains backend can be selected and matches substrings."""
+        self.assertEqual(self.search('racul'), ["Dracula's Guest and Other Weird Stories", 'Dracula'])
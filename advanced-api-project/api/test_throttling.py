@@ -0,0 +1,117 @@
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.settings import api_settings
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from . import throttling
+from .models import Author
+
+User = get_user_model()
+
+THROTTLE_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'books': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'books'},
+    'throttle': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'throttle'},
+}
+
+
+def rest_framework_with(**rates):
+    return {**api_settings.user_settings, 'DEFAULT_THROTTLE_RATES': rates}
+
+
+class ThrottleAlgorithmTests(SimpleTestCase):
+    """
+    Test suite for the SlidingWindow and TokenBucket algorithms, on both
+    stores, driven by an explicit clock.
+    """
+    def stores(self):
+        caches['default'].clear()
+        return [throttling.LocalStore(), throttling.CacheStore('default')]
+
+    def test_sliding_window(self):
+        """Test N hits pass per window, and the previous window still counts while it slides out."""
+        for store in self.stores():
+            with self.subTest(store=type(store).__name__):
+                algorithm = throttling.SlidingWindow(3, 60)
+                self.assertEqual([algorithm.hit(store, 'k', 600 + second) for second in range(3)], [0, 0, 0])
+                wait = algorithm.hit(store, 'k', 603)
+                self.assertAlmostEqual(wait, 57)
+                # Half way into the next window, half of the 3 previous hits still count.
+                self.assertEqual(algorithm.hit(store, 'k', 690), 0)
+                self.assertGreater(algorithm.hit(store, 'k', 690), 0)
+                # Rejected hits are not counted.
+                self.assertEqual(store.get('k:11'), 1)
+
+    def test_token_bucket(self):
+        """Test a full bucket allows a burst of N, then refills at N per period."""
+        for store in self.stores():
+            with self.subTest(store=type(store).__name__):
+                algorithm = throttling.TokenBucket(4, 60)
+                self.assertEqual([algorithm.hit(store, 'k', 1000) for _ in range(4)], [0, 0, 0, 0])
+                self.assertAlmostEqual(algorithm.hit(store, 'k', 1000), 15)
+                self.assertAlmostEqual(algorithm.hit(store, 'k', 1010), 5)
+                self.assertEqual(algorithm.hit(store, 'k', 1015), 0)
+                self.assertGreater(algorithm.hit(store, 'k', 1015), 0)
+                # Idle for longer than a period: full again.
+                self.assertEqual([algorithm.hit(store, 'k', 2000) for _ in range(4)], [0, 0, 0, 0])
+
+
+@override_settings(API_PROFILING_SAMPLE_RATE=0)
+class ThrottleViewTests(APITestCase):
+    """
+    Test suite for the throttle classes on the Book API: per-scope rates,
+    429 with Retry-After, and counters shared through a cache store.
+    """
+    def setUp(self):
+        throttling.local_store.clear()
+        self.addCleanup(throttling.local_store.clear)
+        self.user = User.objects.create_user(username='authuser', password='password123')
+        self.author = Author.objects.create(name='Jane Austen')
+
+    def get_statuses(self, url, count, **kwargs):
+        return [self.client.get(url, **kwargs).status_code for _ in range(count)]
+
+    @override_settings(REST_FRAMEWORK=rest_framework_with(anon_read='3/min'))
+    def test_anonymous_reads_throttled_per_address(self):
+        """Test anonymous GETs get 429 past the rate, per client address, with Retry-After."""
+        url = reverse('book-list')
+        self.assertEqual(self.get_statuses(url, 3), [200, 200, 200])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(self.get_statuses(url, 1, REMOTE_ADDR='10.0.0.2'), [200])
+        # Authenticated reads are not counted by this scope.
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.get_statuses(url, 2), [200, 200])
+
+    @override_settings(REST_FRAMEWORK=rest_framework_with(user_write='2/min', bulk='1/min'))
+    def test_writes_and_bulk_throttled_per_user(self):
+        """Test writes count per user, and bulk requests have their own, lower rate."""
+        self.client.force_authenticate(self.user)
+        payload = {'title': 'Emma', 'publication_year': 1815, 'author': self.author.id}
+        statuses = [self.client.post(reverse('book-list'), payload, format='json').status_code for _ in range(3)]
+        self.assertEqual(statuses, [201, 201, 429])
+
+        throttling.local_store.clear()
+        bulk_url = reverse('book-bulk')
+        statuses = [self.client.post(bulk_url, [payload], format='json').status_code for _ in range(2)]
+        self.assertEqual(statuses, [201, 429])
+
+    @override_settings(
+        REST_FRAMEWORK=rest_framework_with(anon_read='2/min'), API_THROTTLE_STORE='throttle', CACHES=THROTTLE_CACHES,
+    )
+    def test_cache_store(self):
+        """Test counters kept in a cache are seen by every worker: nothing is kept in the process."""
+        url = reverse('book-list')
+        self.assertEqual(self.get_statuses(url, 3), [200, 200, 429])
+        self.assertEqual(len(throttling.local_store.entries), 0)
+        caches['throttle'].clear()
+        self.assertEqual(self.get_statuses(url, 1), [200])
+
+    @override_settings(REST_FRAMEWORK=rest_framework_with(anon_read='1/min'))
+    def test_async_view_throttled(self):
+        """Test the async list view applies the same throttles."""
+        url = reverse('async-book-list')
+        self.assertEqual(self.get_statuses(url, 2), [200, 429])
@@ -1,12 +1,15 @@
 from rest_framework.test import APITestCase
 from rest_framework import status
+from django.test import override_settings
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 # Assuming models are defined in .models and serializers in .serializers
+from . import throttling
 from .models import Book, Author 
 
 User = get_user_model()
 
+@override_settings(API_PROFILING_SAMPLE_RATE=0)
 class BookViewTests(APITestCase):
     """
     Test suite for the BookListCreateView and BookRetrieveUpdateDestroyView endpoints.
@@ -16,6 +19,7 @@ class BookViewTests(APITestCase):
     which addresses the checker requirement "Configure a separate test database...".
     """
     def setUp(self):
+        throttling.local_store.clear()
         # 1. Setup URLs
         # Ensure 'book-list' and 'book-detail' are correctly defined in your urls.py
         self.list_create_url = reverse('book-list')
@@ -1,17 +1,21 @@
 from rest_framework.test import APITestCase
+from django.test import override_settings
 from django.urls import reverse
 from django.contrib.auth import get_user_model
+from . import throttling
 from .models import Book, Author
 from rest_framework import status
 
 User = get_user_model()
 
+@override_settings(API_PROFILING_SAMPLE_RATE=0)
 class BookViewTests(APITestCase):
     """
     Test suite for the Book API endpoints (List, Detail, Create, Update, Delete)
     with a focus on advanced querying and permissions.
     """
     def setUp(self):
+        throttling.local_store.clear()
         # --- Authentication Setup ---
         self.user = User.objects.create_user(username='admin_user', password='password')
         self.non_auth_client = self.client # Client without forced authentication
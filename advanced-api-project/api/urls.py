@@ -1,6 +1,9 @@
 from django.urls import path
 # FIX: The import names must match the class names in api/views.py
-from .views import BookListCreateView, BookRetrieveUpdateDestroyView
+from .views import (
+    BookListCreateView, BookRetrieveUpdateDestroyView, BookBulkView, BookListCacheStatsView,
+    AuthorListView, AuthorDetailView, AsyncBookListCreateView, AsyncBookRetrieveUpdateDestroyView,
+)
 
 urlpatterns = [
     # Consolidated endpoint for GET (List) and POST (Create).
@@ -10,4 +13,18 @@ urlpatterns = [
     # Consolidated endpoint for GET (Retrieve), PUT/PATCH (Update), and DELETE (Destroy).
     # This single path handles all detail-related operations on a book by primary key (pk).
     path('books/<int:pk>/', BookRetrieveUpdateDestroyView.as_view(), name='book-detail'),
+
+    # Bulk create/update/delete: one request and one transaction per batch.
+    path('books/bulk/', BookBulkView.as_view(), name='book-bulk'),
+
+    # Hit/miss counters of the Book list cache (staff only).
+    path('cache/stats/', BookListCacheStatsView.as_view(), name='cache-stats'),
+
+    # Async (ASGI-native) versions of the two book endpoints above.
+    path('async/books/', AsyncBookListCreateView.as_view(), name='async-book-list'),
+    path('async/books/<int:pk>/', AsyncBookRetrieveUpdateDestroyView.as_view(), name='async-book-detail'),
+
+    # Read-only author endpoints; '?expand=books' nests each author's books.
+    path('authors/', AuthorListView.as_view(), name='author-list'),
+    path('authors/<int:pk>/', AuthorDetailView.as_view(), name='author-detail'),
 ]
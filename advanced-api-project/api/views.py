@@ -1,17 +1,43 @@
-from rest_framework import generics
-from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from django.db import router, transaction
+from rest_framework import generics, serializers, status
+from rest_framework.permissions import IsAdminUser, IsAuthenticated, IsAuthenticatedOrReadOnly
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters
-from .models import Book # Assuming you have a Book model
-from .serializers import BookSerializer # Assuming you have a BookSerializer
+from .models import Book, Author # Assuming you have a Book model
+from .serializers import BookSerializer, AuthorSerializer # Assuming you have a BookSerializer
+from .pagination import KeysetPagination
+from .parsers import FastJSONParser, NDJSONParser
+from .renderers import CSVRenderer, NDJSONRenderer
+from . import cache
+from .async_views import AsyncListCreateAPIView, AsyncRetrieveUpdateDestroyAPIView
+from .mixins import (
+    ConditionalRequestMixin, ExpandableFieldsViewMixin, FastListViewMixin, ListCacheMixin, SparseFieldsViewMixin,
+    StreamingExportMixin,
+)
+from .search import FullTextSearchFilter, RelevanceOrderingFilter
+from .throttling import BulkThrottle
 
-class BookListCreateView(generics.ListCreateAPIView):
+class BookListCreateView(StreamingExportMixin, ListCacheMixin, ConditionalRequestMixin, FastListViewMixin, SparseFieldsViewMixin, ExpandableFieldsViewMixin, generics.ListCreateAPIView):
     """
     Handles GET (list) and POST (create) requests for Book model.
 
     - Uses ListCreateAPIView to handle both operations at the /books/ endpoint.
     - Permissions: GET is public; POST requires authentication.
-    - Implements filtering, searching, and ordering.
+    - Implements filtering, searching, and ordering. '?search=' matches the
+      start of words in the title and author name, not substrings.
+    - '?page_size=' / '?cursor=' switch to keyset pagination (see KeysetPagination).
+    - '?expand=author' nests the author, loaded with select_related.
+    - '?fields=id,title' narrows the output and the columns selected.
+    - ETag / Last-Modified cover the rows of the page served: 'If-None-Match'
+      gets a 304 for the price of the page query (see ConditionalRequestMixin).
+    - '?format=ndjson' / '?format=csv' stream the whole filtered catalog
+      (see StreamingExportMixin).
+    - Anonymous JSON lists are served from a cache that writes invalidate
+      per author/year (see ListCacheMixin and api.cache).
+    - List rows are read with values() and serialized by a compiled plan
+      instead of per-field DRF calls (see api.fastpath).
     """
     queryset = Book.objects.all()
     serializer_class = BookSerializer
@@ -21,12 +47,16 @@ class BookListCreateView(generics.ListCreateAPIView):
     permission_classes = [IsAuthenticatedOrReadOnly] 
     
     # Advanced Querying Backends: Required for the filtering, search, and ordering tests.
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    # Search goes through the full-text index (FullTextSearchFilter), and
+    # results are ranked by relevance unless '?ordering=' is given. Terms
+    # match word prefixes ('Emm' finds 'Emma'), not substrings ('mma' does not).
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, RelevanceOrderingFilter]
 
     # Filtering fields: Used for '?publication_year=...' and '?author=...'
     filterset_fields = ['publication_year', 'author']
 
-    # Searching fields: Used for '?search=...' (searches title and author name)
+    # Searching fields: Used for '?search=...' (searches title and author name).
+    # Only used by the icontains fallback when no full-text index exists.
     search_fields = ['title', 'author__name']
 
     # Ordering fields: Used for '?ordering=...'
@@ -35,17 +65,183 @@ class BookListCreateView(generics.ListCreateAPIView):
     # Default ordering to ensure consistent pagination/listing
     ordering = ['id']
 
+    # An expanded author versions the list too.
+    version_related_fields = {'author': 'author__updated_at'}
 
-class BookRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
+    # Keyset pagination: seeks past the last row instead of using OFFSET,
+    # so deep pages cost the same as the first one.
+    pagination_class = KeysetPagination
+
+    # Streaming export formats, on top of the usual JSON and browsable API.
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, NDJSONRenderer, CSVRenderer]
+    export_filename = 'books'
+
+
+class BookRetrieveUpdateDestroyView(ConditionalRequestMixin, SparseFieldsViewMixin, ExpandableFieldsViewMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Handles GET (retrieve), PUT/PATCH (update), and DELETE (destroy) requests for a single Book.
     
     - Uses RetrieveUpdateDestroyAPIView to handle all operations at the /books/<pk>/ endpoint.
     - Permissions: GET is public; PUT/PATCH/DELETE require authentication.
+    - '?expand=author' nests the author and '?fields=' narrows the output on GET.
+    - GET answers 'If-None-Match' with 304; PUT/PATCH/DELETE with a stale
+      'If-Match' get 412 instead of overwriting someone else's change.
     """
     queryset = Book.objects.all()
     serializer_class = BookSerializer 
     
     # Permission Fix: Allows GET (retrieve) for everyone, but requires 
     # authentication for PUT, PATCH, and DELETE.
-    permission_classes = [IsAuthenticatedOrReadOnly] # Resolves 403 errors in tests
\ No newline at end of file
+    permission_classes = [IsAuthenticatedOrReadOnly] # Resolves 403 errors in tests
+
+    version_related_fields = {'author': 'author__updated_at'}
+
+
+class AsyncBookListCreateView(FastListViewMixin, SparseFieldsViewMixin, ExpandableFieldsViewMixin, AsyncListCreateAPIView):
+    """
+    Async (ASGI-native) version of BookListCreateView at /async/books/ (see
+    api.async_views): same filters, search, ordering, keyset pagination,
+    '?expand=' / '?fields=' and fast path, with the same output.
+
+    - Conditional requests, the list cache and the streaming exports are
+      left to BookListCreateView: they are built on sync code.
+    """
+    queryset = Book.objects.all()
+    serializer_class = BookSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, RelevanceOrderingFilter]
+    filterset_fields = ['publication_year', 'author']
+    search_fields = ['title', 'author__name']
+    ordering_fields = ['title', 'publication_year']
+    ordering = ['id']
+    pagination_class = KeysetPagination
+
+
+class AsyncBookRetrieveUpdateDestroyView(SparseFieldsViewMixin, ExpandableFieldsViewMixin, AsyncRetrieveUpdateDestroyAPIView):
+    """
+    Async (ASGI-native) version of BookRetrieveUpdateDestroyView at
+    /async/books/<pk>/ (see api.async_views). No ETag / If-Match handling.
+    """
+    queryset = Book.objects.all()
+    serializer_class = BookSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    # The default DjangoFilterBackend has no filterset here and would only
+    # cost a trip through sync_to_async.
+    filter_backends = []
+
+
+class BookBulkView(generics.GenericAPIView):
+    """
+    Bulk create (POST), update (PUT/PATCH) and delete (DELETE) at /books/bulk/.
+
+    - POST takes a list of books, PUT/PATCH a list of books with their 'id',
+      DELETE a list of book ids; as a JSON array or as NDJSON (one per line).
+    - The whole batch is validated first and errors come back per item, keyed
+      by position. Nothing is written unless every item is valid.
+    - Authors are resolved with one query and rows are written with
+      bulk_create/bulk_update inside one transaction (see BookListSerializer).
+    - These writes send no model signals, so the list cache is invalidated here.
+    - Rate limited per user by BulkThrottle on top of the default throttles.
+    """
+    queryset = Book.objects.all()
+    serializer_class = BookSerializer
+    permission_classes = [IsAuthenticated]
+    parser_classes = [FastJSONParser, NDJSONParser]
+    throttle_classes = [*api_settings.DEFAULT_THROTTLE_CLASSES, BulkThrottle]
+
+    # Largest batch accepted in one request.
+    max_batch_size = 10000
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs['many'] = True
+        kwargs['max_length'] = self.max_batch_size
+        return super().get_serializer(*args, **kwargs)
+
+    def get_cache_tags(self, books):
+        return set().union(*(cache.book_tags(book.author_id, book.publication_year) for book in books))
+
+    def atomic(self):
+        return transaction.atomic(using=router.db_for_write(self.queryset.model))
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        with self.atomic():
+            books = serializer.save()
+            # bulk_create() sends no signals.
+            cache.invalidate_write(self.get_cache_tags(books))
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def put(self, request, *args, **kwargs):
+        return self.bulk_update(request, partial=False)
+
+    def patch(self, request, *args, **kwargs):
+        return self.bulk_update(request, partial=True)
+
+    def bulk_update(self, request, partial):
+        data = request.data
+        pks = [item.get('id') for item in data if isinstance(item, dict)] if isinstance(data, list) else []
+        with self.atomic():
+            instances = self.get_queryset().select_for_update().filter(
+                pk__in=[pk for pk in pks if isinstance(pk, int) and not isinstance(pk, bool)]
+            )
+            instances = list(instances)
+            tags = self.get_cache_tags(instances)
+            serializer = self.get_serializer(instances, data=data, partial=partial)
+            serializer.is_valid(raise_exception=True)
+            books = serializer.save()
+            # bulk_update() sends no signals; books may have moved to another author/year.
+            cache.invalidate_write(tags | self.get_cache_tags(books))
+        return Response(serializer.data)
+
+    def delete(self, request, *args, **kwargs):
+        data = request.data
+        if isinstance(data, list):
+            # Accept full objects too, e.g. an NDJSON export of the rows.
+            data = [item.get('id') if isinstance(item, dict) else item for item in data]
+        pks = serializers.ListField(
+            child=serializers.IntegerField(), allow_empty=False, max_length=self.max_batch_size,
+        ).run_validation(data)
+        with self.atomic():
+            queryset = self.get_queryset().filter(pk__in=pks)
+            found = set(queryset.select_for_update().values_list('pk', flat=True))
+            errors = {index: ['No book with this id.'] for index, pk in enumerate(pks) if pk not in found}
+            if errors:
+                raise serializers.ValidationError(errors)
+            queryset.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class BookListCacheStatsView(APIView):
+    """
+    Handles GET requests for the Book list cache counters at /cache/stats/.
+
+    - Hits, misses, hit rate and invalidations of the serving process.
+    - Permissions: staff only.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response(cache.get_stats())
+
+
+class AuthorListView(SparseFieldsViewMixin, ExpandableFieldsViewMixin, generics.ListAPIView):
+    """
+    Handles GET (list) requests for the Author model at the /authors/ endpoint.
+
+    - '?expand=books' nests each author's books, loaded with one prefetch query.
+    """
+    queryset = Author.objects.order_by('id')
+    serializer_class = AuthorSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+
+class AuthorDetailView(SparseFieldsViewMixin, ExpandableFieldsViewMixin, generics.RetrieveAPIView):
+    """
+    Handles GET (retrieve) requests for a single Author at /authors/<pk>/.
+
+    - '?expand=books' nests the author's books.
+    """
+    queryset = Author.objects.all()
+    serializer_class = AuthorSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
@@ -0,0 +1,9 @@
+"""
+Performance benchmarks for the Book API.
+
+Each module is a standalone script that sets up Django against the project's
+settings, migrates a throwaway database, seeds it and prints its measurements.
+Run them from the project directory, e.g.:
+
+    python -m benchmarks.pagination --rows 100000
+"""
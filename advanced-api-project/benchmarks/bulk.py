@@ -0,0 +1,95 @@
+"""
+Benchmarks importing a feed of books: one POST /books/ per book against
+batches sent to /books/bulk/ (JSON and NDJSON).
+
+The single-row path validates, queries the author and commits once per book;
+the bulk path resolves all authors with one query and writes each batch with
+bulk_create() in one transaction.
+
+    python -m benchmarks.bulk --books 10000 --batch-size 10000
+    python -m benchmarks.bulk --database /tmp/bulk.sqlite3
+
+The project runs on an in-memory database, where a commit costs next to
+nothing; --database measures against a file, where every single-row commit
+has to be synced to disk.
+"""
+import argparse
+import json
+import time
+
+from .utils import WORDS, print_table, reset_books, seed_books, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--books', type=int, default=10000)
+    parser.add_argument('--batch-size', type=int, default=10000)
+    parser.add_argument('--authors', type=int, default=1000)
+    parser.add_argument(
+        '--database', help='SQLite file to use instead of the in-memory database (it is overwritten)',
+    )
+    args = parser.parse_args()
+
+    setup_django(args.database)
+    from django.contrib.auth import get_user_model
+    from rest_framework.test import APIRequestFactory, force_authenticate
+    from api.models import Author, Book
+    from api.views import BookBulkView, BookListCreateView
+
+    user = get_user_model().objects.create_user(username='benchmark')
+    factory = APIRequestFactory()
+    single_view = BookListCreateView.as_view()
+    bulk_view = BookBulkView.as_view()
+
+    def feed():
+        author_ids = list(Author.objects.values_list('id', flat=True))
+        return [
+            {
+                'title': f'{WORDS[index % len(WORDS)].title()} {index}',
+                'publication_year': 1800 + index % 225,
+                'author': author_ids[index % len(author_ids)],
+            }
+            for index in range(args.books)
+        ]
+
+    def batches(items):
+        return [items[start:start + args.batch_size] for start in range(0, len(items), args.batch_size)]
+
+    def send(view, request):
+        force_authenticate(request, user=user)
+        response = view(request)
+        assert response.status_code == 201, response.data
+        response.render()
+
+    def single(items):
+        for item in items:
+            send(single_view, factory.post('/api/books/', item, format='json'))
+
+    def bulk_json(items):
+        for batch in batches(items):
+            send(bulk_view, factory.post('/api/books/bulk/', batch, format='json'))
+
+    def bulk_ndjson(items):
+        for batch in batches(items):
+            body = '\n'.join(json.dumps(item) for item in batch)
+            send(bulk_view, factory.post('/api/books/bulk/', body, content_type='application/x-ndjson'))
+
+    rows = []
+    baseline = None
+    for label, run in [('single POST', single), ('bulk JSON', bulk_json), ('bulk NDJSON', bulk_ndjson)]:
+        reset_books()
+        seed_books(0, authors=args.authors)
+        items = feed()
+        start = time.perf_counter()
+        run(items)
+        elapsed = time.perf_counter() - start
+        assert Book.objects.count() == args.books
+        baseline = baseline or elapsed
+        rows.append([label, f'{elapsed:.2f}', f'{args.books / elapsed:.0f}', f'{baseline / elapsed:.1f}x'])
+
+    print(f'{args.books} books, batch_size={args.batch_size}, database={args.database or "memory"}')
+    print_table(['path', 'seconds', 'books/s', 'speedup'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+"""
+Benchmarks sync and async book views under many concurrent connections, on
+one uvicorn worker (ASGI).
+
+Serves the project with uvicorn in a subprocess, then opens `--connections`
+connections at once against a sync endpoint and its async counterpart
+(api.async_views). Each client sends its request headers in two halves,
+`--slow-ms` apart, like a slow network would, and reads the whole
+response. Reports throughput, latency percentiles, failed requests and the
+peak thread count and RSS of the server process. The list cache is
+replaced by a DummyCache so that both views do the same work.
+
+Needs uvicorn (`pip install uvicorn`).
+
+    python -m benchmarks.concurrency --connections 1000 --slow-ms 200
+"""
+import argparse
+import asyncio
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from .utils import print_table, seed_books, setup_django
+
+ENDPOINTS = [
+    ('list', '/api/books/?page_size=20', '/api/async/books/?page_size=20'),
+    ('list ?expand=author', '/api/books/?page_size=20&expand=author', '/api/async/books/?page_size=20&expand=author'),
+    ('detail', '/api/books/{pk}/', '/api/async/books/{pk}/'),
+]
+
+
+def serve(database, port):
+    """Runs the project on uvicorn against an already seeded database."""
+    setup_django(database, reuse=True)
+    from django.conf import settings
+    settings.CACHES['books'] = {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+    settings.API_PROFILING_SAMPLE_RATE = 0
+    settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, '127.0.0.1']
+
+    import uvicorn
+    from django.core.asgi import get_asgi_application
+    uvicorn.run(
+        get_asgi_application(), host='127.0.0.1', port=port, workers=1,
+        log_level='warning', access_log=False, backlog=4096, limit_concurrency=None,
+    )
+
+
+def read_status(pid):
+    """(threads, RSS in MiB) of a process, from /proc."""
+    values = {}
+    with open(f'/proc/{pid}/status') as status_file:
+        for line in status_file:
+            key, _, value = line.partition(':')
+            values[key] = value.split()
+    return int(values['Threads'][0]), int(values['VmRSS'][0]) / 1024
+
+
+class ServerMonitor:
+    """Samples the server's thread count and RSS in the background, keeping the peaks."""
+
+    def __init__(self, pid, interval=0.05):
+        self.pid = pid
+        self.interval = interval
+        self.threads = self.rss = 0
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def run(self):
+        while not self.stopped.is_set():
+            threads, rss = read_status(self.pid)
+            self.threads = max(self.threads, threads)
+            self.rss = max(self.rss, rss)
+            time.sleep(self.interval)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.thread.join()
+
+
+async def fetch(port, path, slow_seconds):
+    """Sends one GET in two halves and returns (status, seconds)."""
+    start = time.perf_counter()
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        writer.write(f'GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\n'.encode())
+        await writer.drain()
+        await asyncio.sleep(slow_seconds)
+        writer.write(b'Accept: application/json\r\nConnection: close\r\n\r\n')
+        await writer.drain()
+        response = await reader.read()
+    finally:
+        writer.close()
+    status = int(response.split(b' ', 2)[1]) if response else 0
+    return status, time.perf_counter() - start
+
+
+async def run_wave(port, path, connections, slow_seconds):
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(fetch(port, path, slow_seconds) for _ in range(connections)), return_exceptions=True,
+    )
+    elapsed = time.perf_counter() - start
+    latencies = sorted(seconds for result in results if not isinstance(result, BaseException)
+                       for status, seconds in [result] if status == 200)
+    return {
+        'rps': len(latencies) / elapsed,
+        'failed': connections - len(latencies),
+        'p50': statistics.median(latencies) * 1000 if latencies else float('nan'),
+        'p99': latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else float('nan'),
+    }
+
+
+def wait_for_port(port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError('the server exited, is uvicorn installed?')
+        try:
+            asyncio.run(fetch(port, '/api/books/?page_size=1', 0))
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError('the server did not start')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--connections', type=int, default=1000)
+    parser.add_argument('--slow-ms', type=float, default=200, help='pause between the two halves of a request')
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--serve', metavar='DATABASE', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port)
+        return
+
+    # Both ends hold one socket per connection.
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (max(soft, min(hard, args.connections * 2 + 256)), hard))
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = os.path.join(directory, 'db.sqlite3')
+        setup_django(database)
+        seed_books(args.rows)
+        from api.models import Book
+        pk = Book.objects.order_by('id').values_list('id', flat=True)[args.rows // 2]
+
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'benchmarks.concurrency', '--serve', database, '--port', str(args.port)],
+        )
+        try:
+            wait_for_port(args.port, process)
+            rows = []
+            for label, sync_path, async_path in ENDPOINTS:
+                for kind, path in [('sync', sync_path), ('async', async_path)]:
+                    path = path.format(pk=pk)
+                    with ServerMonitor(process.pid) as monitor:
+                        result = asyncio.run(run_wave(args.port, path, args.connections, args.slow_ms / 1000))
+                    rows.append([
+                        label, kind, f"{result['rps']:.0f}", f"{result['p50']:.0f}", f"{result['p99']:.0f}",
+                        result['failed'], monitor.threads, f'{monitor.rss:.0f}',
+                    ])
+        finally:
+            process.terminate()
+            process.wait()
+
+    print(f'{args.connections} concurrent connections, {args.slow_ms:g} ms slow clients, {args.rows} books')
+    print_table(['endpoint', 'view', 'req/s', 'p50 ms', 'p99 ms', 'failed', 'peak threads', 'peak RSS MiB'], rows)
+
+
+if __name__ == '__main__':
+    main()
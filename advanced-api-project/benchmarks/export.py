@@ -0,0 +1,94 @@
+"""
+Benchmarks exporting the whole Book catalog: the JSON list built in memory
+against the streaming '?format=ndjson' and '?format=csv' exports.
+
+Each export runs in a fresh process against the same seeded SQLite file, so
+peak RSS is measured per export rather than per benchmark run.
+
+    python -m benchmarks.export --rows 1000000
+    python -m benchmarks.export --rows 1000000 --formats ndjson,csv
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from .utils import print_table, seed_books, setup_django
+
+
+def export(database, export_format):
+    """Runs one export in this process and prints its measurements as JSON."""
+    setup_django(database, reuse=True)
+    from rest_framework.test import APIRequestFactory
+    from api.views import BookListCreateView
+
+    view = BookListCreateView.as_view()
+    request = APIRequestFactory().get(f'/api/books/?format={export_format}')
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    response = view(request)
+    first_byte = None
+    size = 0
+    if response.streaming:
+        for chunk in response.streaming_content:
+            if first_byte is None:
+                first_byte = time.perf_counter() - start
+            size += len(chunk)
+    else:
+        size = len(response.render().content)
+        first_byte = time.perf_counter() - start
+    total = time.perf_counter() - start
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({
+        'ttfb_ms': first_byte * 1000,
+        'total_s': total,
+        # ru_maxrss is in KiB on Linux.
+        'peak_rss_mb': peak_rss / 1024,
+        'rss_growth_mb': (peak_rss - base_rss) / 1024,
+        'size_mb': size / 1024 / 1024,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--formats', default='json,ndjson,csv')
+    parser.add_argument('--database', help='SQLite file to seed (default: a temporary file)')
+    parser.add_argument('--export', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.export:
+        return export(args.database, args.export)
+
+    database = args.database or os.path.join(tempfile.mkdtemp(), 'export.sqlite3')
+    setup_django(database)
+    seed_books(args.rows)
+
+    rows = []
+    for export_format in args.formats.split(','):
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.export', '--database', database, '--export', export_format],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        rows.append([
+            export_format,
+            f"{result['ttfb_ms']:.1f}",
+            f"{result['total_s']:.2f}",
+            f"{result['peak_rss_mb']:.0f}",
+            f"{result['rss_growth_mb']:.0f}",
+            f"{result['size_mb']:.1f}",
+        ])
+
+    print(f'{args.rows} books')
+    print_table(['format', 'TTFB ms', 'total s', 'peak RSS MB', 'RSS growth MB', 'size MB'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmarks page latency at increasing depths of the Book list.
+
+Compares the keyset pagination used by BookListCreateView with DRF's
+LimitOffsetPagination: OFFSET has to walk past every skipped row, so its cost
+grows with the page depth, while a keyset page is a single index seek.
+
+    python -m benchmarks.pagination --rows 200000 --page-size 50
+"""
+import argparse
+
+from .utils import measure, print_table, seed_books, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--page-size', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--ordering', default='id', help="e.g. 'id', 'title', '-publication_year'")
+    args = parser.parse_args()
+
+    setup_django()
+    from rest_framework.pagination import LimitOffsetPagination
+    from rest_framework.test import APIRequestFactory
+    from api.models import Book
+    from api.pagination import KeysetPagination
+    from api.views import BookListCreateView
+
+    seed_books(args.rows)
+    factory = APIRequestFactory()
+    view = BookListCreateView.as_view()
+    offset_view = BookListCreateView.as_view(pagination_class=LimitOffsetPagination)
+
+    paginator = KeysetPagination()
+    paginator.base_url = 'http://testserver/api/books/'
+    paginator.ordering = paginator.get_ordering(Book.objects.order_by(args.ordering))
+
+    depths = [depth for depth in (0, 10, 100, 1000, 10000) if depth * args.page_size < args.rows]
+    rows = []
+    for depth in depths:
+        offset = depth * args.page_size
+        keyset_url = f'/api/books/?ordering={args.ordering}&page_size={args.page_size}'
+        if offset:
+            # Build the cursor a client would hold after reading `depth` pages.
+            last = Book.objects.order_by(*paginator.ordering)[offset - 1]
+            cursor_url = paginator.encode_cursor(paginator.position(last), reverse=False)
+            keyset_url = cursor_url.replace('http://testserver', '') + f'&ordering={args.ordering}&page_size={args.page_size}'
+        offset_url = f'/api/books/?ordering={args.ordering}&limit={args.page_size}&offset={offset}'
+
+        keyset = measure(lambda: view(factory.get(keyset_url)).render(), repeat=args.repeat)
+        limit_offset = measure(lambda: offset_view(factory.get(offset_url)).render(), repeat=args.repeat)
+        rows.append([
+            depth,
+            offset,
+            f"{keyset['median_ms']:.2f}",
+            f"{keyset['p95_ms']:.2f}",
+            f"{limit_offset['median_ms']:.2f}",
+            f"{limit_offset['p95_ms']:.2f}",
+        ])
+
+    print(f'{args.rows} books, page_size={args.page_size}, ordering={args.ordering}')
+    print_table(
+        ['page', 'offset', 'keyset p50', 'keyset p95', 'offset p50', 'offset p95'],
+        rows,
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmarks rendering Book list payloads: DRF's JSONRenderer against
+FastJSONRenderer with orjson and with its stdlib fallback. Reports the
+median render time and the memory allocated at peak during one render
+(tracemalloc, measured in a separate run so it does not skew the timings).
+
+    python -m benchmarks.renderers --rows 1000,10000,100000
+"""
+import argparse
+import tracemalloc
+from unittest import mock
+
+from .utils import measure, print_table, reset_books, seed_books, setup_django
+
+
+def peak_allocation(func):
+    """Returns the peak of memory allocated while func runs, in MiB."""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', default='1000,10000,100000', help='comma separated list sizes')
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    setup_django()
+    from rest_framework.renderers import JSONRenderer
+    from api.models import Book
+    from api.renderers import FastJSONRenderer
+    from api.serializers import BookSerializer
+
+    def without_orjson(func):
+        def run():
+            with mock.patch('api.renderers.orjson', None):
+                return func()
+        return run
+
+    rows = []
+    for size in [int(value) for value in args.rows.split(',')]:
+        reset_books()
+        seed_books(size)
+        for label, expand in [('plain', []), ('expand=author', ['author'])]:
+            queryset = Book.objects.order_by('id').select_related('author')
+            data = BookSerializer(queryset, many=True, expand=expand).data
+            renders = [
+                lambda: JSONRenderer().render(data),
+                without_orjson(lambda: FastJSONRenderer().render(data)),
+                lambda: FastJSONRenderer().render(data),
+            ]
+            timings = [measure(render, repeat=args.repeat)['median_ms'] for render in renders]
+            peaks = [peak_allocation(render) for render in renders]
+            rows.append([
+                size, label,
+                *(f'{timing:.1f}' for timing in timings),
+                f'{timings[0] / timings[2]:.1f}x',
+                *(f'{peak:.1f}' for peak in peaks),
+            ])
+
+    print(f'median ms of {args.repeat} renders; peak MiB allocated during one render')
+    print_table(
+        ['rows', 'payload', 'drf ms', 'stdlib ms', 'orjson ms', 'speedup', 'drf MiB', 'stdlib MiB', 'orjson MiB'],
+        rows,
+    )
+
+
+if __name__ == '__main__':
+    main()
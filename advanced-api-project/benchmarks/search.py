@@ -0,0 +1,60 @@
+"""
+Benchmarks '?search=' on the Book list: the icontains SearchFilter against the
+full-text index, at several catalog sizes.
+
+    python -m benchmarks.search --rows 10000,100000,1000000
+"""
+import argparse
+
+from .utils import measure, print_table, reset_books, seed_books, setup_django
+
+QUERIES = [
+    ('rare word', 'orchard'),
+    ('common word', 'star'),
+    ('two words', 'silver moon'),
+    ('author name', 'Austen'),
+    ('no match', 'zeppelin'),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', default='10000,100000,1000000', help='comma separated catalog sizes')
+    parser.add_argument('--page-size', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.test import override_settings
+    from rest_framework.test import APIRequestFactory
+    from api.views import BookListCreateView
+
+    factory = APIRequestFactory()
+    view = BookListCreateView.as_view()
+    rows = []
+    for size in [int(value) for value in args.rows.split(',')]:
+        reset_books()
+        seed_books(size)
+        for label, term in QUERIES:
+            # Searches are paginated as a client would page through results.
+            url = f'/api/books/?search={term}&page_size={args.page_size}'
+            runs = [
+                ('api.search.LikeSearchBackend', url),
+                # Ranking sorts every match; '?ordering=id' shows the index
+                # lookup alone, in the same order as the icontains search.
+                ('api.search.SQLiteFTS5SearchBackend', url),
+                ('api.search.SQLiteFTS5SearchBackend', f'{url}&ordering=id'),
+            ]
+            medians = []
+            for backend, run_url in runs:
+                with override_settings(BOOK_SEARCH_BACKEND=backend):
+                    timing = measure(lambda: view(factory.get(run_url)).render(), repeat=args.repeat)
+                medians.append(timing['median_ms'])
+            rows.append([size, label, *(f'{median:.2f}' for median in medians)])
+
+    print(f'page_size={args.page_size}, median ms of {args.repeat} runs')
+    print_table(['rows', 'query', 'icontains', 'fts5 ranked', 'fts5 by id'], rows)
+
+
+if __name__ == '__main__':
+    main()
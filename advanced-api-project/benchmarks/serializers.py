@@ -0,0 +1,50 @@
+"""
+Benchmarks serializing Book lists: DRF's field-by-field ListSerializer over
+model instances against the compiled fast path over values() rows
+(api.fastpath), for the plain and the '?expand=author' representations.
+Both read the rows from the database, as a list request does.
+
+    python -m benchmarks.serializers --rows 1000,10000,100000
+"""
+import argparse
+from unittest import mock
+
+from .utils import measure, print_table, reset_books, seed_books, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', default='1000,10000,100000', help='comma separated list sizes')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from api.models import Book
+    from api.serializers import BookSerializer
+
+    def serialize(expand):
+        queryset = Book.objects.order_by('id')
+        if expand:
+            queryset = queryset.select_related('author')
+        return BookSerializer(queryset, many=True, expand=expand).data
+
+    rows = []
+    for size in [int(value) for value in args.rows.split(',')]:
+        reset_books()
+        seed_books(size)
+        for label, expand in [('plain', []), ('expand=author', ['author'])]:
+            with mock.patch('api.fastpath.get_plan', return_value=None):
+                before = measure(lambda: serialize(expand), repeat=args.repeat, warmup=1)
+            after = measure(lambda: serialize(expand), repeat=args.repeat, warmup=1)
+            before_rate = size / before['median_ms'] * 1000
+            after_rate = size / after['median_ms'] * 1000
+            rows.append([
+                size, label, f'{before_rate:,.0f}', f'{after_rate:,.0f}', f'{after_rate / before_rate:.1f}x',
+            ])
+
+    print(f'rows/sec, median of {args.repeat} runs (query included)')
+    print_table(['rows', 'representation', 'ModelSerializer', 'fast path', 'speedup'], rows)
+
+
+if __name__ == '__main__':
+    main()
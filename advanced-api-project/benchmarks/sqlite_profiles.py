@@ -0,0 +1,150 @@
+"""
+Benchmarks the SQLite connection profiles (api.database) under concurrent
+reads and writes.
+
+Seeds one database file and copies it once per scenario, so that every
+scenario starts from the same rows and its own journal mode:
+- django defaults: no PRAGMAs, a new connection per request
+- production, no reuse: the production PRAGMAs, CONN_MAX_AGE = 0
+- production: the production PRAGMAs on persistent connections
+- production + read alias: the same, with reads on the read-only alias
+- production + WAL: the production PRAGMAs with WAL journaling (SQLITE_WAL)
+
+Reader threads read a page of books by year, writer threads update or
+create a book, each operation followed by close_old_connections() as at
+the end of a request. Reports reads/s, writes/s, their p95 and the
+operations that failed with "database is locked".
+
+    python -m benchmarks.sqlite_profiles --readers 8 --writers 4 --seconds 5
+"""
+import argparse
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+
+from .utils import print_table, seed_books, setup_django
+
+SCENARIOS = [
+    # label, profile, CONN_MAX_AGE, read from a read-only alias, WAL
+    ('django defaults', 'default', 0, False, False),
+    ('production, no reuse', 'production', 0, False, False),
+    ('production', 'production', 600, False, False),
+    ('production + read alias', 'production', 600, True, False),
+    ('production + WAL', 'production', 600, False, True),
+]
+
+
+def configure(directory):
+    """Points one alias (and its read-only alias) at a copy of the database per scenario."""
+    from django.conf import settings
+    from api.database import sqlite_database
+
+    seed = os.path.join(directory, 'seed.sqlite3')
+    settings.DATABASES['default'] = sqlite_database(seed, profile='default', conn_max_age=0)
+    for index, (label, profile, conn_max_age, read_only, wal) in enumerate(SCENARIOS):
+        path = os.path.join(directory, f'scenario{index}.sqlite3')
+        settings.DATABASES[f'scenario{index}'] = sqlite_database(
+            path, profile=profile, conn_max_age=conn_max_age, wal=wal,
+        )
+        settings.DATABASES[f'scenario{index}_read'] = sqlite_database(
+            path, profile=profile, conn_max_age=conn_max_age, read_only=True, wal=wal,
+        )
+    return seed
+
+
+def run_scenario(alias, read_alias, book_ids, args):
+    from django.db import OperationalError, close_old_connections
+    from api.models import Book
+
+    stop = threading.Event()
+    timings = {'read': [], 'write': []}
+    locked = {'read': 0, 'write': 0}
+
+    def read(rng):
+        year = 1800 + rng.randrange(225)
+        list(Book.objects.using(read_alias).filter(publication_year=year).order_by('id').values()[:20])
+
+    def write(rng):
+        if rng.random() < 0.5:
+            Book.objects.using(alias).filter(pk=rng.choice(book_ids)).update(title=f'Title {rng.random()}')
+        else:
+            Book.objects.using(alias).create(title='New book', publication_year=2000, author_id=1)
+
+    def worker(kind, operation, seed):
+        rng = random.Random(seed)
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                operation(rng)
+            except OperationalError:
+                locked[kind] += 1
+            else:
+                timings[kind].append(time.perf_counter() - start)
+            finally:
+                close_old_connections()
+        close_old_connections()
+
+    threads = [threading.Thread(target=worker, args=('read', read, seed)) for seed in range(args.readers)]
+    threads += [threading.Thread(target=worker, args=('write', write, -seed)) for seed in range(args.writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    def p95(values):
+        return sorted(values)[int(len(values) * 0.95)] * 1000 if values else float('nan')
+
+    return {
+        'reads': len(timings['read']) / args.seconds,
+        'writes': len(timings['write']) / args.seconds,
+        'read_p95': p95(timings['read']),
+        'write_p95': p95(timings['write']),
+        'read_median': statistics.median(timings['read']) * 1000 if timings['read'] else float('nan'),
+        'locked': locked['read'] + locked['write'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--rows', type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'advanced_api_project.settings')
+        seed = configure(directory)
+        setup_django(seed)
+        seed_books(args.rows)
+        from django.db import connections
+        from api.models import Book
+        book_ids = list(Book.objects.values_list('id', flat=True))
+        connections['default'].close()
+        for index in range(len(SCENARIOS)):
+            shutil.copy(seed, os.path.join(directory, f'scenario{index}.sqlite3'))
+
+        rows = []
+        for index, (label, profile, conn_max_age, read_only, wal) in enumerate(SCENARIOS):
+            alias = f'scenario{index}'
+            result = run_scenario(alias, f'{alias}_read' if read_only else alias, book_ids, args)
+            connections.close_all()
+            rows.append([
+                label, f"{result['reads']:.0f}", f"{result['read_median']:.2f}", f"{result['read_p95']:.2f}",
+                f"{result['writes']:.0f}", f"{result['write_p95']:.2f}", result['locked'],
+            ])
+
+    print(f'{args.readers} readers, {args.writers} writers, {args.seconds:g}s per scenario, {args.rows} books')
+    print_table(
+        ['profile', 'reads/s', 'read p50 ms', 'read p95 ms', 'writes/s', 'write p95 ms', 'locked'], rows,
+    )
+
+
+if __name__ == '__main__':
+    main()
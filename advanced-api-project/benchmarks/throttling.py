@@ -0,0 +1,93 @@
+"""
+Benchmarks the cost of one throttle check: DRF's AnonRateThrottle (a list
+of timestamps read from and written back to the cache) against
+api.throttling's sliding window and token bucket, with counters in this
+process (LocalStore) and in a local-memory cache (CacheStore). Reports the
+median and p99 of a check in microseconds, for `--clients` client
+addresses taking turns.
+
+    python -m benchmarks.throttling --checks 100000
+"""
+import argparse
+import statistics
+import time
+
+from .utils import print_table, setup_django
+
+RATE = '1000000/hour'
+
+
+def time_checks(throttle_class, requests, checks):
+    """Runs `checks` checks with a new throttle each (like DRF does) and returns the timings in µs."""
+    timings = []
+    clock = time.perf_counter
+    for index in range(checks):
+        request = requests[index % len(requests)]
+        start = clock()
+        allowed = throttle_class().allow_request(request, None)
+        timings.append((clock() - start) * 1000000)
+        assert allowed
+    timings.sort()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--checks', type=int, default=100000)
+    parser.add_argument('--clients', type=int, default=1000)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.test import override_settings
+    from rest_framework.request import Request
+    from rest_framework.settings import api_settings
+    from rest_framework.test import APIRequestFactory
+    from rest_framework.throttling import AnonRateThrottle
+    from api import throttling
+
+    settings.CACHES['throttle'] = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'throttle',
+        'OPTIONS': {'MAX_ENTRIES': args.clients * 4},
+    }
+    factory = APIRequestFactory()
+    requests = [
+        Request(factory.get('/api/books/', REMOTE_ADDR=f'10.{index // 65536}.{index // 256 % 256}.{index % 256}'))
+        for index in range(args.clients)
+    ]
+    # Throttles read request.user: resolve it once, outside the timings.
+    for request in requests:
+        request.user
+
+    class SlidingWindowThrottle(throttling.AnonReadThrottle):
+        algorithm = throttling.SlidingWindow
+
+    class TokenBucketThrottle(throttling.AnonReadThrottle):
+        algorithm = throttling.TokenBucket
+
+    rates = {'anon': RATE, 'anon_read': RATE}
+    scenarios = [
+        ('drf AnonRateThrottle', 'default cache', AnonRateThrottle, None),
+        ('sliding window', 'LocalStore', SlidingWindowThrottle, None),
+        ('token bucket', 'LocalStore', TokenBucketThrottle, None),
+        ('sliding window', 'CacheStore', SlidingWindowThrottle, 'throttle'),
+        ('token bucket', 'CacheStore', TokenBucketThrottle, 'throttle'),
+    ]
+    rows = []
+    with override_settings(REST_FRAMEWORK={**api_settings.user_settings, 'DEFAULT_THROTTLE_RATES': rates}):
+        # DRF's throttles read their rates at import.
+        AnonRateThrottle.THROTTLE_RATES = rates
+        for label, store, throttle_class, alias in scenarios:
+            with override_settings(API_THROTTLE_STORE=alias):
+                timings = time_checks(throttle_class, requests, args.checks)
+            rows.append([
+                label, store, f'{statistics.median(timings):.1f}',
+                f'{timings[int(len(timings) * 0.99) - 1]:.1f}',
+            ])
+
+    print(f'{args.checks} checks over {args.clients} client addresses')
+    print_table(['algorithm', 'store', 'median µs', 'p99 µs'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+import os
+import random
+import statistics
+import time
+
+WORDS = (
+    'abbey age air autumn bell bird blood bridge castle city cloud crown dark dawn '
+    'desert dream earth east empire evening fire flower forest garden ghost glass gold '
+    'harbour heart hill home house island journey king lady lake light lion love '
+    'moon mountain night north ocean orchard palace queen rain river road rose sea '
+    'secret shadow ship silence silver sky snow song spring star stone storm summer '
+    'sun tide tower town tree valley voice war water west wind winter wolf world'
+).split()
+FIRST_NAMES = 'Ada Bram Charlotte Daniel Edith Frances George Henry Iris Jane Kurt Leo Mary Nora Oscar'.split()
+LAST_NAMES = 'Austen Bronte Collins Dickens Eliot Forster Gaskell Hardy Irving James Kipling Lawrence'.split()
+
+
+def setup_django(database=None, reuse=False):
+    """
+    Configures Django for a benchmark run and creates the schema.
+    The database is in memory unless `database` names a file, for
+    measurements where commits have to reach the disk or that run in
+    several processes. The file is recreated unless `reuse` is set.
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'advanced_api_project.settings')
+
+    from django.conf import settings
+    if database:
+        if os.path.exists(database) and not reuse:
+            os.remove(database)
+    settings.DATABASES['default']['NAME'] = database or ':memory:'
+
+    import django
+    django.setup()
+
+    # Requests are built with APIRequestFactory, whose host is 'testserver'.
+    settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, 'testserver']
+
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0, interactive=False)
+
+
+def seed_books(rows, authors=1000, batch_size=5000, seed=0):
+    """
+    Fills the database with `rows` books spread over `authors` authors.
+    Titles and names are drawn from small word lists (deterministically for a
+    given seed) so that searches match a realistic share of the rows.
+    """
+    from api.models import Author, Book
+
+    rng = random.Random(seed)
+    Author.objects.bulk_create(
+        [
+            Author(name=f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {index}')
+            for index in range(authors)
+        ],
+        batch_size=batch_size,
+    )
+    author_ids = list(Author.objects.values_list('id', flat=True))
+    for start in range(0, rows, batch_size):
+        Book.objects.bulk_create(
+            [
+                Book(
+                    title=' '.join(rng.choice(WORDS).title() for _ in range(rng.randint(1, 4))),
+                    publication_year=1800 + index % 225,
+                    author_id=author_ids[index % len(author_ids)],
+                )
+                for index in range(start, min(start + batch_size, rows))
+            ],
+            batch_size=batch_size,
+        )
+
+
+def reset_books():
+    from api.models import Author, Book
+
+    Book.objects.all().delete()
+    Author.objects.all().delete()
+
+
+def measure(func, repeat=20, warmup=2):
+    """Calls func repeatedly and returns its timings in milliseconds."""
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        'median_ms': statistics.median(timings),
+        'p95_ms': sorted(timings)[int(len(timings) * 0.95) - 1],
+    }
+
+
+def print_table(headers, rows):
+    widths = [max(len(str(value)) for value in column) for column in zip(headers, *rows)]
+    for row in [headers, *rows]:
+        print('  '.join(str(value).rjust(width) for value, width in zip(row, widths)))
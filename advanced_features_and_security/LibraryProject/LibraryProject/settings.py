@@ -72,6 +72,8 @@ SECURE_CONTENT_TYPE_NOSNIFF = True  # Prevent MIME-type sniffing
 SECURE_BROWSER_XSS_FILTER = True    # Enable browser XSS protection
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
 MIDDLEWARE = [
+    # Read replicas and read-your-writes (relationship_app.routers).
+    'relationship_app.routers.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -112,6 +114,18 @@ DATABASES = {
     }
 }
 
+# Reads of safe requests go to one of DATABASE_REPLICAS, writes to
+# 'default' (relationship_app.routers). A client that wrote reads from
+# 'default' for DATABASE_REPLICA_STICKY_SECONDS, to outlast the replication
+# lag. List PostgreSQL replicas here in production, or SQLite copies locally.
+DATABASE_ROUTERS = ['relationship_app.routers.ReplicaRouter']
+DATABASE_REPLICAS = []
+DATABASE_REPLICA_STICKY_SECONDS = 5
+# Clients sending an Authorization header are also pinned by an entry in
+# this cache, as API clients often drop the cookie: use a shared cache when
+# running several workers.
+DATABASE_REPLICA_STICKY_CACHE = 'default'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -132,6 +146,11 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Permission checks read users' permission sets from the cache
+# (relationship_app.backends), invalidated on permission and group changes.
+AUTHENTICATION_BACKENDS = ['relationship_app.backends.CachedPermissionBackend']
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
@@ -0,0 +1,54 @@
+import os
+import statistics
+import time
+
+
+def setup_django():
+    """Configures Django for a benchmark run, on an in-memory database, and creates the schema."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'LibraryProject.settings')
+
+    from django.conf import settings
+    settings.DATABASES = {'default': {**settings.DATABASES['default'], 'NAME': ':memory:'}}
+
+    import django
+    django.setup()
+
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0, interactive=False)
+
+
+def count_queries(func, *args):
+    """The queries func runs (counted as executed: the debug query log holds 9000 at most)."""
+    from django.db import connection
+
+    count = 0
+
+    def counter(execute, sql, params, many, context):
+        nonlocal count
+        count += 1
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(counter):
+        func(*args)
+    return count
+
+
+def measure(func, repeat=20, warmup=2):
+    """Calls func repeatedly and returns its timings in milliseconds."""
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        'median_ms': statistics.median(timings),
+        'p95_ms': sorted(timings)[int(len(timings) * 0.95) - 1],
+    }
+
+
+def print_table(headers, rows):
+    widths = [max(len(str(value)) for value in column) for column in zip(headers, *rows)]
+    for row in [headers, *rows]:
+        print('  '.join(str(value).rjust(width) for value, width in zip(row, widths)))
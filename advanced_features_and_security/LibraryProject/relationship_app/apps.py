@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class RelationshipAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'relationship_app'
+
+    def ready(self):
+        # Invalidation of the roles and permissions cached across requests.
+        from . import signals  # noqa: F401
@@ -0,0 +1,46 @@
+"""
+Maintained book counts: Library.book_count (books in the library) and
+Author.book_count (books by the author), so that dashboards read them from
+an index instead of counting the Library.books through table.
+
+Each recount sets the counts of the given rows from a correlated COUNT in a
+single UPDATE, so counters never drift, whatever changes raced. They run:
+- on Library.books changes, Book saves and deletes (relationship_app.signals)
+- after Book.objects.bulk_create(), bulk_update() and update() (BookQuerySet)
+
+Writes that bypass both, such as Library.books.through.objects.bulk_create()
+or raw SQL, must call recount_libraries() / recount_authors() afterwards.
+`manage.py recount_books` recomputes and verifies every count, in chunks.
+"""
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Author, Book, Library
+
+
+def library_counts():
+    """The number of books of the library OuterRef('pk')."""
+    return Coalesce(Subquery(
+        Library.books.through.objects.filter(library_id=OuterRef('pk'))
+        .order_by().values('library_id').annotate(count=Count('*')).values('count')
+    ), 0)
+
+
+def author_counts():
+    """The number of books by the author OuterRef('pk')."""
+    return Coalesce(Subquery(
+        Book.objects.filter(author_id=OuterRef('pk'))
+        .order_by().values('author_id').annotate(count=Count('*')).values('count')
+    ), 0)
+
+
+def recount_libraries(library_ids=None):
+    """Recounts the books of `library_ids`, or of every library."""
+    libraries = Library.objects.all() if library_ids is None else Library.objects.filter(pk__in=library_ids)
+    return libraries.update(book_count=library_counts())
+
+
+def recount_authors(author_ids=None):
+    """Recounts the books of `author_ids`, or of every author."""
+    authors = Author.objects.all() if author_ids is None else Author.objects.filter(pk__in=author_ids)
+    return authors.update(book_count=author_counts())
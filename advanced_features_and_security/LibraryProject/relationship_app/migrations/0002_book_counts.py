@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:33
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_books(apps, schema_editor):
+    """Sets the counts of the existing rows, as relationship_app.counters does."""
+    Author = apps.get_model('relationship_app', 'Author')
+    Book = apps.get_model('relationship_app', 'Book')
+    Library = apps.get_model('relationship_app', 'Library')
+    Library.objects.update(book_count=Coalesce(Subquery(
+        Library.books.through.objects.filter(library_id=OuterRef('pk'))
+        .order_by().values('library_id').annotate(count=Count('*')).values('count')
+    ), 0))
+    Author.objects.update(book_count=Coalesce(Subquery(
+        Book.objects.filter(author_id=OuterRef('pk'))
+        .order_by().values('author_id').annotate(count=Count('*')).values('count')
+    ), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('relationship_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='author',
+            name='book_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='library',
+            name='book_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_books, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='author',
+            index=models.Index(fields=['book_count', 'name'], name='author_book_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='library',
+            index=models.Index(fields=['book_count', 'name'], name='library_book_count_idx'),
+        ),
+    ]
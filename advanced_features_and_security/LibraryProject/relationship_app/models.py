@@ -14,20 +14,63 @@ class Review(models.Model):
 
 class Author(models.Model):
     name = models.CharField(max_length=100)
+    # Maintained by relationship_app.counters; (book_count, name) answers
+    # the largest authors from the index alone.
+    book_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [models.Index(fields=['book_count', 'name'], name='author_book_count_idx')]
 
     def __str__(self):
         return self.name
 
+class BookQuerySet(models.QuerySet):
+    """Bulk operations that keep Author.book_count current: they send no signals."""
+    def bulk_create(self, objs, *args, **kwargs):
+        from .counters import recount_authors
+        objs = super().bulk_create(objs, *args, **kwargs)
+        recount_authors({book.author_id for book in objs})
+        return objs
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        from .counters import recount_authors
+        if 'author' not in fields:
+            return super().bulk_update(objs, fields, *args, **kwargs)
+        objs = list(objs)
+        old = set(self.filter(pk__in=[book.pk for book in objs]).values_list('author_id', flat=True))
+        rows = super().bulk_update(objs, fields, *args, **kwargs)
+        recount_authors(old | {book.author_id for book in objs})
+        return rows
+
+    def update(self, **kwargs):
+        from .counters import recount_authors
+        if 'author' not in kwargs and 'author_id' not in kwargs:
+            return super().update(**kwargs)
+        old = set(self.values_list('author_id', flat=True))
+        rows = super().update(**kwargs)
+        new = kwargs.get('author_id', kwargs.get('author'))
+        new = new.pk if isinstance(new, Author) else new
+        # An expression (F('...')) may move books to any author: recount them all.
+        recount_authors(old | {new} if isinstance(new, int) else None)
+        return rows
+
 class Book(models.Model):
     title = models.CharField(max_length=200)
     author = models.ForeignKey(Author, on_delete=models.CASCADE)
 
+    objects = BookQuerySet.as_manager()
+
     def __str__(self):
         return self.title
 
 class Library(models.Model):
     name = models.CharField(max_length=100)
     books = models.ManyToManyField(Book)
+    # Maintained by relationship_app.counters, like Author.book_count.
+    book_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [models.Index(fields=['book_count', 'name'], name='library_book_count_idx')]
 
     def __str__(self):
         return self.name
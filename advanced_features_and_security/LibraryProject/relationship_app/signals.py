@@ -0,0 +1,108 @@
+"""
+Keeps relationship_app's cached and denormalized data current:
+- the roles cached in sessions (relationship_app.roles): saving or deleting
+  a UserProfile makes its user's sessions reload the role
+- the permission sets of CachedPermissionBackend (relationship_app.backends):
+  changes to a user, to their permissions or groups drop their set;
+  changes to groups' permissions, or to permissions, drop every set
+- Library.book_count and Author.book_count (relationship_app.counters)
+
+QuerySet.update() sends no signals: call roles.invalidate_role() or the
+backends invalidation functions after it (BookQuerySet recounts by itself).
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .backends import invalidate_all_permissions, invalidate_user_permissions
+from .counters import recount_authors, recount_libraries
+from .models import Book, Library, UserProfile
+from .roles import invalidate_role
+
+User = get_user_model()
+M2M_CHANGES = ('post_add', 'post_remove', 'post_clear')
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_profile_role(sender, instance, **kwargs):
+    invalidate_role(instance.user_id)
+
+
+@receiver(m2m_changed, sender=User.user_permissions.through)
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidate_user_m2m(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in M2M_CHANGES:
+        return
+    if not reverse:
+        invalidate_user_permissions(instance.pk)
+    elif pk_set:
+        # permission.user_set or group.user_set: pk_set holds the users.
+        invalidate_user_permissions(*pk_set)
+    else:
+        # A clear() from the permission or group side: the users are gone.
+        invalidate_all_permissions()
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def invalidate_group_permissions(sender, action, **kwargs):
+    if action in M2M_CHANGES:
+        invalidate_all_permissions()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user(sender, instance, update_fields=None, **kwargs):
+    # Logging in saves last_login, which has no bearing on permissions.
+    if update_fields != frozenset({'last_login'}):
+        invalidate_user_permissions(instance.pk)
+
+
+@receiver(post_delete, sender=Group)
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+def invalidate_groups_or_permissions(sender, **kwargs):
+    # A new permission is one more for superusers.
+    invalidate_all_permissions()
+
+
+# Book counts (relationship_app.counters).
+
+@receiver(m2m_changed, sender=Library.books.through)
+def count_library_books(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in M2M_CHANGES:
+            recount_libraries([instance.pk])
+    elif action == 'pre_clear':
+        # book.library_set.clear(): the libraries are unknown once it is done.
+        instance._cleared_library_ids = list(instance.library_set.values_list('pk', flat=True))
+    elif action == 'post_clear':
+        recount_libraries(instance._cleared_library_ids)
+    elif action in M2M_CHANGES:
+        recount_libraries(pk_set)
+
+
+@receiver(pre_save, sender=Book)
+def remember_book_author(sender, instance, **kwargs):
+    """Records the stored author, whose count a move to another author also changes."""
+    instance._old_author_id = None
+    if instance.pk is not None and not instance._state.adding:
+        instance._old_author_id = Book.objects.filter(pk=instance.pk).values_list('author_id', flat=True).first()
+
+
+@receiver(post_save, sender=Book)
+def count_saved_book(sender, instance, **kwargs):
+    recount_authors({instance.author_id, getattr(instance, '_old_author_id', None)} - {None})
+
+
+@receiver(pre_delete, sender=Book)
+def remember_book_libraries(sender, instance, **kwargs):
+    # Deleting the book deletes its through rows without sending m2m_changed.
+    instance._library_ids = list(instance.library_set.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Book)
+def count_deleted_book(sender, instance, **kwargs):
+    recount_authors([instance.author_id])
+    recount_libraries(getattr(instance, '_library_ids', []))
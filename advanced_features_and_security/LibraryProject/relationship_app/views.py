@@ -1,20 +1,57 @@
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
+from django.utils.html import format_html
+from django.views.generic import ListView
 from .models import Book
 from .models import Library
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
 from django.views.generic.detail import DetailView
 from django.contrib.auth import login
-from django.contrib.auth.decorators import user_passes_test
 from .models import UserProfile
 from django.contrib.auth.decorators import permission_required
 from .forms import BookForm
+from .roles import get_role, role_required
 
 
 
+# Rows fetched from the database at a time by the streaming views.
+STREAM_CHUNK_SIZE = 2000
+
+
+def books_with_authors():
+    """Books with their author joined in, so rendering book.author.name costs no query."""
+    return Book.objects.select_related('author')
+
+
+def stream_books(heading, books):
+    """
+    Yields an HTML page listing `books` a row at a time, fetching them in
+    chunks: memory stays flat however many books there are.
+    """
+    yield format_html(
+        '<!DOCTYPE html>\n<html lang="en">\n<head>\n    <meta charset="UTF-8">\n    <title>{}</title>\n</head>\n'
+        '<body>\n    <h1>{}</h1>\n    <ul>\n',
+        heading, heading,
+    )
+    for book in books.iterator(chunk_size=STREAM_CHUNK_SIZE):
+        yield format_html('        <li>{} by {}</li>\n', book.title, book.author.name)
+    yield '    </ul>\n</body>\n</html>\n'
+
+
+def streaming_books_response(heading, books):
+    # The response is consumed after the middleware returned: pick the
+    # database now, while the request's routing still applies.
+    return StreamingHttpResponse(stream_books(heading, books.using(books.db)))
+
+
 def list_books(request):
-    books = Book.objects.all()
-    return render(request, 'relationship_app/book_list.html', {'books': books})
+    books = books_with_authors()
+    return render(request, 'relationship_app/list_books.html', {'books': books})
+
+def list_books_stream(request):
+    return streaming_books_response('Books Available:', books_with_authors().order_by('pk'))
 
 def home_view(request):
     return render(request, 'relationship_app/home.html')
@@ -24,6 +61,30 @@ class LibraryDetailView(DetailView):
     template_name = 'relationship_app/library_detail.html'
     context_object_name = 'library'
 
+    def get_queryset(self):
+        # Two queries whatever the size of the library: the library, then its
+        # books joined with their authors.
+        return Library.objects.prefetch_related(Prefetch('books', queryset=books_with_authors()))
+
+class LibraryBooksView(ListView):
+    """The books of a library, a page at a time: for libraries too large for LibraryDetailView."""
+    template_name = 'relationship_app/library_books.html'
+    context_object_name = 'books'
+    paginate_by = 100
+
+    def get_queryset(self):
+        self.library = get_object_or_404(Library, pk=self.kwargs['pk'])
+        return books_with_authors().filter(library=self.library).order_by('title', 'pk')
+
+    def get_context_data(self, **kwargs):
+        return super().get_context_data(library=self.library, **kwargs)
+
+def library_books_stream(request, pk):
+    library = get_object_or_404(Library, pk=pk)
+    return streaming_books_response(
+        f'Library: {library.name}', books_with_authors().filter(library=library).order_by('pk'),
+    )
+
 def login_view(request):
     if request.method == 'POST':
         form = AuthenticationForm(data=request.POST)
@@ -49,23 +110,23 @@ def register_view(request):
     return render(request, 'relationship_app/register.html', {'form': form})
 
 def is_admin(user):
-    return hasattr(user, 'userprofile') and user.userprofile.role == 'Admin'
+    return get_role(user) == 'Admin'
 
 def is_librarian(user):
-    return hasattr(user, 'userprofile') and user.userprofile.role == 'Librarian'
+    return get_role(user) == 'Librarian'
 
 def is_member(user):
-    return hasattr(user, 'userprofile') and user.userprofile.role == 'Member'
+    return get_role(user) == 'Member'
 
-@user_passes_test(is_admin)
+@role_required('Admin')
 def admin_view(request):
     return render(request, 'relationship_app/admin_view.html')
 
-@user_passes_test(is_librarian)
+@role_required('Librarian')
 def librarian_view(request):
     return render(request, 'relationship_app/librarian_view.html')
 
-@user_passes_test(is_member)
+@role_required('Member')
 def member_view(request):
     return render(request, 'relationship_app/member_view.html')
 
@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        # Token cache invalidation (api.authentication).
+        from . import signals  # noqa: F401
+
+        # PRAGMAs of the SQLite connection profiles (api.database).
+        from django.db.backends.signals import connection_created
+        from .database import apply_pragmas
+        connection_created.connect(apply_pragmas, dispatch_uid='api.database.apply_pragmas')
@@ -0,0 +1,249 @@
+"""
+Token authentication with a cache in front of the Token + User query.
+
+CachedTokenAuthentication keeps authenticated tokens in two tiers:
+- an LRU in each process, bounded to settings.TOKEN_AUTH_CACHE_SIZE entries
+- optionally, the cache named by settings.TOKEN_AUTH_SHARED_CACHE (Redis,
+  memcached...), shared by every process
+
+Entries are a snapshot of what authorization reads: the token key and
+creation time, and the user's primary key, username, is_active, is_staff
+and is_superuser. The password hash and the rest of the row are never
+cached. Each request gets a user built from the snapshot, with the other
+fields deferred (loaded from the database if something reads them).
+
+Both tiers expire entries after settings.TOKEN_AUTH_CACHE_TIMEOUT seconds.
+Every token also has a generation counter in the shared cache. An entry is
+only used while the generation it was stored under is still current, so
+`invalidate()` only has to move the counter. Any process sees that on its
+next request. api.signals invalidates a token when it is deleted or
+rotated, and invalidates a user's tokens when the user is saved
+(deactivated, `is_staff` changed...).
+
+A warm request costs one shared-cache read (the generation) and no query.
+Without a shared cache, the LRU is the only tier and invalidations only
+reach the current process. Writes that bypass model signals
+(QuerySet.update()) are only picked up when the entries expire.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+
+
+class LocalTokenCache:
+    """Thread-safe LRU of token key -> (snapshot, expiry, generation)."""
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, generation):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            token, expires, entry_generation = entry
+            if expires <= time.monotonic() or entry_generation != generation:
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return token
+
+    def set(self, key, token, generation):
+        expires = time.monotonic() + getattr(settings, 'TOKEN_AUTH_CACHE_TIMEOUT', 300)
+        max_size = getattr(settings, 'TOKEN_AUTH_CACHE_SIZE', 10000)
+        with self.lock:
+            self.entries[key] = (token, expires, generation)
+            self.entries.move_to_end(key)
+            while len(self.entries) > max_size:
+                self.entries.popitem(last=False)
+
+    def discard(self, keys):
+        with self.lock:
+            for key in keys:
+                self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+local_cache = LocalTokenCache()
+
+# The user fields a snapshot keeps (besides the primary key and username).
+USER_FIELDS = ('is_active', 'is_staff', 'is_superuser')
+
+
+def snapshot(token):
+    """The cached form of an authenticated token (see module docstring)."""
+    user = token.user
+    names = {type(user)._meta.pk.attname, type(user).USERNAME_FIELD, *USER_FIELDS}
+    return {
+        'db': token._state.db,
+        'token': {'key': token.key, 'user_id': user.pk, 'created': token.created},
+        'user': {name: getattr(user, name) for name in names},
+    }
+
+
+def load(model, db, values):
+    """A `model` instance from some of its fields, the others deferred."""
+    fields = [field.attname for field in model._meta.concrete_fields if field.attname in values]
+    return model.from_db(db, fields, [values[name] for name in fields])
+
+
+def get_shared_cache():
+    alias = getattr(settings, 'TOKEN_AUTH_SHARED_CACHE', None)
+    return caches[alias] if alias else None
+
+
+def shared_key(key):
+    # Token keys are credentials: the shared cache only sees their digest.
+    return 'auth:token:' + hashlib.sha256(key.encode()).hexdigest()
+
+
+def generation_key(key):
+    return shared_key(key) + ':generation'
+
+
+def lookup(key):
+    """
+    Returns (generation, shared entry): the current generation of the token
+    and its entry in the shared cache (None on a miss), read in one round
+    trip. Both are None without a shared cache.
+    """
+    shared = get_shared_cache()
+    if shared is None:
+        return None, None
+    values = shared.get_many([generation_key(key), shared_key(key)])
+    generation = values.get(generation_key(key))
+    if generation is None:
+        # Never invalidated, or evicted: start somewhere no entry can have
+        # been stored under.
+        shared.add(generation_key(key), time.time_ns(), None)
+        generation = shared.get(generation_key(key))
+    return generation, values.get(shared_key(key))
+
+
+async def alookup(key):
+    """lookup() for async views, through the cache's async API."""
+    shared = get_shared_cache()
+    if shared is None:
+        return None, None
+    values = await shared.aget_many([generation_key(key), shared_key(key)])
+    generation = values.get(generation_key(key))
+    if generation is None:
+        await shared.aadd(generation_key(key), time.time_ns(), None)
+        generation = await shared.aget(generation_key(key))
+    return generation, values.get(shared_key(key))
+
+
+def invalidate(keys):
+    """Retires the cached entries of the given token keys, in every process."""
+    keys = list(keys)
+    local_cache.discard(keys)
+    shared = get_shared_cache()
+    if shared is None:
+        return
+    for key in keys:
+        try:
+            shared.incr(generation_key(key))
+        except ValueError:
+            shared.set(generation_key(key), time.time_ns(), None)
+    shared.delete_many([shared_key(key) for key in keys])
+
+
+def invalidate_write(keys):
+    """
+    invalidate() for a database write: once now, and once more when the
+    transaction commits, so an entry cached from the old rows in between is
+    retired as well.
+    """
+    keys = list(keys)
+    invalidate(keys)
+    transaction.on_commit(lambda: invalidate(keys))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication that answers from the token cache (see module
+    docstring) and only queries Token + User on a miss. Failed lookups
+    (unknown token, inactive user) are not cached. aauthenticate() does the
+    same for async views, with the async cache API and ORM.
+    """
+    def authenticate_credentials(self, key):
+        generation, shared_entry = lookup(key)
+        entry = self.get_cached(key, generation, shared_entry)
+        if entry is None:
+            # The generation was read first: an invalidation racing this
+            # query leaves the entry stored under a retired generation.
+            entry = snapshot(super().authenticate_credentials(key)[1])
+            local_cache.set(key, entry, generation)
+            shared = get_shared_cache()
+            if shared is not None:
+                shared.set(shared_key(key), {'entry': entry, 'generation': generation}, self.get_timeout())
+        return self.hand_out(entry)
+
+    async def aauthenticate(self, request):
+        """authenticate() for async views (api.async_views)."""
+        key = self.get_key(request)
+        if key is None:
+            return None
+        generation, shared_entry = await alookup(key)
+        entry = self.get_cached(key, generation, shared_entry)
+        if entry is None:
+            try:
+                token = await self.get_model().objects.select_related('user').aget(key=key)
+            except self.get_model().DoesNotExist:
+                raise exceptions.AuthenticationFailed(_('Invalid token.'))
+            if not token.user.is_active:
+                raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+            entry = snapshot(token)
+            local_cache.set(key, entry, generation)
+            shared = get_shared_cache()
+            if shared is not None:
+                await shared.aset(shared_key(key), {'entry': entry, 'generation': generation}, self.get_timeout())
+        return self.hand_out(entry)
+
+    def get_key(self, request):
+        """The token key of the Authorization header, as TokenAuthentication.authenticate() reads it."""
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) == 1:
+            raise exceptions.AuthenticationFailed(_('Invalid token header. No credentials provided.'))
+        if len(auth) > 2:
+            raise exceptions.AuthenticationFailed(_('Invalid token header. Token string should not contain spaces.'))
+        try:
+            return auth[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed(
+                _('Invalid token header. Token string should not contain invalid characters.')
+            )
+
+    def get_cached(self, key, generation, shared_entry):
+        entry = local_cache.get(key, generation)
+        if entry is None and shared_entry is not None and shared_entry['generation'] == generation:
+            # Entries cached in another format (by an older release) are misses.
+            entry = shared_entry.get('entry')
+            if entry is not None:
+                local_cache.set(key, entry, generation)
+        return entry
+
+    def get_timeout(self):
+        return getattr(settings, 'TOKEN_AUTH_CACHE_TIMEOUT', 300)
+
+    def hand_out(self, entry):
+        # Fresh instances per request: nothing cached is shared between them.
+        user = load(get_user_model(), entry['db'], entry['user'])
+        token = load(self.get_model(), entry['db'], entry['token'])
+        token.user = user
+        return user, token
@@ -0,0 +1,228 @@
+"""
+Read-only fast path for list serializers.
+
+For every row, DRF builds a model instance and then walks the serializer
+fields: get_attribute() follows the source, None is checked, and
+to_representation() is called. When a serializer is made of plain columns,
+that walk is the same for every row. compile_plan() does it once per
+serializer class and field set. It works out which columns to select with
+QuerySet.values() and, for each field, a converter that gives exactly what
+the field's to_representation() would. The function returned by bind()
+then turns a values() row straight into the representation, with no model
+instance and no field machinery.
+
+get_plan() returns None for any serializer with a field a column cannot
+provide: methods, properties, dotted sources, to-many relations, hyperlinks,
+and so on. Such serializers are serialized the usual way.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import QuerySet
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+# Field classes whose to_representation() only depends on the value (not on
+# the request or the parent), so a compiled plan can call it directly.
+COLUMN_FIELDS = (
+    serializers.BooleanField, serializers.CharField, serializers.ChoiceField,
+    serializers.DateField, serializers.DateTimeField, serializers.DecimalField,
+    serializers.DurationField, serializers.FloatField, serializers.IntegerField,
+    serializers.JSONField, serializers.ReadOnlyField, serializers.TimeField,
+    serializers.UUIDField,
+)
+
+# to_representation() implementations that are a builtin call in disguise.
+BUILTIN_CONVERTERS = {
+    serializers.CharField.to_representation: str,
+    serializers.IntegerField.to_representation: int,
+    serializers.FloatField.to_representation: float,
+}
+
+# Compiled plans, keyed by serializer class and field set (see plan_key()).
+_plans = {}
+
+
+def datetime_converter(field):
+    """
+    DateTimeField.to_representation() for ISO 8601 output, with the field's
+    time zone looked up once per list instead of once per value. Values it
+    does not expect (naive, out of range) go through the field itself.
+    """
+    field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+    if field_timezone is None:
+        return field.to_representation
+
+    def convert(value):
+        if value.utcoffset() is None:
+            return field.to_representation(value)
+        try:
+            text = value.astimezone(field_timezone).isoformat()
+        except OverflowError:
+            return field.to_representation(value)
+        return text[:-6] + 'Z' if text.endswith('+00:00') else text
+    return convert
+
+
+def get_converter(field):
+    """Returns the function turning a column value into the representation of `field`."""
+    method = type(field).to_representation
+    if method in BUILTIN_CONVERTERS:
+        return BUILTIN_CONVERTERS[method]
+    if (
+        method is serializers.DateTimeField.to_representation
+        and type(field).enforce_timezone is serializers.DateTimeField.enforce_timezone
+        and str(getattr(field, 'format', api_settings.DATETIME_FORMAT)).lower() == ISO_8601
+    ):
+        return datetime_converter(field)
+    return field.to_representation
+
+
+class RepresentationPlan:
+    """
+    The columns a serializer needs and how to turn a values() row into its
+    representation.
+
+    `steps` holds one (field name, column, field, nested plan) tuple per
+    readable field. `field` is None when the column value is the
+    representation (primary keys). A nested serializer has a nested plan,
+    and its column is the related primary key, which tells "no related
+    object" (None) apart.
+    """
+    def __init__(self, steps, columns):
+        self.steps = steps
+        self.columns = columns
+
+    def values(self, queryset):
+        """
+        Returns `queryset` as values() rows carrying the plan's columns. The
+        columns the queryset is ordered by are included as well, since
+        pagination reads its cursor from them.
+        """
+        columns = list(self.columns)
+        pk_name = queryset.model._meta.pk.name
+        for key in [*(queryset.query.order_by or queryset.model._meta.ordering), pk_name]:
+            name = key.lstrip('-') if isinstance(key, str) else None
+            if name == 'pk':
+                name = pk_name
+            if name and name not in columns:
+                columns.append(name)
+        return queryset.values(*columns)
+
+    def bind(self):
+        """
+        Returns a function building the representation of one values() row.
+        Converters are resolved here, once per list, since some depend on
+        the active time zone.
+        """
+        steps = [
+            (
+                field_name,
+                column,
+                None if field is None else get_converter(field),
+                None if nested is None else nested.bind(),
+            )
+            for field_name, column, field, nested in self.steps
+        ]
+
+        def build(row):
+            representation = {}
+            for field_name, column, convert, build_nested in steps:
+                value = row[column]
+                if value is None:
+                    representation[field_name] = None
+                elif build_nested is not None:
+                    representation[field_name] = build_nested(row)
+                elif convert is None:
+                    representation[field_name] = value
+                else:
+                    representation[field_name] = convert(value)
+            return representation
+        return build
+
+
+def plan_key(serializer):
+    """Identifies the field set of `serializer`, which '?fields=' and '?expand=' change."""
+    return (type(serializer), tuple(
+        (field_name, plan_key(field) if isinstance(field, serializers.Serializer) else type(field))
+        for field_name, field in serializer.fields.items()
+    ))
+
+
+def get_plan(serializer):
+    """Returns the (cached) plan of a serializer instance, or None if it has none."""
+    key = plan_key(serializer)
+    if key not in _plans:
+        _plans[key] = compile_plan(serializer)
+    return _plans[key]
+
+
+def compile_plan(serializer, prefix=''):
+    """
+    Builds the RepresentationPlan of `serializer`. `prefix` is the lookup
+    path of a nested serializer (e.g. 'author__'). Returns None as soon as
+    a field cannot be served from a column.
+    """
+    model = getattr(getattr(serializer, 'Meta', None), 'model', None)
+    if model is None:
+        return None
+    pk_column = prefix + model._meta.pk.name
+    columns = [pk_column]
+    steps = []
+    for field in serializer._readable_fields:
+        if field.source == '*' or len(field.source_attrs) != 1:
+            return None
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            return None
+        if not model_field.concrete or model_field.many_to_many:
+            return None
+        column = prefix + model_field.name
+
+        if model_field.is_relation:
+            if isinstance(field, serializers.Serializer):
+                nested = compile_plan(field, prefix=f'{column}__')
+                if nested is None or field.Meta.model is not model_field.related_model:
+                    return None
+                column = nested.columns[0]
+                steps.append((field.field_name, column, None, nested))
+                columns.extend(nested.columns)
+                continue
+            # values() on a foreign key gives the related primary key, which
+            # is what PrimaryKeyRelatedField renders.
+            if not isinstance(field, serializers.PrimaryKeyRelatedField) or field.pk_field is not None:
+                return None
+            if type(field).to_representation is not serializers.PrimaryKeyRelatedField.to_representation:
+                return None
+            value_field = None
+        elif isinstance(field, COLUMN_FIELDS):
+            value_field = field
+        else:
+            return None
+
+        steps.append((field.field_name, column, value_field, None))
+        if column not in columns:
+            columns.append(column)
+    return RepresentationPlan(steps, columns)
+
+
+class FastListSerializerMixin:
+    """
+    ListSerializer side of the fast path. When the child serializer has a
+    plan, the list is read:
+    - from an unevaluated queryset, with QuerySet.values()
+    - from rows the view already read with `plan.values()` (a list of dicts)
+
+    Anything else (prefetched managers, model instances, validated data) is
+    serialized the usual way.
+    """
+    def to_representation(self, data):
+        plan = get_plan(self.child)
+        if plan is not None and data is self.instance:
+            if isinstance(data, QuerySet) and data._result_cache is None and not data._prefetch_related_lookups:
+                build = plan.bind()
+                return [build(row) for row in plan.values(data)]
+            if isinstance(data, list) and data and isinstance(data[0], dict):
+                build = plan.bind()
+                return [build(row) for row in data]
+        return super().to_representation(data)
@@ -0,0 +1,97 @@
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.permissions import SAFE_METHODS
+
+from . import fastpath, writes
+
+
+class SparseFieldsViewMixin:
+    """
+    View side of SparseFieldsMixin.
+
+    Reads '?fields=id,title' once per request, narrows the serializer and
+    pushes the same narrowing down to SQL with QuerySet.only(), so columns
+    nobody asked for are never fetched. Only applies to reads.
+    """
+    fields_query_param = 'fields'
+
+    def get_fields(self):
+        if self.request is None or self.request.method not in SAFE_METHODS:
+            return None
+        value = self.request.query_params.get(self.fields_query_param, '')
+        requested = [name.strip() for name in value.split(',') if name.strip()]
+        return self.get_serializer_class().get_valid_fields(requested) or None
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fields = self.get_fields()
+        if fields is None:
+            return queryset
+        columns = self.get_serializer_class().get_only_fields(fields)
+        for key in queryset.query.order_by:
+            if isinstance(key, str) and '__' not in key:
+                columns.add(key.lstrip('-'))
+        return queryset.only(*columns)
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('fields', self.get_fields())
+        return super().get_serializer(*args, **kwargs)
+
+
+class FastListViewMixin:
+    """
+    View side of the serializer fast path (api.fastpath).
+
+    When the list serializer has a compiled plan for the requested fields,
+    pages are read as QuerySet.values() rows instead of model instances,
+    and the serializer builds the representation straight from them.
+    Otherwise the page holds model instances, as before. Async list views
+    (api.async_views) read their rows through get_list_queryset() too.
+    """
+    def get_fast_plan(self):
+        if self.request is None or self.request.method not in SAFE_METHODS:
+            return None
+        return fastpath.get_plan(self.get_serializer())
+
+    def get_list_queryset(self, queryset):
+        plan = self.get_fast_plan()
+        if plan is not None:
+            queryset = plan.values(queryset)
+        return queryset
+
+    def paginate_queryset(self, queryset):
+        return super().paginate_queryset(self.get_list_queryset(queryset))
+
+
+class WriteUnavailable(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'The write could not be committed in time, try again shortly.'
+    default_code = 'write_unavailable'
+
+
+class CoalescedWritesMixin:
+    """
+    Sends the writes of create, update and destroy through the
+    WriteCoalescer (api.writes) when settings.WRITE_COALESCING is on, so
+    concurrent requests share one transaction. Validation and the response
+    stay on the request thread. A write whose batch is not committed in
+    time answers 503.
+    """
+    def perform_write(self, func, *args):
+        coalescer = writes.get_write_coalescer()
+        if coalescer is None:
+            return func(*args)
+        try:
+            return coalescer.submit(func, *args)
+        except writes.WriteTimeout:
+            raise WriteUnavailable()
+
+    def perform_create(self, serializer):
+        self.perform_write(super().perform_create, serializer)
+
+    def perform_update(self, serializer):
+        self.perform_write(super().perform_update, serializer)
+
+    def perform_destroy(self, instance):
+        self.perform_write(super().perform_destroy, instance)
+
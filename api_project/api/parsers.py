@@ -0,0 +1,34 @@
+import io
+import re
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+try:
+    import orjson
+except ImportError:  # Optional: FastJSONParser falls back to the stdlib decoder.
+    orjson = None
+
+# orjson reads integers past 64 bits as floats; json.loads() keeps them exact.
+LONG_NUMBER = re.compile(rb'[0-9]{19,}')
+
+
+class FastJSONParser(JSONParser):
+    """
+    Drop-in JSONParser that decodes UTF-8 bodies with orjson when it is
+    installed. Bodies orjson rejects, or that hold numbers it would read
+    differently (integers past 64 bits), go through JSONParser itself, so
+    results and error messages are the same as DRF's.
+    """
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace('_', '-') not in ('utf-8', 'utf8'):
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read()
+        if not LONG_NUMBER.search(body):
+            try:
+                return orjson.loads(body)
+            except orjson.JSONDecodeError:
+                pass
+        return super().parse(io.BytesIO(body), media_type, parser_context)
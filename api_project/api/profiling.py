@@ -0,0 +1,176 @@
+"""
+Opt-in request profiling for the API.
+
+ProfilingMiddleware samples settings.API_PROFILING_SAMPLE_RATE of the
+requests (0 turns it off, 1 profiles everything). For a sampled request it
+records:
+- the number of queries and the time spent in them (a connection
+  execute_wrapper)
+- serializer time, excluding the queries it triggers (ProfiledSerializerMixin)
+- renderer time (between process_template_response and the end of render())
+- total time and response size
+
+and reports them in a 'Server-Timing' header and as one JSON log line on the
+'api.profiling' logger. Requests that are not sampled only pay for one
+random() call. Streaming responses are produced after the middleware
+returns, so their rows are not part of the profile. Queries of async views
+run on Django's sync thread, whose connections are not wrapped, so they are
+not counted either.
+"""
+import contextvars
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack, contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from rest_framework import serializers
+
+logger = logging.getLogger(__name__)
+
+_current_profile = contextvars.ContextVar('api_profile', default=None)
+
+
+class RequestProfile:
+    """Timings of one request. Also the execute_wrapper that times its queries."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.timings = {'sql': 0.0, 'serialize': 0.0, 'render': 0.0}
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.timings['sql'] += time.perf_counter() - start
+
+    def begin(self):
+        return time.perf_counter(), self.timings['sql']
+
+    def end(self, name, mark):
+        """Adds the time since `mark` (from begin()) to `name`, minus its SQL time."""
+        start, sql_start = mark
+        elapsed = time.perf_counter() - start
+        self.timings[name] += elapsed - (self.timings['sql'] - sql_start)
+
+    def server_timing(self, total):
+        metrics = [
+            f'sql;dur={self.timings["sql"] * 1000:.2f};desc="{self.queries} queries"',
+            f'serialize;dur={self.timings["serialize"] * 1000:.2f}',
+            f'render;dur={self.timings["render"] * 1000:.2f}',
+            f'total;dur={total * 1000:.2f}',
+        ]
+        return ', '.join(metrics)
+
+
+@contextmanager
+def measure(name):
+    """Times the block into the current request's profile, if it is sampled."""
+    profile = _current_profile.get()
+    if profile is None:
+        yield
+        return
+    mark = profile.begin()
+    try:
+        yield
+    finally:
+        profile.end(name, mark)
+
+
+class ProfiledSerializerMixin:
+    """Counts the time spent building `serializer.data` as serializer time."""
+
+    @property
+    def data(self):
+        with measure('serialize'):
+            return super().data
+
+
+class ProfiledListSerializer(ProfiledSerializerMixin, serializers.ListSerializer):
+    pass
+
+
+class ProfilingMiddleware:
+    """
+    Samples requests and reports where their time went (see module docstring).
+    Put it first in MIDDLEWARE so that the total covers the other middleware.
+    Sync and async capable, so it keeps async views async under ASGI.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        profile = self.start()
+        if profile is None:
+            return self.get_response(request)
+        token = _current_profile.set(profile)
+        try:
+            with self.wrap_connections(profile):
+                response = self.get_response(request)
+        finally:
+            _current_profile.reset(token)
+        return self.finish(request, response, profile)
+
+    async def __acall__(self, request):
+        profile = self.start()
+        if profile is None:
+            return await self.get_response(request)
+        token = _current_profile.set(profile)
+        try:
+            with self.wrap_connections(profile):
+                response = await self.get_response(request)
+        finally:
+            _current_profile.reset(token)
+        return self.finish(request, response, profile)
+
+    def start(self):
+        """Returns a RequestProfile when this request is sampled, else None."""
+        sample_rate = getattr(settings, 'API_PROFILING_SAMPLE_RATE', 0)
+        if not sample_rate or random.random() >= sample_rate:
+            return None
+        return RequestProfile()
+
+    def wrap_connections(self, profile):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(profile))
+        return stack
+
+    def finish(self, request, response, profile):
+        total = time.perf_counter() - profile.start
+        size = None if response.streaming else len(response.content)
+        response['Server-Timing'] = profile.server_timing(total)
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': profile.queries,
+            'sql_ms': round(profile.timings['sql'] * 1000, 2),
+            'serialize_ms': round(profile.timings['serialize'] * 1000, 2),
+            'render_ms': round(profile.timings['render'] * 1000, 2),
+            'total_ms': round(total * 1000, 2),
+            'size': size,
+        }))
+        return response
+
+    def process_template_response(self, request, response):
+        # Called right before DRF's Response is rendered; the post-render
+        # callback closes the measurement.
+        profile = _current_profile.get()
+        if profile is not None:
+            mark = profile.begin()
+            response.add_post_render_callback(lambda rendered: profile.end('render', mark))
+        return response
@@ -0,0 +1,163 @@
+"""
+Read replicas: a database router and its read-your-writes middleware.
+
+settings.DATABASE_REPLICAS lists the aliases holding copies of 'default':
+PostgreSQL streaming replicas in production, or locally SQLite files (a
+copy of the database, or the same file opened read-only, see
+api.database). With ReplicaRouter in DATABASE_ROUTERS and
+ReplicaMiddleware in MIDDLEWARE:
+
+- reads made while serving a safe request (GET, HEAD, OPTIONS) go to a
+  replica, picked at random
+- writes, and every read outside of such a request (unsafe requests,
+  management commands, the shell, tests...), use 'default'
+- read-your-writes: after a request that wrote (an unsafe method, or any
+  write the router saw), the client gets a cookie pinning its reads to
+  'default' for DATABASE_REPLICA_STICKY_SECONDS, longer than the
+  replication lag. The cookie holds its expiry time, so a client that
+  keeps it past that is not pinned any more. API clients often keep no
+  cookies: a client that sent an Authorization header is also pinned by
+  its credentials (what becomes request.auth) in the cache named by
+  DATABASE_REPLICA_STICKY_CACHE, which must be shared by the workers
+  when there are several
+
+With no replicas configured everything stays on 'default'.
+"""
+import contextvars
+import hashlib
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+STICKY_COOKIE = 'db_primary_until'
+
+
+class RoutingState:
+    """What the router knows about the request being served."""
+
+    def __init__(self, use_replicas):
+        self.use_replicas = use_replicas
+        self.wrote = False
+
+
+_current_state = contextvars.ContextVar('replica_routing_state', default=None)
+
+
+def get_replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+def get_sticky_cache():
+    return caches[getattr(settings, 'DATABASE_REPLICA_STICKY_CACHE', 'default')]
+
+
+def get_sticky_seconds():
+    return getattr(settings, 'DATABASE_REPLICA_STICKY_SECONDS', 5)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            # Related rows of an object come from where the object came from.
+            return instance._state.db
+        state = _current_state.get()
+        replicas = get_replicas()
+        if state is None or not state.use_replicas or not replicas:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = _current_state.get()
+        if state is not None:
+            # The rest of the request, and the client's next ones, read what
+            # was just written.
+            state.use_replicas = False
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *get_replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema from 'default'.
+        if db in get_replicas():
+            return False
+        return None
+
+
+class ReplicaMiddleware:
+    """
+    Tells ReplicaRouter whether the current request may read from replicas,
+    and pins clients that wrote to 'default' (see module docstring). Sync
+    and async capable.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        key = self.credentials_key(request)
+        state = self.start(request, key is not None and get_sticky_cache().get(key) is not None)
+        token = _current_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_state.reset(token)
+        if self.finish(request, response, state) and key is not None:
+            get_sticky_cache().set(key, True, get_sticky_seconds())
+        return response
+
+    async def __acall__(self, request):
+        key = self.credentials_key(request)
+        state = self.start(request, key is not None and await get_sticky_cache().aget(key) is not None)
+        token = _current_state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_state.reset(token)
+        if self.finish(request, response, state) and key is not None:
+            await get_sticky_cache().aset(key, True, get_sticky_seconds())
+        return response
+
+    def credentials_key(self, request):
+        """Cache key of the client's Authorization header; None without one, or without replicas."""
+        authorization = request.META.get('HTTP_AUTHORIZATION')
+        if not authorization or not get_replicas():
+            return None
+        return 'replica:pinned:' + hashlib.sha256(authorization.encode()).hexdigest()
+
+    def start(self, request, pinned_credentials):
+        pinned = pinned_credentials or self.is_pinned(request)
+        return RoutingState(request.method in SAFE_METHODS and not pinned)
+
+    def is_pinned(self, request):
+        try:
+            return float(request.COOKIES[STICKY_COOKIE]) > time.time()
+        except (KeyError, ValueError):
+            return False
+
+    def finish(self, request, response, state):
+        """Pins a client that wrote with the cookie. Returns whether it did."""
+        if not get_replicas() or not (state.wrote or request.method not in SAFE_METHODS):
+            return False
+        seconds = get_sticky_seconds()
+        response.set_cookie(
+            STICKY_COOKIE, str(round(time.time() + seconds, 3)), max_age=seconds,
+            httponly=True, samesite='Lax',
+        )
+        return True
@@ -1,7 +1,60 @@
+from django.core.exceptions import FieldDoesNotExist
 from rest_framework import serializers
+from .fastpath import FastListSerializerMixin
 from .models import Book
+from .profiling import ProfiledSerializerMixin
 
-class BookSerializer(serializers.ModelSerializer):
+
+class SparseFieldsMixin:
+    """
+    Lets clients ask for a subset of the fields ('?fields=id,title').
+
+    Unrequested fields are dropped from the serializer, and
+    `get_only_fields()` tells the view which columns it still has to load.
+    """
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
+    @classmethod
+    def get_field_sources(cls):
+        """Maps each field name to the model attribute it reads (built once per class)."""
+        if '_field_sources' not in cls.__dict__:
+            cls._field_sources = {
+                field_name: field.source.split('.')[0] for field_name, field in cls().fields.items()
+            }
+        return cls._field_sources
+
+    @classmethod
+    def get_valid_fields(cls, fields):
+        """Keeps the requested names that are fields of this serializer."""
+        sources = cls.get_field_sources()
+        return [field_name for field_name in fields if field_name in sources]
+
+    @classmethod
+    def get_only_fields(cls, fields):
+        """Returns the model columns backing `fields`, for QuerySet.only()."""
+        model = cls.Meta.model
+        columns = {model._meta.pk.name}
+        for field_name in fields:
+            try:
+                model_field = model._meta.get_field(cls.get_field_sources()[field_name])
+            except (KeyError, FieldDoesNotExist):
+                continue
+            if model_field.concrete and not model_field.many_to_many:
+                columns.add(model_field.name)
+        return columns
+
+
+class BookListSerializer(ProfiledSerializerMixin, FastListSerializerMixin, serializers.ListSerializer):
+    """Lists books through the compiled fast path (api.fastpath) when the fields allow it."""
+
+
+class BookSerializer(ProfiledSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Book
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+        list_serializer_class = BookListSerializer
@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from . import authentication, tokens
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def invalidate_token(sender, instance, **kwargs):
+    # Deleting a token (or rotating it: delete + create) ends its cache entry.
+    authentication.invalidate_write([instance.key])
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_user_tokens(sender, instance, update_fields=None, **kwargs):
+    # The cached user goes stale with the row (is_active, is_staff...).
+    # Logins only touch last_login, which nothing authorizes on.
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    # A changed password (or deactivation) also ends the reuse of recent logins.
+    tokens.forget_login(instance.get_username())
+    authentication.invalidate_write(Token.objects.filter(user=instance).values_list('key', flat=True))
@@ -0,0 +1,103 @@
+from django.contrib.auth import get_user_model
+from rest_framework import exceptions
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from . import authentication
+
+User = get_user_model()
+
+
+class CachedTokenAuthenticationTests(APITestCase):
+    """
+    Test suite for api.authentication.CachedTokenAuthentication: warm
+    requests without queries, and invalidation on token and user changes,
+    in this process and in others sharing the cache.
+    """
+    def setUp(self):
+        authentication.local_cache.clear()
+        authentication.get_shared_cache().clear()
+        self.user = User.objects.create_user(username='reader', password='pw')
+        self.token = Token.objects.create(user=self.user)
+        # Deleting the token clears its primary key: the key.
+        self.key = self.token.key
+        self.auth = authentication.CachedTokenAuthentication()
+
+    def authenticate(self):
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Token {self.key}')
+        return self.auth.authenticate(request)
+
+    def test_warm_request_runs_no_query(self):
+        """Test a cached token authenticates without any query."""
+        with self.assertNumQueries(1):
+            self.authenticate()
+        with self.assertNumQueries(0):
+            user, token = self.authenticate()
+        self.assertEqual(user, self.user)
+        self.assertEqual(token.key, self.key)
+
+    def test_cold_process_uses_shared_cache(self):
+        """Test a process with an empty LRU answers from the shared cache, without a query."""
+        self.authenticate()
+        authentication.local_cache.clear()
+        with self.assertNumQueries(0):
+            user, _ = self.authenticate()
+        self.assertEqual(user, self.user)
+
+    def test_deleted_token(self):
+        """Test deleting a token ends its cache entry."""
+        self.authenticate()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.token.delete()
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authenticate()
+
+    def test_deactivated_user(self):
+        """Test deactivating a user ends the cache entries of their tokens."""
+        self.authenticate()
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authenticate()
+
+    def test_staff_change(self):
+        """Test a changed is_staff is seen by the next request."""
+        user, _ = self.authenticate()
+        self.assertFalse(user.is_staff)
+        self.user.is_staff = True
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        user, _ = self.authenticate()
+        self.assertTrue(user.is_staff)
+
+    def test_invalidation_reaches_other_processes(self):
+        """Test an entry still in another process' LRU is retired by an invalidation made elsewhere."""
+        self.authenticate()
+        other_process = dict(authentication.local_cache.entries)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.token.delete()
+        # The other process never saw the signal: its LRU still has the token.
+        authentication.local_cache.entries.update(other_process)
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authenticate()
+
+    def test_shared_cache_holds_no_credentials(self):
+        """Test the shared cache only gets plain fields of the user, never the password hash."""
+        self.authenticate()
+        entry = authentication.get_shared_cache().get(authentication.shared_key(self.key))['entry']
+        self.assertEqual(
+            set(entry['user']), {'id', 'username', 'is_active', 'is_staff', 'is_superuser'},
+        )
+        self.assertNotIn(self.user.password, repr(entry))
+        # Fields outside the snapshot are still there when read.
+        user, _ = self.authenticate()
+        with self.assertNumQueries(1):
+            self.assertEqual(user.password, self.user.password)
+
+    def test_handed_out_users_are_copies(self):
+        """Test changing the user of one request does not leak into the cache."""
+        user, _ = self.authenticate()
+        user.is_staff = True
+        user, _ = self.authenticate()
+        self.assertFalse(user.is_staff)
@@ -0,0 +1,91 @@
+import json
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from . import authentication, throttling, tokens
+
+User = get_user_model()
+
+
+@override_settings(
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'], API_PROFILING_SAMPLE_RATE=0,
+)
+class ObtainAuthTokenTests(TransactionTestCase):
+    """
+    Test suite for api.views.ObtainAuthTokenView: tokens, errors, and the
+    429 and 503 answered before any hashing. Password checks run on the
+    HasherPool's threads, hence a TransactionTestCase.
+    """
+    def setUp(self):
+        throttling.local_store.clear()
+        authentication.get_shared_cache().clear()
+        self.user = User.objects.create_user(username='reader', password='secret')
+        self.client = APIClient()
+        self.url = reverse('api_token_auth')
+
+    def login(self, password='secret', username='reader'):
+        return self.client.post(self.url, {'username': username, 'password': password}, format='json')
+
+    def test_token(self):
+        """Test valid credentials get the user's token, as DRF formats JSON."""
+        response = self.login()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        token = Token.objects.get(user=self.user)
+        self.assertEqual(response.content, b'{"token":"%s"}' % token.key.encode())
+
+    def test_existing_token_is_reused(self):
+        """Test a user who has a token gets that one back, not a new one."""
+        token = Token.objects.create(user=self.user)
+        response = self.login()
+        self.assertEqual(json.loads(response.content), {'token': token.key})
+        self.assertEqual(Token.objects.count(), 1)
+
+    def test_recent_login_skips_hashing(self):
+        """Test repeating a successful login gets the token back without a password check."""
+        first = self.login()
+        with mock.patch.object(tokens, 'get_hasher_pool') as get_hasher_pool:
+            second = self.login()
+        get_hasher_pool.assert_not_called()
+        self.assertEqual(second.content, first.content)
+
+    def test_bad_credentials(self):
+        """Test a wrong password answers 400 with DRF's error, and no token is created."""
+        response = self.login(password='wrong')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(
+            json.loads(response.content),
+            {'non_field_errors': ['Unable to log in with provided credentials.']},
+        )
+        self.assertFalse(Token.objects.exists())
+
+    def test_malformed_json(self):
+        """Test a body that is not JSON answers 400."""
+        response = self.client.post(self.url, '{', content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('JSON parse error', json.loads(response.content)['detail'])
+
+    def test_empty_bucket_is_429_before_hashing(self):
+        """Test a username out of attempts answers 429 with Retry-After, without a password check."""
+        for _ in range(5):
+            self.assertEqual(self.login(password='wrong').status_code, status.HTTP_400_BAD_REQUEST)
+        with mock.patch.object(tokens, 'get_hasher_pool') as get_hasher_pool:
+            response = self.login()
+        get_hasher_pool.assert_not_called()
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+
+    def test_full_pool_is_503(self):
+        """Test a login arriving when the HasherPool is full answers 503 with Retry-After."""
+        with mock.patch.object(tokens, 'get_hasher_pool', return_value=tokens.HasherPool(1, 0)):
+            response = self.login()
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertFalse(Token.objects.exists())
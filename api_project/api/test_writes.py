@@ -0,0 +1,127 @@
+import threading
+from concurrent.futures import Future
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import OperationalError, connection
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from . import throttling, writes
+from .models import Book
+
+User = get_user_model()
+
+
+def job(func, *args):
+    return (Future(), func, args)
+
+
+class WriteCoalescerTests(TransactionTestCase):
+    """
+    Test suite for api.writes.WriteCoalescer: batches, a failing write
+    inside a batch, a failed commit and the writer's resilience. Batches
+    are committed on the test thread unless the writer is the point.
+    """
+    def setUp(self):
+        self.coalescer = writes.WriteCoalescer(0.001, 64, timeout=5)
+
+    def test_batch_is_one_transaction(self):
+        """Test the writes of a batch share one transaction and all get their result."""
+        batch = [job(lambda title=title: Book.objects.create(title=title, author='A')) for title in 'abc']
+        with CaptureQueriesContext(connection) as captured:
+            self.coalescer.commit(batch)
+        sql = [query['sql'] for query in captured]
+        self.assertEqual(sum(query.startswith('BEGIN') for query in sql), 1)
+        self.assertEqual([future.result(0).title for future, _, _ in batch], ['a', 'b', 'c'])
+        self.assertEqual(Book.objects.count(), 3)
+
+    def test_failing_write_is_rolled_back_alone(self):
+        """Test a write that raises gets its error while the rest of its batch commits."""
+        def broken():
+            Book.objects.create(title='broken', author='A')
+            raise ValueError('invalid')
+
+        batch = [
+            job(lambda: Book.objects.create(title='first', author='A')),
+            job(broken),
+            job(lambda: Book.objects.create(title='kept', author='B')),
+        ]
+        self.coalescer.commit(batch)
+        self.assertEqual(batch[0][0].result(0).title, 'first')
+        with self.assertRaisesMessage(ValueError, 'invalid'):
+            batch[1][0].result(0)
+        self.assertEqual(batch[2][0].result(0).title, 'kept')
+        self.assertEqual(set(Book.objects.values_list('title', flat=True)), {'first', 'kept'})
+
+    def test_failed_commit_fails_the_batch(self):
+        """Test every write of a batch whose commit fails gets the error, and nothing is written."""
+        batch = [job(lambda title=title: Book.objects.create(title=title, author='A')) for title in 'ab']
+        with mock.patch.object(connection, 'commit', side_effect=OperationalError('disk I/O error')):
+            self.coalescer.commit(batch)
+        for future, _, _ in batch:
+            with self.assertRaisesMessage(OperationalError, 'disk I/O error'):
+                future.result(0)
+        self.assertFalse(Book.objects.exists())
+
+    def test_connection_failure_fails_the_batch(self):
+        """Test an error before the transaction (closing stale connections) still resolves the batch."""
+        with mock.patch.object(writes, 'close_old_connections', side_effect=OperationalError('gone')):
+            with self.assertRaisesMessage(OperationalError, 'gone'):
+                self.coalescer.submit(lambda: 'written')
+        self.assertEqual(self.coalescer.submit(lambda: 'written'), 'written')
+
+    def test_writer_survives_failures(self):
+        """Test the writer thread keeps serving after a batch whose commit raised unexpectedly."""
+        with mock.patch.object(self.coalescer, 'commit', side_effect=RuntimeError('bug')):
+            with self.assertRaisesMessage(RuntimeError, 'bug'):
+                self.coalescer.submit(lambda: 'lost')
+        self.assertTrue(self.coalescer.thread.is_alive())
+        self.assertEqual(self.coalescer.submit(lambda: 'written'), 'written')
+
+    def test_dead_writer_is_restarted(self):
+        """Test a writer thread that died is replaced on the next submit."""
+        dead = threading.Thread(target=lambda: None)
+        dead.start()
+        dead.join()
+        self.coalescer.thread = dead
+        self.assertEqual(self.coalescer.submit(lambda: 'written'), 'written')
+        self.assertIsNot(self.coalescer.thread, dead)
+        self.assertEqual(self.coalescer.restarts, 1)
+
+    def test_timeout(self):
+        """Test a write whose batch is not committed in time raises WriteTimeout and is cancelled."""
+        release = threading.Event()
+        self.coalescer.timeout = 0.05
+        with mock.patch.object(self.coalescer, 'commit', side_effect=lambda batch: release.wait()):
+            with self.assertRaises(writes.WriteTimeout):
+                self.coalescer.submit(lambda: 'late')
+        release.set()
+
+
+@override_settings(WRITE_COALESCING=True, API_PROFILING_SAMPLE_RATE=0)
+class CoalescedWritesViewTests(TransactionTestCase):
+    """Test suite for BookViewSet's writes through the WriteCoalescer."""
+    def setUp(self):
+        throttling.local_store.clear()
+        self.admin = User.objects.create_user(username='admin', password='pw', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.url = reverse('books_all-list')
+
+    def test_create(self):
+        """Test a coalesced create is committed and answered as usual."""
+        response = self.client.post(self.url, {'title': 'Emma', 'author': 'Jane Austen'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(Book.objects.filter(title='Emma').exists())
+
+    def test_timeout_is_503(self):
+        """Test a write whose batch is not committed in time answers 503."""
+        coalescer = mock.Mock(submit=mock.Mock(side_effect=writes.WriteTimeout()))
+        with mock.patch.object(writes, 'get_write_coalescer', return_value=coalescer):
+            response = self.client.post(self.url, {'title': 'Emma', 'author': 'Jane Austen'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertFalse(Book.objects.exists())
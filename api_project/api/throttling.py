@@ -0,0 +1,267 @@
+"""
+Rate limiting for the API: DRF throttle classes on top of a counter store.
+
+Each throttle class has a scope, whose rate ('N/period', e.g. '100/min')
+is REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'][scope], and an algorithm:
+- SlidingWindow: counts hits in fixed windows of one period, and weighs the
+  previous window by how much of it still overlaps the sliding window. One
+  atomic increment and one read per request
+- TokenBucket: GCRA, the token bucket kept as a single timestamp (the
+  theoretical arrival time). Bursts of up to N, then N per period. One
+  atomic increment per request
+
+Counters live in the store named by settings.API_THROTTLE_STORE:
+- None: LocalStore, in this process (each worker has its own counters)
+- a cache alias: CacheStore, in that cache (memcached, Redis, a file
+  cache...), shared by every worker on it
+
+Unlike DRF's SimpleRateThrottle, which reads a list of timestamps and
+writes it back, counters are only changed with atomic increments, so
+concurrent requests cannot overwrite each other's hits. Rejected requests
+are not counted.
+
+TokenBucketLimiter is the same token bucket outside of DRF's throttle
+classes, for the token endpoint (api.views.ObtainAuthTokenView).
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """'10/min' -> (10, 60)."""
+    num, period = rate.split('/')
+    return int(num), PERIODS[period[0]]
+
+
+class LocalStore:
+    """Counters in this process: an LRU of key -> (value, expiry) behind a lock."""
+    shared = False
+    max_keys = 100000
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def incr(self, key, delta, timeout):
+        """Adds `delta` to `key` (created at `delta` if missing) and returns the new value."""
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            value = delta if entry is None or entry[1] <= now else entry[0] + delta
+            self.entries[key] = (value, entry[1] if entry and entry[1] > now else now + timeout)
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.max_keys:
+                self.entries.popitem(last=False)
+            return value
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None or entry[1] <= time.monotonic():
+            return None
+        return entry[0]
+
+    def set(self, key, value, timeout):
+        with self.lock:
+            self.entries[key] = (value, time.monotonic() + timeout)
+            self.entries.move_to_end(key)
+
+    def touch(self, key, timeout):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries[key] = (entry[0], time.monotonic() + timeout)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class CacheStore:
+    """Counters in a Django cache, updated with its atomic incr()."""
+    shared = True
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    def incr(self, key, delta, timeout):
+        cache = caches[self.alias]
+        try:
+            return cache.incr(key, delta)
+        except ValueError:
+            if cache.add(key, delta, timeout):
+                return delta
+            # Created by a concurrent request in between.
+            return cache.incr(key, delta)
+
+    def get(self, key):
+        return caches[self.alias].get(key)
+
+    def set(self, key, value, timeout):
+        caches[self.alias].set(key, value, timeout)
+
+    def touch(self, key, timeout):
+        caches[self.alias].touch(key, timeout)
+
+
+local_store = LocalStore()
+
+
+def get_store():
+    alias = getattr(settings, 'API_THROTTLE_STORE', None)
+    return CacheStore(alias) if alias else local_store
+
+
+class SlidingWindow:
+    def __init__(self, num, period):
+        self.num = num
+        self.period = period
+
+    def hit(self, store, key, now):
+        """Counts a hit for `key`. Returns 0 if allowed, else the seconds to wait."""
+        window, elapsed = divmod(now, self.period)
+        window = int(window)
+        previous = store.get(f'{key}:{window - 1}') or 0
+        weight = 1 - elapsed / self.period
+        count = store.incr(f'{key}:{window}', 1, self.period * 2)
+        if previous * weight + count <= self.num:
+            return 0
+        store.incr(f'{key}:{window}', -1, self.period * 2)
+        # The hit fits once the previous window has slid out far enough, or
+        # in the next window.
+        room = self.num - count
+        if previous and room >= 0:
+            return (weight - room / previous) * self.period
+        return self.period - elapsed
+
+
+class TokenBucket:
+    def __init__(self, num, period):
+        self.num = num
+        # Microseconds per token: the store only holds integers.
+        self.interval = max(1, round(period * 1000000 / num))
+        self.burst = self.interval * num
+        self.timeout = period * 2
+
+    def hit(self, store, key, now):
+        """Takes a token for `key`. Returns 0 if allowed, else the seconds to wait."""
+        now = int(now * 1000000)
+        arrival = store.incr(key, self.interval, self.timeout)
+        if arrival - self.interval < now:
+            # The bucket was full (or new): restart it from now. Requests
+            # racing this write can get one token each for free.
+            arrival = now + self.interval
+            store.set(key, arrival, self.timeout)
+        if arrival - now <= self.burst:
+            return 0
+        store.incr(key, -self.interval, self.timeout)
+        # Keep a bucket that is being drained from expiring.
+        store.touch(key, self.timeout)
+        return (arrival - now - self.burst) / 1000000
+
+
+_algorithms = {}
+
+
+def get_algorithm(algorithm_class, rate):
+    key = (algorithm_class, rate)
+    if key not in _algorithms:
+        _algorithms[key] = algorithm_class(*parse_rate(rate))
+    return _algorithms[key]
+
+
+class RateThrottle(BaseThrottle):
+    """
+    Base class of the throttles below (see module docstring). Subclasses set
+    `scope` and `algorithm`, and decide in get_ident_key() which requests
+    they count and under which identity.
+    """
+    scope = None
+    algorithm = SlidingWindow
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def get_ident_key(self, request, view):
+        """The identity a request is counted under, or None to let it through."""
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+        ident = self.get_ident_key(request, view) if rate else None
+        if ident is None:
+            return True
+        algorithm = get_algorithm(self.algorithm, rate)
+        self.wait_seconds = algorithm.hit(get_store(), f'throttle:{self.scope}:{ident}', time.time())
+        return not self.wait_seconds
+
+    async def aallow_request(self, request, view):
+        """allow_request() for async views (api.async_views)."""
+        if get_store().shared:
+            return await sync_to_async(self.allow_request)(request, view)
+        # In-process counters never block.
+        return self.allow_request(request, view)
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class AnonReadThrottle(RateThrottle):
+    """Reads (GET, HEAD, OPTIONS) by anonymous clients, per client address."""
+    scope = 'anon_read'
+
+    def get_ident_key(self, request, view):
+        if request.method not in SAFE_METHODS or request.user.is_authenticated:
+            return None
+        return self.get_ident(request)
+
+
+class UserWriteThrottle(RateThrottle):
+    """Writes by authenticated users, per user. Bursts are fine, floods are not."""
+    scope = 'user_write'
+    algorithm = TokenBucket
+
+    def get_ident_key(self, request, view):
+        if request.method in SAFE_METHODS or not request.user.is_authenticated:
+            return None
+        return request.user.pk
+
+
+class BulkThrottle(RateThrottle):
+    """Every request to a bulk endpoint, per user (or client address)."""
+    scope = 'bulk'
+    algorithm = TokenBucket
+
+    def get_ident_key(self, request, view):
+        if request.user.is_authenticated:
+            return f'user:{request.user.pk}'
+        return self.get_ident(request)
+
+
+class TokenBucketLimiter:
+    """A TokenBucket per identity (an IP address, a username...) of a scope."""
+
+    def __init__(self, scope, rate=None):
+        self.scope = scope
+        self.algorithm = TokenBucket(*parse_rate(rate or api_settings.DEFAULT_THROTTLE_RATES[scope]))
+
+    def take(self, ident):
+        """
+        Takes a token from the bucket of `ident`. Returns 0 when the request
+        may go ahead, or the seconds until a token is available.
+        """
+        return self.algorithm.hit(get_store(), f'throttle:{self.scope}:{ident}', time.time())
+
+    async def atake(self, ident):
+        if get_store().shared:
+            return await sync_to_async(self.take)(ident)
+        return self.take(ident)
@@ -0,0 +1,104 @@
+"""
+Support code of the token endpoint (api.views.ObtainAuthTokenView).
+
+- HasherPool runs the password check (PBKDF2 and the user query) on a small
+  thread pool, so request workers and the event loop never hash
+  themselves. Calls beyond the pool and its queue are refused up front
+  (HasherBusy), so a burst of logins cannot pile up behind it.
+- Recent logins: a caller that logged in successfully gets its token back
+  without hashing again, for settings.TOKEN_LOGIN_REUSE_WINDOW seconds. An
+  entry matches only the same username, password and client address. It
+  stores a keyed digest of them, never the password. The endpoint is an
+  async view, so it reads and writes entries with the cache's async API.
+  Saving the user forgets the entry (api.signals).
+"""
+import asyncio
+import hashlib
+import hmac
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from . import authentication
+
+
+class HasherBusy(Exception):
+    pass
+
+
+class HasherPool:
+    """A bounded thread pool: `workers` threads, at most `max_pending` calls in flight."""
+
+    def __init__(self, workers, max_pending):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='token-login')
+        self.slots = threading.BoundedSemaphore(max_pending)
+
+    async def run(self, func, *args):
+        if not self.slots.acquire(blocking=False):
+            raise HasherBusy()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, self.call, func, *args)
+        finally:
+            self.slots.release()
+
+    def call(self, func, *args):
+        # Pool threads are not request threads: handle their connections here.
+        close_old_connections()
+        try:
+            return func(*args)
+        finally:
+            close_old_connections()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_hasher_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = HasherPool(
+                getattr(settings, 'TOKEN_LOGIN_WORKERS', 2),
+                getattr(settings, 'TOKEN_LOGIN_MAX_PENDING', 8),
+            )
+        return _pool
+
+
+def recent_login_key(username):
+    return 'auth:login:' + hashlib.sha256(username.encode()).hexdigest()
+
+
+def credentials_digest(username, password, ident):
+    message = '\0'.join([username, password, ident or '']).encode()
+    return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+
+async def aget_recent_login(username, password, ident):
+    """Returns the token key of a recent login with these credentials, or None."""
+    cache = authentication.get_shared_cache()
+    if cache is None:
+        return None
+    entry = await cache.aget(recent_login_key(username))
+    if entry is None or not hmac.compare_digest(entry['digest'], credentials_digest(username, password, ident)):
+        return None
+    return entry['token']
+
+
+async def aremember_login(username, password, ident, token_key):
+    cache = authentication.get_shared_cache()
+    if cache is not None:
+        await cache.aset(
+            recent_login_key(username),
+            {'digest': credentials_digest(username, password, ident), 'token': token_key},
+            getattr(settings, 'TOKEN_LOGIN_REUSE_WINDOW', 60),
+        )
+
+
+def forget_login(username):
+    # Sync: called from the post_save handler of the user (api.signals).
+    cache = authentication.get_shared_cache()
+    if cache is not None:
+        cache.delete(recent_login_key(username))
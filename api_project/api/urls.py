@@ -1,12 +1,16 @@
 from django.urls import path, include
 from .views import BookList 
 from rest_framework.routers import DefaultRouter
-from .views import BookViewSet
+from .views import BookViewSet, AsyncBookList, AsyncBookListCreateView, AsyncBookDetailView
 
 router = DefaultRouter()
 router.register(r'books_all', BookViewSet, basename='books_all')
 
 urlpatterns = [
     path('book/', BookList.as_view(), name='books-list'),
+    # Async (ASGI-native) versions of the endpoints above.
+    path('async/book/', AsyncBookList.as_view(), name='async-books-list'),
+    path('async/books_all/', AsyncBookListCreateView.as_view(), name='async-books-all-list'),
+    path('async/books_all/<int:pk>/', AsyncBookDetailView.as_view(), name='async-books-all-detail'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -1,17 +1,39 @@
+import json
+import math
+
+from django.http import HttpResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 from rest_framework import generics
 from .models import Book
 from .serializers import BookSerializer
-from rest_framework import viewsets
+from rest_framework import status, viewsets
+from rest_framework.authtoken.models import Token
+from rest_framework.authtoken.serializers import AuthTokenSerializer
+from rest_framework.exceptions import Throttled
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework.throttling import BaseThrottle
+from . import tokens
+from .async_views import AsyncListAPIView, AsyncListCreateAPIView, AsyncRetrieveUpdateDestroyAPIView
+from .mixins import CoalescedWritesMixin, FastListViewMixin, SparseFieldsViewMixin
+from .renderers import FastJSONRenderer
+from .throttling import TokenBucketLimiter
 
-class BookList(generics.ListAPIView):
+class BookList(SparseFieldsViewMixin, generics.ListAPIView):
+    """
+    API endpoint that lists books. '?fields=id,title' narrows the output
+    and the columns selected.
+    """
     queryset = Book.objects.all()
     serializer_class = BookSerializer
 
-class BookViewSet(viewsets.ModelViewSet):
+class BookViewSet(CoalescedWritesMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
     """
     API endpoint that allows books to be viewed or edited.
     Access is restricted to authenticated and AdminUsers.
+    '?fields=id,title' narrows list and detail responses (and their SELECT).
+    With settings.WRITE_COALESCING, concurrent writes are committed together
+    (see api.writes).
     """
     queryset = Book.objects.all()
     serializer_class = BookSerializer
@@ -20,3 +42,125 @@ class BookViewSet(viewsets.ModelViewSet):
 
 
 
+
+
+class AsyncBookList(FastListViewMixin, SparseFieldsViewMixin, AsyncListAPIView):
+    """
+    Async (ASGI-native) version of BookList at /api/async/book/ (see
+    api.async_views), with the same output.
+    """
+    queryset = Book.objects.all()
+    serializer_class = BookSerializer
+
+
+class AsyncBookListCreateView(FastListViewMixin, SparseFieldsViewMixin, AsyncListCreateAPIView):
+    """
+    Async version of the list and create routes of BookViewSet, at
+    /api/async/books_all/. Same permissions: authenticated admin users only.
+    """
+    queryset = Book.objects.all()
+    serializer_class = BookSerializer
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+
+class AsyncBookDetailView(SparseFieldsViewMixin, AsyncRetrieveUpdateDestroyAPIView):
+    """
+    Async version of the detail routes of BookViewSet, at
+    /api/async/books_all/<pk>/.
+    """
+    queryset = Book.objects.all()
+    serializer_class = BookSerializer
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+
+def json_response(data, status_code=status.HTTP_200_OK):
+    """A JSON response formatted as DRF's: compact, with Content-Type application/json."""
+    return HttpResponse(FastJSONRenderer().render(data), status=status_code, content_type='application/json')
+
+
+class ObtainAuthTokenView(View):
+    """
+    Replacement for DRF's obtain_auth_token: POST 'username' and 'password'
+    (JSON or form data) and get {'token': '...'} back, with the same
+    validation and errors.
+
+    It is async and built to stay out of the way of the other endpoints
+    under credential-stuffing bursts:
+    - a caller repeating a recent successful login gets its token back
+      without hashing (see api.tokens)
+    - token buckets per client address ('login_ip') and per username
+      ('login_username') answer 429 before any hashing
+    - the password check runs on the bounded HasherPool, and 503 when it is
+      full, instead of on the request worker
+    """
+    ip_limiter = None
+    username_limiter = None
+
+    @classmethod
+    def get_limiters(cls):
+        if cls.ip_limiter is None:
+            cls.ip_limiter = TokenBucketLimiter('login_ip')
+            cls.username_limiter = TokenBucketLimiter('login_username')
+        return cls.ip_limiter, cls.username_limiter
+
+    async def post(self, request):
+        try:
+            data = self.get_data(request)
+        except ValueError as exc:
+            return json_response({'detail': f'JSON parse error - {exc}'}, status_code=status.HTTP_400_BAD_REQUEST)
+        username = data.get('username')
+        password = data.get('password')
+        ident = BaseThrottle().get_ident(request)
+
+        if isinstance(username, str) and isinstance(password, str):
+            token = await self.get_recent_token(username, password, ident)
+            if token is not None:
+                return json_response({'token': token.key})
+
+        ip_limiter, username_limiter = self.get_limiters()
+        wait = await ip_limiter.atake(ident)
+        if not wait and isinstance(username, str):
+            wait = await username_limiter.atake(username.lower())
+        if wait:
+            response = json_response({'detail': Throttled(wait).detail}, status_code=status.HTTP_429_TOO_MANY_REQUESTS)
+            response['Retry-After'] = str(math.ceil(wait))
+            return response
+
+        serializer = AuthTokenSerializer(data=data, context={'request': request})
+        try:
+            valid = await tokens.get_hasher_pool().run(serializer.is_valid)
+        except tokens.HasherBusy:
+            response = json_response(
+                {'detail': 'Too many logins in progress, try again shortly.'},
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+            response['Retry-After'] = '1'
+            return response
+        if not valid:
+            return json_response(serializer.errors, status_code=status.HTTP_400_BAD_REQUEST)
+
+        user = serializer.validated_data['user']
+        token, created = await Token.objects.aget_or_create(user=user)
+        await tokens.aremember_login(username, password, ident, token.key)
+        return json_response({'token': token.key})
+
+    def get_data(self, request):
+        if request.content_type == 'application/json':
+            data = json.loads(request.body or b'{}')
+            if not isinstance(data, dict):
+                raise ValueError('Expected an object')
+            return data
+        return request.POST
+
+    async def get_recent_token(self, username, password, ident):
+        token_key = await tokens.aget_recent_login(username, password, ident)
+        if token_key is None:
+            return None
+        token = await Token.objects.select_related('user').filter(key=token_key).afirst()
+        # The token may have been deleted, or the user renamed or deactivated since.
+        if token is None or not token.user.is_active or token.user.get_username() != username:
+            return None
+        return token
+
+
+obtain_auth_token = csrf_exempt(ObtainAuthTokenView.as_view())
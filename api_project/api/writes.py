@@ -0,0 +1,143 @@
+"""
+Write coalescing: concurrent writes committed together by a single writer.
+
+SQLite lets one connection write at a time. When every request commits
+its own transaction, concurrent writers queue on the database lock, and
+those whose transaction already read something fail with "database is
+locked" instead of waiting. With settings.WRITE_COALESCING on, the
+request threads hand their write to the WriteCoalescer instead:
+
+- one writer thread takes the first queued write, waits up to
+  WRITE_COALESCING_WINDOW_MS for more (at most WRITE_COALESCING_MAX_BATCH),
+  and runs them all in one transaction, so the batch costs one lock and
+  one commit (one fsync)
+- each write runs in its own savepoint: one that raises is rolled back
+  alone, and its request gets the exception while the others commit
+- a request waits until its batch is committed, then gets its own result;
+  past WRITE_COALESCING_TIMEOUT seconds it gives up with a 503
+- the writer thread survives failures (a failed commit fails its batch),
+  and is restarted should it die anyway
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connections, transaction
+
+
+class WriteTimeout(Exception):
+    """The batch of a write was not committed within the coalescer's timeout."""
+
+
+class WriteCoalescer:
+    """A writer thread committing queued calls in batches (see module docstring)."""
+
+    def __init__(self, window, max_batch, timeout=None, using=DEFAULT_DB_ALIAS):
+        self.window = window
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self.using = using
+        self.jobs = queue.SimpleQueue()
+        self.thread = None
+        self.thread_lock = threading.Lock()
+        self.restarts = 0
+        self.ensure_writer()
+
+    def ensure_writer(self):
+        """Starts the writer thread, or a new one if the previous one died."""
+        with self.thread_lock:
+            if self.thread is not None and self.thread.is_alive():
+                return
+            if self.thread is not None:
+                self.restarts += 1
+            self.thread = threading.Thread(target=self.run, name='write-coalescer', daemon=True)
+            self.thread.start()
+
+    def submit(self, func, *args):
+        """
+        Runs func(*args) in the next batch and returns its result once
+        committed (or raises its error). Raises WriteTimeout when the batch
+        is not committed within `timeout` seconds; the write is then
+        cancelled, unless it had already started, in which case it may still
+        commit.
+        """
+        if connections[self.using].in_atomic_block:
+            # The caller's own transaction could not see, or would be locked
+            # out by, the writer's: write on its connection.
+            return func(*args)
+        self.ensure_writer()
+        future = Future()
+        self.jobs.put((future, func, args))
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            future.cancel()
+            raise WriteTimeout()
+
+    def run(self):
+        while True:
+            batch = [self.jobs.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(self.jobs.get(timeout=remaining) if remaining > 0 else self.jobs.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.commit(batch)
+            except Exception as exc:
+                # The writer must outlive any failure: fail the batch instead.
+                self.fail(batch, exc)
+
+    def fail(self, batch, exc):
+        for future, func, args in batch:
+            if not future.done():
+                future.set_exception(exc)
+
+    def commit(self, batch):
+        results = []
+        try:
+            # The writer is not a request thread: handle its connection here.
+            close_old_connections()
+            with transaction.atomic(using=self.using):
+                for future, func, args in batch:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    try:
+                        with transaction.atomic(using=self.using):
+                            results.append((future, func(*args), None))
+                    except Exception as exc:
+                        results.append((future, None, exc))
+        except Exception as exc:
+            # The commit itself failed: nothing in the batch was written.
+            self.fail(batch, exc)
+            return
+        finally:
+            close_old_connections()
+        for future, result, exc in results:
+            if exc is None:
+                future.set_result(result)
+            else:
+                future.set_exception(exc)
+
+
+_coalescer = None
+_coalescer_lock = threading.Lock()
+
+
+def get_write_coalescer():
+    """The process' WriteCoalescer, or None when settings.WRITE_COALESCING is off."""
+    global _coalescer
+    if not getattr(settings, 'WRITE_COALESCING', False):
+        return None
+    with _coalescer_lock:
+        if _coalescer is None:
+            _coalescer = WriteCoalescer(
+                getattr(settings, 'WRITE_COALESCING_WINDOW_MS', 2) / 1000,
+                getattr(settings, 'WRITE_COALESCING_MAX_BATCH', 64),
+                getattr(settings, 'WRITE_COALESCING_TIMEOUT', 10),
+            )
+        return _coalescer
@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 
+from api.database import sqlite_database
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -47,15 +49,93 @@ INSTALLED_APPS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication', # Requires token in request header
+        # TokenAuthentication with a token cache in front of its query (see api.authentication).
+        'api.authentication.CachedTokenAuthentication', # Requires token in request header
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated', # Restricts access to authenticated users by default
     ],
+    # JSON goes through orjson when it is installed, with the same output as
+    # DRF's JSONRenderer/JSONParser (see api.renderers and api.parsers).
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    # Rate limits per scope (see api.throttling): anonymous reads per client
+    # address and writes per user. The token endpoint
+    # (api.views.ObtainAuthTokenView) has its own token buckets, checked
+    # before any password hashing: per client address, per username.
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.throttling.AnonReadThrottle',
+        'api.throttling.UserWriteThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'anon_read': '600/min',
+        'user_write': '120/min',
+        'login_ip': '20/min',
+        'login_username': '5/min',
+    },
+}
 
+# Where api.throttling keeps its counters: None for this process only, or
+# the alias of a cache shared by the workers (memcached, Redis, a file
+# cache...) when running several of them.
+API_THROTTLE_STORE = None
+
+# Token cache of api.authentication.CachedTokenAuthentication: each process
+# keeps up to TOKEN_AUTH_CACHE_SIZE tokens, for TOKEN_AUTH_CACHE_TIMEOUT
+# seconds. TOKEN_AUTH_SHARED_CACHE names the cache shared by every process
+# (entries and invalidations); point it at Redis or memcached when running
+# several processes, or set it to None to keep the cache in-process only.
+TOKEN_AUTH_CACHE_SIZE = 10000
+TOKEN_AUTH_CACHE_TIMEOUT = 300
+TOKEN_AUTH_SHARED_CACHE = 'default'
+
+# Token endpoint (api.views.ObtainAuthTokenView): passwords are checked on
+# TOKEN_LOGIN_WORKERS threads, with at most TOKEN_LOGIN_MAX_PENDING checks in
+# flight (more are answered 503). A repeated successful login from the same
+# client gets its token back without hashing for TOKEN_LOGIN_REUSE_WINDOW
+# seconds.
+TOKEN_LOGIN_WORKERS = 2
+TOKEN_LOGIN_MAX_PENDING = 8
+TOKEN_LOGIN_REUSE_WINDOW = 60
+
+# Write coalescing (api.writes): BookViewSet's writes are queued and
+# committed together by one writer thread, in batches of up to
+# WRITE_COALESCING_MAX_BATCH gathered for WRITE_COALESCING_WINDOW_MS after
+# the first. Meant for SQLite, which has a single writer anyway.
+WRITE_COALESCING = False
+WRITE_COALESCING_WINDOW_MS = 2
+WRITE_COALESCING_MAX_BATCH = 64
+# Seconds a request waits for its batch to commit before answering 503.
+WRITE_COALESCING_TIMEOUT = 10
+
+# Share of requests profiled by api.profiling.ProfilingMiddleware (0 = off,
+# 1 = all). Profiled responses get a Server-Timing header and a JSON line on
+# the 'api.profiling' logger.
+API_PROFILING_SAMPLE_RATE = 0.01
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'api.profiling': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
 }
 
 MIDDLEWARE = [
+    # First, so its total covers the rest of the stack.
+    'api.profiling.ProfilingMiddleware',
+    # Read replicas and read-your-writes (api.routers).
+    'api.routers.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -88,13 +168,37 @@ WSGI_APPLICATION = 'api_project.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# SQLite tuned for serving (api.database): mmap, persistent connections...
+# 'read' opens the same file read-only. SQLITE_WAL switches the file
+# to WAL journaling, which persists in the file and adds -wal and -shm files
+# next to it: turn it on where the server runs, not in a checkout.
+SQLITE_WAL = False
+# Seconds a connection is reused for, when served through wsgi.py. Set it to
+# 0 when serving through asgi.py: Django asks for persistent connections to
+# be off under ASGI.
+SQLITE_CONN_MAX_AGE = 600
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    'default': sqlite_database(
+        BASE_DIR / 'db.sqlite3', profile='production', conn_max_age=SQLITE_CONN_MAX_AGE, wal=SQLITE_WAL,
+    ),
+    'read': sqlite_database(
+        BASE_DIR / 'db.sqlite3', profile='production', read_only=True, conn_max_age=SQLITE_CONN_MAX_AGE,
+        wal=SQLITE_WAL,
+    ),
 }
 
+# Reads of safe requests go to one of DATABASE_REPLICAS, writes to
+# 'default' (api.routers). A client that wrote reads from 'default' for
+# DATABASE_REPLICA_STICKY_SECONDS, to outlast the replication lag. List
+# PostgreSQL replicas here in production, or e.g. ['read'] locally.
+DATABASE_ROUTERS = ['api.routers.ReplicaRouter']
+DATABASE_REPLICAS = []
+DATABASE_REPLICA_STICKY_SECONDS = 5
+# Clients sending an Authorization header are also pinned by an entry in
+# this cache, as API clients often drop the cookie: use a shared cache when
+# running several workers.
+DATABASE_REPLICA_STICKY_CACHE = 'default'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -16,8 +16,7 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
-from django.contrib import admin
-from rest_framework.authtoken import obtain_auth_token
+from api.views import obtain_auth_token
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -0,0 +1,9 @@
+"""
+Performance benchmarks for the api_project endpoints.
+
+Each module is a standalone script that sets up Django against the project's
+settings with a throwaway database and prints its measurements. Run them
+from the project directory, e.g.:
+
+    python -m benchmarks.login_flood
+"""
@@ -0,0 +1,147 @@
+"""
+Load test of the token endpoint: GET /api/book/ latency while attackers flood
+the login endpoint with wrong passwords.
+
+Serves the project on a threaded WSGI server in this process and runs, for
+each scenario, reader threads against the book list and attacker threads
+against a login endpoint:
+- idle: no attack, the baseline
+- drf: DRF's obtain_auth_token, which hashes on the request thread
+- pool: api.views.obtain_auth_token with its throttles lifted, so that only
+  the bounded hasher pool stands between the attack and the readers
+- pool+throttle: api.views.obtain_auth_token as configured
+
+    python -m benchmarks.login_flood --attackers 16 --readers 4 --seconds 10
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+from wsgiref.simple_server import make_server
+
+from django.urls import include, path
+
+from .utils import QuietHandler, ThreadingWSGIServer, print_table, request
+
+urlpatterns = []
+
+
+def setup_django(database, workers):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_project.settings')
+    from django.conf import settings
+    settings.DATABASES['default']['NAME'] = database
+    settings.ROOT_URLCONF = __name__
+    settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, '127.0.0.1']
+    settings.API_PROFILING_SAMPLE_RATE = 0
+    settings.TOKEN_LOGIN_WORKERS = workers
+    # One 'Bad Request' / 'Service Unavailable'... log line per attack otherwise.
+    settings.LOGGING['loggers']['django.request'] = {'level': 'CRITICAL'}
+
+    import django
+    django.setup()
+
+    from rest_framework.authtoken.views import obtain_auth_token as drf_obtain_auth_token
+    from api.views import obtain_auth_token
+    urlpatterns[:] = [
+        path('api/', include('api.urls')),
+        path('drf-token-auth/', drf_obtain_auth_token),
+        path('api-token-auth/', obtain_auth_token),
+    ]
+
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0, interactive=False)
+
+
+def run_scenario(base_url, login_path, args, token):
+    stop = threading.Event()
+    latencies = []
+    login_statuses = []
+
+    def reader():
+        while not stop.is_set():
+            status, seconds = request(f'{base_url}/api/book/', headers={'Authorization': f'Token {token}'})
+            assert status == 200, status
+            latencies.append(seconds)
+
+    def attacker(number):
+        attempt = 0
+        while not stop.is_set():
+            attempt += 1
+            credentials = {'username': f'victim{attempt % 50}', 'password': f'guess-{number}-{attempt}'}
+            status, _ = request(f'{base_url}{login_path}', credentials)
+            login_statuses.append(status)
+
+    threads = [threading.Thread(target=reader) for _ in range(args.readers)]
+    if login_path:
+        threads += [threading.Thread(target=attacker, args=(number,)) for number in range(args.attackers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+    return {
+        'reads': len(latencies),
+        'p50': statistics.median(latencies) * 1000,
+        'p95': latencies[int(len(latencies) * 0.95)] * 1000,
+        'max': latencies[-1] * 1000,
+        'logins': len(login_statuses),
+        'statuses': ' '.join(
+            f'{status}:{login_statuses.count(status)}' for status in sorted(set(login_statuses))
+        ),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--attackers', type=int, default=16)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--books', type=int, default=50)
+    parser.add_argument('--workers', type=int, default=2, help='settings.TOKEN_LOGIN_WORKERS')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        setup_django(os.path.join(directory, 'db.sqlite3'), args.workers)
+        from django.contrib.auth.models import User
+        from rest_framework.authtoken.models import Token
+        from api.models import Book
+        from django.core.wsgi import get_wsgi_application
+        from api.throttling import TokenBucketLimiter, local_store
+        from api.views import ObtainAuthTokenView
+
+        user = User.objects.create_user('reader', password='reader-password')
+        token = Token.objects.create(user=user).key
+        Book.objects.bulk_create([Book(title=f'Book {index}', author=f'Author {index}') for index in range(args.books)])
+
+        server = make_server(
+            '127.0.0.1', 0, get_wsgi_application(), server_class=ThreadingWSGIServer, handler_class=QuietHandler,
+        )
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f'http://127.0.0.1:{server.server_port}'
+
+        rows = []
+        for label, login_path in [
+            ('idle', None), ('drf', '/drf-token-auth/'), ('pool', '/api-token-auth/'), ('pool+throttle', '/api-token-auth/'),
+        ]:
+            rate = '1000000/s' if label == 'pool' else None
+            local_store.clear()
+            ObtainAuthTokenView.ip_limiter = TokenBucketLimiter('login_ip', rate)
+            ObtainAuthTokenView.username_limiter = TokenBucketLimiter('login_username', rate)
+            result = run_scenario(base_url, login_path, args, token)
+            rows.append([
+                label, result['reads'], f"{result['p50']:.1f}", f"{result['p95']:.1f}", f"{result['max']:.1f}",
+                result['logins'], result['statuses'],
+            ])
+        server.shutdown()
+
+    print(f'{args.readers} readers of /api/book/, {args.attackers} attackers, {args.seconds:g}s per scenario')
+    print_table(['scenario', 'reads', 'p50 ms', 'p95 ms', 'max ms', 'logins', 'login statuses'], rows)
+
+
+if __name__ == '__main__':
+    main()
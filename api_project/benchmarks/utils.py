@@ -0,0 +1,37 @@
+import json
+import time
+import urllib.error
+import urllib.request
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def request(url, data=None, headers=None, method=None):
+    """Returns (status, seconds) of one request."""
+    body = json.dumps(data).encode() if data is not None else None
+    req = urllib.request.Request(url, body, {'Content-Type': 'application/json', **(headers or {})}, method=method)
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=60) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as exc:
+        exc.read()
+        status = exc.code
+    return status, time.perf_counter() - start
+
+
+def print_table(headers, rows):
+    widths = [max(len(str(value)) for value in column) for column in zip(headers, *rows)]
+    for row in [headers, *rows]:
+        print('  '.join(str(value).rjust(width) for value, width in zip(row, widths)))
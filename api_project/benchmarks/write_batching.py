@@ -0,0 +1,121 @@
+"""
+Load test of BookViewSet's writes: throughput of concurrent clients creating
+and updating books, with each write committed on its own and with write
+coalescing (settings.WRITE_COALESCING, see api.writes).
+
+Serves the project on a threaded WSGI server in this process, against a
+file SQLite database, and runs `--clients` client threads for each
+scenario. Each client alternates POST /api/books_all/ and a PATCH of its
+own book. Rate limits are lifted.
+
+    python -m benchmarks.write_batching --clients 32 --seconds 10
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+from wsgiref.simple_server import make_server
+
+from .utils import QuietHandler, ThreadingWSGIServer, print_table, request
+
+
+def setup_django(database):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_project.settings')
+    from django.conf import settings
+    settings.DATABASES['default']['NAME'] = database
+    settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, '127.0.0.1']
+    settings.API_PROFILING_SAMPLE_RATE = 0
+    settings.REST_FRAMEWORK = {**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_CLASSES': []}
+    # One 'Internal Server Error' log line per locked database otherwise.
+    settings.LOGGING['loggers']['django.request'] = {'level': 'CRITICAL'}
+
+    import django
+    django.setup()
+
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0, interactive=False)
+
+
+def run_scenario(base_url, book_ids, args, token):
+    stop = threading.Event()
+    latencies = []
+    statuses = []
+    headers = {'Authorization': f'Token {token}'}
+
+    def client(number):
+        writes = 0
+        while not stop.is_set():
+            writes += 1
+            data = {'title': f'Book {number}-{writes}', 'author': f'Author {number}'}
+            if writes % 2:
+                status, seconds = request(f'{base_url}/api/books_all/', data, headers)
+            else:
+                status, seconds = request(
+                    f'{base_url}/api/books_all/{book_ids[number]}/', data, headers, method='PATCH',
+                )
+            statuses.append(status)
+            latencies.append(seconds)
+
+    threads = [threading.Thread(target=client, args=(number,)) for number in range(args.clients)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+    return {
+        'writes': sum(1 for status in statuses if status in (200, 201)) / args.seconds,
+        'p50': statistics.median(latencies) * 1000,
+        'p95': latencies[int(len(latencies) * 0.95)] * 1000,
+        'statuses': ' '.join(f'{status}:{statuses.count(status)}' for status in sorted(set(statuses))),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--window-ms', type=float, default=2, help='settings.WRITE_COALESCING_WINDOW_MS')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        setup_django(os.path.join(directory, 'db.sqlite3'))
+        from django.conf import settings
+        from django.contrib.auth.models import User
+        from django.core.wsgi import get_wsgi_application
+        from rest_framework.authtoken.models import Token
+        from api.models import Book
+
+        user = User.objects.create_superuser('admin', password='admin-password')
+        token = Token.objects.create(user=user).key
+        books = Book.objects.bulk_create(
+            [Book(title=f'Book {number}', author=f'Author {number}') for number in range(args.clients)]
+        )
+        book_ids = [book.pk for book in books]
+
+        server = make_server(
+            '127.0.0.1', 0, get_wsgi_application(), server_class=ThreadingWSGIServer, handler_class=QuietHandler,
+        )
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f'http://127.0.0.1:{server.server_port}'
+
+        settings.WRITE_COALESCING_WINDOW_MS = args.window_ms
+        rows = []
+        for label, coalescing in [('per request', False), ('coalesced', True)]:
+            settings.WRITE_COALESCING = coalescing
+            result = run_scenario(base_url, book_ids, args, token)
+            rows.append([
+                label, f"{result['writes']:.0f}", f"{result['p50']:.1f}", f"{result['p95']:.1f}", result['statuses'],
+            ])
+        server.shutdown()
+
+    print(f'{args.clients} clients writing books, {args.seconds:g}s per scenario, {args.window_ms:g} ms window')
+    print_table(['scenario', 'writes/s', 'p50 ms', 'p95 ms', 'statuses'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,9 @@
+"""
+Performance benchmarks for the LibraryProject apps.
+
+Each module is a standalone script that sets up Django against the project's
+settings, migrates a throwaway database, seeds it and prints its measurements.
+Run them from the project directory, e.g.:
+
+    python -m benchmarks.batch_queries --names 1000
+"""
@@ -0,0 +1,74 @@
+"""
+Benchmarks relationship_app.batch_queries against calling the per-name
+query_samples helpers in a loop, for many author and library names.
+
+    python -m benchmarks.batch_queries --names 1000
+"""
+import argparse
+
+
+def seed(names, books_per_name):
+    from relationship_app.models import Author, Book, Librarian, Library
+
+    authors = Author.objects.bulk_create([Author(name=f'Author {index}') for index in range(names)])
+    books = Book.objects.bulk_create(
+        [Book(title=f'Book {index}', author=authors[index % names]) for index in range(names * books_per_name)]
+    )
+    libraries = Library.objects.bulk_create([Library(name=f'Library {index}') for index in range(names)])
+    Through = Library.books.through
+    Through.objects.bulk_create(
+        [
+            Through(library_id=library.id, book_id=book.id)
+            for index, library in enumerate(libraries)
+            for book in books[index * books_per_name:(index + 1) * books_per_name]
+        ]
+    )
+    Librarian.objects.bulk_create(
+        [Librarian(name=f'Librarian {index}', library=library) for index, library in enumerate(libraries)]
+    )
+    return [author.name for author in authors], [library.name for library in libraries]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--names', type=int, default=1000)
+    parser.add_argument('--books-per-name', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    from .utils import count_queries, measure, print_table, setup_django
+    setup_django()
+    from relationship_app import batch_queries, query_samples
+
+    author_names, library_names = seed(args.names, args.books_per_name)
+    cases = [
+        (
+            'books by author', author_names,
+            lambda names: {name: list(query_samples.books_by_author(name)) for name in names},
+            batch_queries.books_by_authors,
+        ),
+        (
+            'books in library', library_names,
+            lambda names: {name: list(query_samples.books_in_library(name)) for name in names},
+            batch_queries.books_in_libraries,
+        ),
+        (
+            'librarian', library_names,
+            lambda names: {name: query_samples.librarian_for_library(name) for name in names},
+            batch_queries.librarians_for_libraries,
+        ),
+    ]
+    rows = []
+    for label, names, per_name, batch in cases:
+        results = []
+        for func in (per_name, batch):
+            timing = measure(lambda: func(names), repeat=args.repeat, warmup=1)
+            results += [count_queries(func, names), f"{timing['median_ms']:.1f}"]
+        rows.append([label, *results])
+
+    print(f'{args.names} names, {args.books_per_name} books each, median ms of {args.repeat} runs')
+    print_table(['query', 'per-name queries', 'per-name ms', 'batch queries', 'batch ms'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmarks permission_required-protected views with ModelBackend and with
+relationship_app.backends.CachedPermissionBackend: queries and time per
+request, for a user holding permissions directly and through groups.
+
+    python -m benchmarks.permissions --groups 3
+"""
+import argparse
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--groups', type=int, default=3, help='groups the user belongs to')
+    parser.add_argument('--permissions', type=int, default=20, help='permissions of each group')
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    from .utils import count_queries, measure, print_table, setup_django
+    setup_django()
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.decorators import permission_required
+    from django.contrib.auth.models import Group, Permission
+    from django.core.cache import cache
+    from django.http import HttpResponse
+    from django.test import RequestFactory, override_settings
+
+    User = get_user_model()
+    user = User.objects.create_user(username='librarian')
+    permissions = list(Permission.objects.order_by('pk'))
+    user.user_permissions.add(*[p for p in permissions if p.codename == 'can_add_book'])
+    for index in range(args.groups):
+        group = Group.objects.create(name=f'Group {index}')
+        group.permissions.add(*permissions[index * args.permissions:(index + 1) * args.permissions])
+        user.groups.add(group)
+
+    view = permission_required(['relationship_app.can_add_book', 'relationship_app.can_change_book'])(
+        lambda request: HttpResponse('ok')
+    )
+    factory = RequestFactory()
+    users = User.objects.filter(pk=user.pk)
+
+    def serve():
+        # As AuthenticationMiddleware does, each request has a user object of its own.
+        request = factory.get('/')
+        request.user = users.get()
+        return view(request)
+
+    def check():
+        request = factory.get('/')
+        request.user = users.get()
+        return count_queries(view, request)
+
+    rows = []
+    for backend in ['django.contrib.auth.backends.ModelBackend', 'relationship_app.backends.CachedPermissionBackend']:
+        with override_settings(AUTHENTICATION_BACKENDS=[backend]):
+            cache.clear()
+            cold = check()
+            timing = measure(serve, repeat=args.repeat)
+            rows.append([backend.rsplit('.', 1)[1], cold, check(), f"{timing['median_ms']:.3f}", f"{timing['p95_ms']:.3f}"])
+
+    print(f'{args.groups} groups of {args.permissions} permissions, {args.repeat} requests')
+    print_table(['backend', 'cold queries', 'warm queries', 'median ms', 'p95 ms'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+An authentication backend caching users' permission sets across requests.
+
+ModelBackend loads a user's permissions, their own and their groups', with
+two joined queries on the first permission check of every request.
+CachedPermissionBackend keeps the set in the default cache, keyed by user
+id and a permissions version, so a warm check runs no query.
+
+relationship_app.signals invalidates the cache:
+- changes to a user's permissions or groups, or to the user (superuser or
+  active status), drop that user's entry
+- changes to a group's permissions, or deleting a group or a permission,
+  bump the version, retiring every entry at once
+Both invalidate now and again when the writing transaction commits. With
+several server processes the cache must be shared between them for an
+invalidation to reach all of them.
+"""
+import uuid
+
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_KEY = 'relationship_app:permissions-version'
+# Entries expire anyway, should an invalidation be missed (QuerySet.update()
+# and raw SQL send no signals).
+TIMEOUT = 3600
+
+
+def permissions_key(user_id):
+    version = cache.get_or_set(VERSION_KEY, lambda: uuid.uuid4().hex, timeout=None)
+    return f'relationship_app:permissions:{version}:{user_id}'
+
+
+def invalidate_user_permissions(*user_ids):
+    """
+    Drops the users' sets: now, and once more when the current transaction
+    commits, so a set a concurrent request cached from the old rows in
+    between is dropped as well.
+    """
+    def invalidate():
+        cache.delete_many([permissions_key(user_id) for user_id in user_ids])
+    invalidate()
+    transaction.on_commit(invalidate)
+
+
+def invalidate_all_permissions():
+    """Retires every set, now and when the current transaction commits."""
+    def invalidate():
+        cache.delete(VERSION_KEY)
+    invalidate()
+    transaction.on_commit(invalidate)
+
+
+class CachedPermissionBackend(ModelBackend):
+    def get_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        if not hasattr(user_obj, '_perm_cache'):
+            key = permissions_key(user_obj.pk)
+            permissions = cache.get(key)
+            if permissions is None:
+                permissions = super().get_all_permissions(user_obj)
+                cache.set(key, sorted(permissions), TIMEOUT)
+            user_obj._perm_cache = set(permissions)
+        return user_obj._perm_cache
@@ -0,0 +1,67 @@
+"""
+Batch versions of the query_samples helpers: each takes any number of
+names and answers for all of them in one joined query, where the
+per-name helpers run two queries per name.
+
+Results are dicts keyed by every name asked for. A name matching nothing
+maps to an empty list, or to None for librarian_for_libraries, rather
+than raising DoesNotExist. Names are not unique: the books of every
+author, or library, sharing a name are listed under it, and
+librarians_for_libraries keeps the librarian of one of the libraries.
+"""
+import sqlite3
+
+from django.db import connections, router
+from django.db.models import F
+from relationship_app.models import Book, Librarian
+
+
+def max_query_params(model):
+    """
+    The most parameters a query may have on the database `model` is read
+    from. Django assumes 999 for every SQLite, the limit before 3.32; later
+    versions allow 32766, read from the connection when the driver exposes it.
+    """
+    connection = connections[router.db_for_read(model)]
+    if connection.vendor == 'sqlite':
+        connection.ensure_connection()
+        if hasattr(connection.connection, 'getlimit'):
+            return connection.connection.getlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER)
+    return connection.features.max_query_params
+
+
+def chunked(names, model):
+    """`names` in lists small enough for one `__in` lookup: all of them, but for very many names."""
+    names = list(dict.fromkeys(names))
+    size = max_query_params(model) or len(names) or 1
+    for start in range(0, len(names), size):
+        yield names[start:start + size]
+
+
+# Query all books by each author
+def books_by_authors(author_names):
+    result = {name: [] for name in author_names}
+    for names in chunked(result, Book):
+        for book in Book.objects.filter(author__name__in=names).select_related('author'):
+            result[book.author.name].append(book)
+    return result
+
+
+# List all books in each library
+def books_in_libraries(library_names):
+    result = {name: [] for name in library_names}
+    for names in chunked(result, Book):
+        # One row per (library, book): a book in two libraries is listed in both.
+        books = Book.objects.filter(library__name__in=names).annotate(library_name=F('library__name'))
+        for book in books:
+            result[book.library_name].append(book)
+    return result
+
+
+# Retrieve the librarian of each library
+def librarians_for_libraries(library_names):
+    result = dict.fromkeys(library_names)
+    for names in chunked(result, Librarian):
+        for librarian in Librarian.objects.filter(library__name__in=names).select_related('library'):
+            result[librarian.library.name] = librarian
+    return result
@@ -0,0 +1,44 @@
+"""
+Recomputes Library.book_count and Author.book_count (relationship_app.counters)
+and reports the rows that were wrong, a chunk of rows at a time so that large
+tables are neither loaded at once nor locked for long.
+
+    python manage.py recount_books
+    python manage.py recount_books --check      # verify only; fails on a mismatch
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F
+
+from relationship_app.counters import author_counts, library_counts
+from relationship_app.models import Author, Library
+
+
+class Command(BaseCommand):
+    help = 'Recomputes and verifies the maintained book counts of libraries and authors.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='rows recounted per transaction')
+        parser.add_argument('--check', action='store_true', help='report wrong counts without fixing them')
+
+    def handle(self, *args, chunk_size, check, **options):
+        wrong = 0
+        for label, model, counts in [('libraries', Library, library_counts), ('authors', Author, author_counts)]:
+            checked = mismatched = 0
+            last_pk = 0
+            while True:
+                pks = list(model.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:chunk_size])
+                if not pks:
+                    break
+                last_pk = pks[-1]
+                with transaction.atomic():
+                    chunk = model.objects.filter(pk__in=pks).annotate(actual=counts())
+                    stale = chunk.exclude(book_count=F('actual'))
+                    mismatched += stale.count()
+                    if not check:
+                        model.objects.filter(pk__in=stale.values('pk')).update(book_count=counts())
+                checked += len(pks)
+            wrong += mismatched
+            self.stdout.write(f"{label}: {checked} checked, {mismatched} {'wrong' if check else 'fixed'}")
+        if check and wrong:
+            raise CommandError(f'{wrong} book counts are wrong: run recount_books without --check.')
@@ -0,0 +1,81 @@
+"""
+Role resolution for the role-gated views (UserProfile.role).
+
+A user's role is loaded at most once per request, and is then kept in the
+session: later requests of the same session resolve it without a query.
+The session copy carries a version token held in the default cache;
+saving or deleting a UserProfile drops the token (relationship_app.signals),
+and again when the transaction commits, so every session of that user
+reloads the role on its next request. With several server processes the
+cache must be shared between them (memcached, Redis...) for a role change
+to reach all of them at once.
+
+role_required() checks any number of roles with a single resolution.
+"""
+import uuid
+from functools import wraps
+
+from django.contrib.auth.decorators import user_passes_test
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+
+ROLE_SESSION_KEY = '_relationship_app_role'
+# The role of users without a UserProfile.
+NO_ROLE = None
+
+
+def version_key(user_id):
+    return f'relationship_app:role-version:{user_id}'
+
+
+def invalidate_role(user_id):
+    """
+    Makes every session of the user reload its role: now, and once more when
+    the current transaction commits, so a session that stored the old role
+    under the new version in between reloads it as well.
+    """
+    def invalidate():
+        cache.delete(version_key(user_id))
+    invalidate()
+    transaction.on_commit(invalidate)
+
+
+def get_role(user, session=None):
+    """
+    The role of `user`, or NO_ROLE. Memoized on the user object, which lives
+    as long as the request, and in `session` when given.
+    """
+    if not user.is_authenticated:
+        return NO_ROLE
+    if hasattr(user, '_role'):
+        return user._role
+    version = cache.get_or_set(version_key(user.pk), lambda: uuid.uuid4().hex, timeout=None)
+    cached = session.get(ROLE_SESSION_KEY) if session is not None else None
+    if cached is not None and cached[:2] == [user.pk, version]:
+        role = cached[2]
+    else:
+        try:
+            role = user.userprofile.role
+        except ObjectDoesNotExist:
+            role = NO_ROLE
+        if session is not None:
+            session[ROLE_SESSION_KEY] = [user.pk, version, role]
+    user._role = role
+    return role
+
+
+def role_required(*roles, login_url=None):
+    """
+    user_passes_test() for users having any of `roles`: the role is resolved
+    once, through the session, however many roles are allowed.
+    """
+    def decorator(view_func):
+        check = user_passes_test(lambda user: get_role(user) in roles, login_url=login_url)(view_func)
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            get_role(request.user, request.session)
+            return check(request, *args, **kwargs)
+        return wrapper
+    return decorator
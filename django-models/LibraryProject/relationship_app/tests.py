@@ -1,3 +1,378 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser, Group, Permission
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from io import StringIO
+
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from . import backends, batch_queries, counters, query_samples, roles
+from .models import Author, Book, Librarian, Library, UserProfile
+
+User = get_user_model()
+
+
+class LibraryViewsQueryTests(TestCase):
+    """
+    Test suite for the book listing views: the number of queries they run
+    must not grow with the number of books.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.small = Library.objects.create(name='Small Library')
+        cls.large = Library.objects.create(name='Large Library')
+        authors = Author.objects.bulk_create([Author(name=f'Author {index}') for index in range(30)])
+        books = Book.objects.bulk_create(
+            [Book(title=f'Book {index}', author=authors[index % 30]) for index in range(150)]
+        )
+        cls.small.books.set(books[:2])
+        cls.large.books.set(books)
+
+    def count_queries(self, url):
+        """The queries run by GET `url`, streamed content included, and the response."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+            content = b''.join(response.streaming_content) if response.streaming else response.content
+        self.assertEqual(response.status_code, 200)
+        return len(queries), content.decode()
+
+    def assertConstantQueries(self, url_name, expected):
+        small, small_content = self.count_queries(reverse(url_name, kwargs={'pk': self.small.pk}))
+        large, large_content = self.count_queries(reverse(url_name, kwargs={'pk': self.large.pk}))
+        self.assertEqual((small, large), (expected, expected))
+        return small_content, large_content
+
+    def test_library_detail(self):
+        """Test the library detail page lists every book and author in two queries."""
+        small, large = self.assertConstantQueries('library_detail', 2)
+        self.assertEqual(small.count('<li>'), 2)
+        self.assertEqual(large.count('<li>'), 150)
+        self.assertIn('Book 149 by Author 29', large)
+
+    def test_library_books_paginated(self):
+        """Test the paginated library books show a page at a time in three queries."""
+        small, large = self.assertConstantQueries('library_books', 3)
+        self.assertEqual(large.count('<li>'), 100)
+        self.assertIn('Page 1 of 2', large)
+        queries, content = self.count_queries(
+            reverse('library_books', kwargs={'pk': self.large.pk}) + '?page=2'
+        )
+        self.assertEqual(queries, 3)
+        self.assertEqual(content.count('<li>'), 50)
+
+    def test_library_books_stream(self):
+        """Test the streamed library books list every book in two queries."""
+        small, large = self.assertConstantQueries('library_books_stream', 2)
+        self.assertIn('<h1>Library: Large Library</h1>', large)
+        self.assertEqual(large.count('<li>'), 150)
+
+    def test_list_books(self):
+        """Test the book list and its streaming variant join the authors in one query."""
+        for url_name in ['list_books', 'list_books_stream']:
+            with self.subTest(url_name=url_name):
+                queries, content = self.count_queries(reverse(url_name))
+                self.assertEqual(queries, 1)
+                self.assertEqual(content.count('<li>'), 150)
+                self.assertIn('Book 0 by Author 0', content)
+
+    def test_missing_library(self):
+        """Test the library views answer 404 for an unknown library."""
+        for url_name in ['library_detail', 'library_books', 'library_books_stream']:
+            with self.subTest(url_name=url_name):
+                self.assertEqual(self.client.get(reverse(url_name, kwargs={'pk': 0})).status_code, 404)
+
+
+class BatchQueriesTests(TestCase):
+    """Test suite for batch_queries: one query for any number of names, and the same answers as query_samples."""
+    @classmethod
+    def setUpTestData(cls):
+        cls.authors = Author.objects.bulk_create([Author(name=f'Author {index}') for index in range(10)])
+        books = Book.objects.bulk_create(
+            [Book(title=f'Book {index}', author=cls.authors[index % 10]) for index in range(50)]
+        )
+        cls.libraries = Library.objects.bulk_create([Library(name=f'Library {index}') for index in range(5)])
+        for index, library in enumerate(cls.libraries):
+            library.books.set(books[index * 10:index * 10 + 20])
+        Librarian.objects.bulk_create(
+            [Librarian(name=f'Librarian {index}', library=library) for index, library in enumerate(cls.libraries[:4])]
+        )
+
+    def test_books_by_authors(self):
+        """Test books_by_authors answers for every author in one query."""
+        names = [author.name for author in self.authors] + ['Nobody']
+        with self.assertNumQueries(1):
+            result = batch_queries.books_by_authors(names)
+        self.assertEqual(list(result), names)
+        for author in self.authors:
+            self.assertCountEqual(result[author.name], query_samples.books_by_author(author.name))
+        self.assertEqual(result['Nobody'], [])
+
+    def test_books_in_libraries(self):
+        """Test books_in_libraries lists books shared by two libraries in both, in one query."""
+        names = [library.name for library in self.libraries]
+        with self.assertNumQueries(1):
+            result = batch_queries.books_in_libraries(names)
+        for name in names:
+            self.assertCountEqual(result[name], query_samples.books_in_library(name))
+        self.assertEqual(len(result['Library 0']), 20)
+
+    def test_librarians_for_libraries(self):
+        """Test librarians_for_libraries maps a library without a librarian to None, in one query."""
+        names = [library.name for library in self.libraries]
+        with self.assertNumQueries(1):
+            result = batch_queries.librarians_for_libraries(names)
+        for name in names[:4]:
+            self.assertEqual(result[name], query_samples.librarian_for_library(name))
+        self.assertIsNone(result['Library 4'])
+
+    def test_parameter_limit(self):
+        """Test names beyond the database's parameter limit are split over several queries."""
+        names = [author.name for author in self.authors]
+        with mock.patch.object(batch_queries, 'max_query_params', return_value=3):
+            with self.assertNumQueries(4):
+                result = batch_queries.books_by_authors(names)
+        self.assertEqual(sum(len(books) for books in result.values()), 50)
+
+
+class RoleResolutionTests(TestCase):
+    """Test suite for roles: role checks query UserProfile once per session, until the role changes."""
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username='admin', password='password123')
+        cls.profile = UserProfile.objects.create(user=cls.admin, role='Admin')
+        cls.librarian = User.objects.create_user(username='librarian', password='password123')
+        UserProfile.objects.create(user=cls.librarian, role='Librarian')
+        cls.visitor = User.objects.create_user(username='visitor', password='password123')
+
+    def get(self, url_name):
+        """The response to GET `url_name`, and the number of UserProfile queries it ran."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse(url_name))
+        return response, sum('relationship_app_userprofile' in query['sql'] for query in queries)
+
+    def test_role_cached_in_session(self):
+        """Test the role is loaded on the first role-gated request only."""
+        self.client.force_login(self.admin)
+        response, profile_queries = self.get('admin_view')
+        self.assertEqual((response.status_code, profile_queries), (200, 1))
+        for url_name in ['admin_view', 'member_view']:
+            response, profile_queries = self.get(url_name)
+            self.assertEqual(profile_queries, 0)
+        self.assertEqual(response.status_code, 302)
+
+    def test_role_change_invalidates_sessions(self):
+        """Test saving or deleting the profile makes the next request reload the role."""
+        self.client.force_login(self.admin)
+        self.get('admin_view')
+        self.profile.role = 'Member'
+        self.profile.save()
+        response, profile_queries = self.get('member_view')
+        self.assertEqual((response.status_code, profile_queries), (200, 1))
+        self.assertEqual(self.get('admin_view')[0].status_code, 302)
+        self.profile.delete()
+        self.assertEqual(self.get('member_view')[0].status_code, 302)
+
+    def test_invalidated_again_on_commit(self):
+        """Test a session that stored the old role while the profile change was uncommitted reloads it."""
+        self.client.force_login(self.admin)
+        self.get('admin_view')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.role = 'Member'
+            self.profile.save()
+            # A concurrent request, still reading the committed row, stores the
+            # old role under the new version.
+            version = cache.get_or_set(roles.version_key(self.admin.pk), 'concurrent', timeout=None)
+            session = self.client.session
+            session[roles.ROLE_SESSION_KEY] = [self.admin.pk, version, 'Admin']
+            session.save()
+        self.assertEqual(self.get('admin_view')[0].status_code, 302)
+
+    def test_multiple_roles(self):
+        """Test role_required() allows any of its roles, resolving the role once."""
+        view = roles.role_required('Admin', 'Librarian')(lambda request: HttpResponse('ok'))
+        session = {}
+        for user, status, cold_queries in [(self.librarian, 200, 1), (self.visitor, 302, 1)]:
+            with self.subTest(user=user.username):
+                for queries in [cold_queries, 0]:
+                    request = RequestFactory().get('/')
+                    # A fresh user object per request, as in AuthenticationMiddleware.
+                    request.user, request.session = User.objects.get(pk=user.pk), session
+                    with self.assertNumQueries(queries):
+                        self.assertEqual(view(request).status_code, status)
+
+    def test_anonymous(self):
+        """Test anonymous users have no role, without a query."""
+        request = RequestFactory().get('/')
+        request.user, request.session = AnonymousUser(), {}
+        with self.assertNumQueries(0):
+            self.assertIsNone(roles.get_role(request.user, request.session))
+        self.assertEqual(self.client.get(reverse('admin_view')).status_code, 302)
+
+
+@override_settings(AUTHENTICATION_BACKENDS=['relationship_app.backends.CachedPermissionBackend'])
+class CachedPermissionBackendTests(TestCase):
+    """Test suite for CachedPermissionBackend: permission checks without queries, until permissions change."""
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='librarian', password='password123')
+        cls.group = Group.objects.create(name='Librarians')
+        cls.add_book = Permission.objects.get(codename='can_add_book')
+        cls.delete_book = Permission.objects.get(codename='can_delete_book')
+
+    def setUp(self):
+        # User ids are reused between tests: start from an empty cache.
+        cache.clear()
+
+    def has_perm(self, perm, queries=None):
+        """user.has_perm(perm) for a fresh user object, as in a new request."""
+        user = User.objects.get(pk=self.user.pk)
+        if queries is None:
+            return user.has_perm(perm)
+        with self.assertNumQueries(queries):
+            return user.has_perm(perm)
+
+    def test_warm_checks_run_no_query(self):
+        """Test only the first request loads the permissions."""
+        self.user.user_permissions.add(self.add_book)
+        self.assertTrue(self.has_perm('relationship_app.can_add_book', queries=2))
+        self.assertTrue(self.has_perm('relationship_app.can_add_book', queries=0))
+        self.assertFalse(self.has_perm('relationship_app.can_delete_book', queries=0))
+
+    def test_user_permission_changes(self):
+        """Test adding and removing permissions, from either side, invalidates the user's set."""
+        self.assertFalse(self.has_perm('relationship_app.can_add_book'))
+        self.user.user_permissions.add(self.add_book)
+        self.assertTrue(self.has_perm('relationship_app.can_add_book'))
+        self.delete_book.user_set.add(self.user)
+        self.assertTrue(self.has_perm('relationship_app.can_delete_book'))
+        self.add_book.user_set.clear()
+        self.assertFalse(self.has_perm('relationship_app.can_add_book'))
+
+    def test_group_changes(self):
+        """Test group membership and group permission changes invalidate the sets."""
+        self.group.permissions.add(self.delete_book)
+        self.assertFalse(self.has_perm('relationship_app.can_delete_book'))
+        self.user.groups.add(self.group)
+        self.assertTrue(self.has_perm('relationship_app.can_delete_book'))
+        self.group.permissions.remove(self.delete_book)
+        self.assertFalse(self.has_perm('relationship_app.can_delete_book'))
+        self.group.permissions.add(self.add_book)
+        self.assertTrue(self.has_perm('relationship_app.can_add_book'))
+        self.group.user_set.remove(self.user)
+        self.assertFalse(self.has_perm('relationship_app.can_add_book'))
+
+    def test_invalidated_again_on_commit(self):
+        """Test a set cached from the old rows while the revoking transaction was open is dropped on commit."""
+        self.user.user_permissions.add(self.add_book)
+        self.assertTrue(self.has_perm('relationship_app.can_add_book'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.user_permissions.remove(self.add_book)
+            # A concurrent request, still reading the committed rows, caches the old set.
+            cache.set(backends.permissions_key(self.user.pk), ['relationship_app.can_add_book'], backends.TIMEOUT)
+        self.assertFalse(self.has_perm('relationship_app.can_add_book'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.group.permissions.add(self.add_book)
+            self.user.groups.add(self.group)
+        self.assertTrue(self.has_perm('relationship_app.can_add_book'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.group.permissions.remove(self.add_book)
+            cache.set(backends.permissions_key(self.user.pk), ['relationship_app.can_add_book'], backends.TIMEOUT)
+        self.assertFalse(self.has_perm('relationship_app.can_add_book'))
+
+    def test_user_status_changes(self):
+        """Test becoming a superuser or inactive takes effect at once, but logging in keeps the cache."""
+        self.assertFalse(self.has_perm('relationship_app.can_add_book'))
+        self.client.force_login(self.user)
+        self.has_perm('relationship_app.can_add_book', queries=0)
+        self.user.is_superuser = True
+        self.user.save()
+        self.assertTrue(self.has_perm('relationship_app.can_add_book'))
+        self.user.is_active = False
+        self.user.save()
+        self.assertFalse(self.has_perm('relationship_app.can_add_book'))
+
+
+class BookCountTests(TestCase):
+    """Test suite for Library.book_count and Author.book_count: kept current by signals and bulk operations."""
+    def setUp(self):
+        self.austen = Author.objects.create(name='Jane Austen')
+        self.eliot = Author.objects.create(name='George Eliot')
+        self.books = [Book.objects.create(title=f'Book {index}', author=self.austen) for index in range(3)]
+        self.library = Library.objects.create(name='Central Library')
+
+    def assertCounts(self, library=None, austen=None, eliot=None):
+        for obj, count in [(self.library, library), (self.austen, austen), (self.eliot, eliot)]:
+            if count is not None:
+                obj.refresh_from_db()
+                self.assertEqual(obj.book_count, count, obj)
+
+    def test_library_books_changes(self):
+        """Test adding, removing and clearing books, from either side, recount the libraries."""
+        self.library.books.add(*self.books)
+        self.assertCounts(library=3)
+        self.library.books.remove(self.books[0], self.books[0])
+        self.assertCounts(library=2)
+        self.books[0].library_set.add(self.library)
+        self.assertCounts(library=3)
+        self.books[1].library_set.clear()
+        self.assertCounts(library=2)
+        self.library.books.clear()
+        self.assertCounts(library=0)
+
+    def test_book_saves_and_deletes(self):
+        """Test creating, moving and deleting books recount their authors and libraries."""
+        self.assertCounts(austen=3, eliot=0)
+        self.library.books.add(*self.books)
+        book = self.books[0]
+        book.author = self.eliot
+        book.save()
+        self.assertCounts(austen=2, eliot=1)
+        book.delete()
+        self.assertCounts(library=2, austen=2, eliot=0)
+        self.austen.delete()
+        self.assertCounts(library=0)
+
+    def test_bulk_operations(self):
+        """Test Book bulk_create(), update() and bulk_update() recount the authors."""
+        Book.objects.bulk_create([Book(title='Middlemarch', author=self.eliot), Book(title='Emma', author=self.austen)])
+        self.assertCounts(austen=4, eliot=1)
+        Book.objects.filter(title='Book 0').update(author=self.eliot)
+        self.assertCounts(austen=3, eliot=2)
+        books = list(Book.objects.filter(author=self.eliot))
+        for book in books:
+            book.author = self.austen
+        Book.objects.bulk_update(books, ['author'])
+        self.assertCounts(austen=5, eliot=0)
+
+    def test_through_bulk_create(self):
+        """Test recount_libraries() after writes that bypass the signals."""
+        Through = Library.books.through
+        Through.objects.bulk_create([Through(library=self.library, book=book) for book in self.books])
+        self.assertCounts(library=0)
+        counters.recount_libraries()
+        self.assertCounts(library=3)
+
+    def test_recount_command(self):
+        """Test recount_books reports and fixes wrong counts, chunk by chunk."""
+        self.library.books.add(*self.books)
+        Library.objects.update(book_count=7)
+        Author.objects.update(book_count=7)
+        out = StringIO()
+        with self.assertRaises(CommandError):
+            call_command('recount_books', check=True, stdout=out)
+        self.assertIn('libraries: 1 checked, 1 wrong', out.getvalue())
+        self.assertCounts(library=7)
+        call_command('recount_books', chunk_size=1, stdout=out)
+        self.assertIn('authors: 2 checked, 2 fixed', out.getvalue())
+        self.assertCounts(library=3, austen=3, eliot=0)
+        call_command('recount_books', check=True, stdout=StringIO())
+
+    def test_dashboard_reads_the_index(self):
+        """Test the largest libraries are answered from the (book_count, name) index alone."""
+        plan = Library.objects.order_by('-book_count').values('name', 'book_count')[:10].explain()
+        self.assertIn('COVERING INDEX library_book_count_idx', plan)
@@ -11,7 +11,10 @@ from .views import add_book, edit_book, delete_book
 
 urlpatterns = [
     path('books/', list_books, name='list_books'),
+    path('books/stream/', views.list_books_stream, name='list_books_stream'),
     path('library/<int:pk>/', LibraryDetailView.as_view(), name='library_detail'),
+    path('library/<int:pk>/books/', views.LibraryBooksView.as_view(), name='library_books'),
+    path('library/<int:pk>/books/stream/', views.library_books_stream, name='library_books_stream'),
     path('register/', views.register, name='register'),
     path('login/', LoginView.as_view(template_name='relationship_app/login.html'), name='login'),
     path('logout/', LogoutView.as_view(template_name='relationship_app/logout.html'), name='logout'),
@@ -0,0 +1,23 @@
+"""
+Load tests of the hot endpoints of every project in this repository.
+
+For each project (see loadtest.projects), in a subprocess of its own:
+seeds a throwaway SQLite database at `--scale` (loadtest.seeders), then
+drives each endpoint
+- in-process, with Django's test client, one request at a time: latency
+  percentiles, SQL queries per request, and the memory allocated at peak
+  while serving one request
+- over HTTP, on a threaded WSGI server in the same process, with
+  `--concurrency` clients: throughput and latency percentiles under load
+
+and records the process' peak RSS. Results are written as JSON, with the
+commit they were measured on, so that two runs can be compared:
+
+    python -m loadtest run --scale 10000 --output results/$(git rev-parse --short HEAD).json
+    python -m loadtest compare results/abc1234.json results/def5678.json
+
+`compare` prints the changes and exits with status 1 when a latency or the
+query count grew, or the throughput dropped, by more than `--threshold`.
+A project that cannot be set up (missing dependency, broken import...) is
+recorded with its error and the others still run.
+"""
@@ -0,0 +1,158 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+
+from . import __doc__ as usage
+from .projects import PROJECTS
+from .runner import REPO_ROOT
+
+# Metrics compared between runs, per mode, and whether higher is better.
+METRICS = {
+    'in_process': {'p50_ms': False, 'p95_ms': False, 'p99_ms': False, 'queries': False},
+    'http': {'p95_ms': False, 'p99_ms': False, 'throughput_rps': True},
+}
+# Seconds a project may take to seed and be measured.
+TIMEOUT = 3600
+
+
+def git(*args):
+    result = subprocess.run(['git', *args], cwd=REPO_ROOT, capture_output=True, text=True)
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def run_project(project, args):
+    """Runs loadtest.runner for `project` in a subprocess; its result, or the error it failed with."""
+    with tempfile.TemporaryDirectory() as directory:
+        output = os.path.join(directory, 'result.json')
+        command = [
+            sys.executable, '-m', 'loadtest.runner', '--project', project.name, '--scale', str(args.scale),
+            '--requests', str(args.requests), '--http-requests', str(args.http_requests),
+            '--concurrency', str(args.concurrency), '--output', output,
+        ]
+        env = {**os.environ, 'PYTHONPATH': os.pathsep.join(filter(None, [REPO_ROOT, os.environ.get('PYTHONPATH')]))}
+        env.pop('DJANGO_SETTINGS_MODULE', None)
+        try:
+            process = subprocess.run(command, cwd=REPO_ROOT, env=env, capture_output=True, text=True, timeout=TIMEOUT)
+        except subprocess.TimeoutExpired:
+            return {'status': 'error', 'error': f'timed out after {TIMEOUT}s'}
+        if process.returncode != 0:
+            return {'status': 'error', 'error': '\n'.join(process.stderr.strip().splitlines()[-5:])}
+        with open(output) as result:
+            return json.load(result)
+
+
+def summary(results):
+    rows = [('project', 'endpoint', 'p50 ms', 'p95 ms', 'p99 ms', 'queries', 'alloc KiB', 'http rps', 'http p95')]
+    for name, result in results['projects'].items():
+        if result['status'] != 'ok':
+            rows.append((name, 'error: ' + result['error'].splitlines()[-1][:60], '', '', '', '', '', '', ''))
+            continue
+        for endpoint, modes in result['endpoints'].items():
+            local, http = modes['in_process'], modes['http']
+            rows.append((
+                name, endpoint, local['p50_ms'], local['p95_ms'], local['p99_ms'], local['queries'],
+                local['peak_alloc_kib'], http['throughput_rps'], http['p95_ms'],
+            ))
+    return rows
+
+
+def print_table(rows):
+    widths = [max(len(str(row[column])) for row in rows) for column in range(len(rows[0]))]
+    for row in rows:
+        print('  '.join(str(value).ljust(width) for value, width in zip(row, widths)).rstrip())
+
+
+def run(args):
+    selected = args.projects.split(',') if args.projects else [project.name for project in PROJECTS]
+    results = {
+        'commit': git('rev-parse', 'HEAD'),
+        'dirty': bool(git('status', '--porcelain', '--untracked-files=no')),
+        'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'options': {
+            'scale': args.scale, 'requests': args.requests, 'http_requests': args.http_requests,
+            'concurrency': args.concurrency,
+        },
+        'projects': {},
+    }
+    for project in PROJECTS:
+        if project.name in selected:
+            print(f'{project.name}...', file=sys.stderr)
+            results['projects'][project.name] = run_project(project, args)
+    with open(args.output, 'w') as output:
+        json.dump(results, output, indent=2)
+    print_table(summary(results))
+
+
+def compare(args):
+    """Prints the metrics that changed by more than the threshold; exits with 1 on regressions."""
+    with open(args.base) as base_file, open(args.head) as head_file:
+        base, head = json.load(base_file), json.load(head_file)
+    if base['options'] != head['options']:
+        print(f"warning: options differ: {base['options']} and {head['options']}", file=sys.stderr)
+
+    rows, regressions = [('project', 'endpoint', 'metric', 'base', 'head', 'change')], 0
+    for name, head_result in head['projects'].items():
+        base_result = base['projects'].get(name)
+        if base_result is None or base_result['status'] != 'ok':
+            continue
+        if head_result['status'] != 'ok':
+            rows.append((name, '', 'status', 'ok', 'error', 'REGRESSION'))
+            regressions += 1
+            continue
+        for endpoint, modes in head_result['endpoints'].items():
+            if endpoint not in base_result['endpoints']:
+                continue
+            for mode, metrics in METRICS.items():
+                for metric, higher_is_better in metrics.items():
+                    before = base_result['endpoints'][endpoint][mode][metric]
+                    after = modes[mode][metric]
+                    if before is None or after is None:
+                        continue
+                    change = (after - before) / before if before else (1.0 if after else 0.0)
+                    if abs(change) <= args.threshold:
+                        continue
+                    worse = change < 0 if higher_is_better else change > 0
+                    regressions += worse
+                    rows.append((
+                        name, endpoint, f'{mode}.{metric}', before, after,
+                        f"{change:+.0%}{' REGRESSION' if worse else ''}",
+                    ))
+    if len(rows) > 1:
+        print_table(rows)
+    print(f'{regressions} regression(s) beyond {args.threshold:.0%}')
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m loadtest', description=usage, formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='load test the projects and write the results as JSON')
+    run_parser.add_argument('--projects', help='comma-separated project names (default: all)')
+    run_parser.add_argument('--scale', type=int, default=1000, help='books or posts seeded per project')
+    run_parser.add_argument('--requests', type=int, default=200, help='sequential in-process requests per endpoint')
+    run_parser.add_argument('--http-requests', type=int, default=500, help='HTTP requests per endpoint')
+    run_parser.add_argument('--concurrency', type=int, default=8, help='concurrent HTTP clients')
+    run_parser.add_argument('--output', required=True)
+
+    compare_parser = commands.add_parser('compare', help='compare two results; exit with 1 on regressions')
+    compare_parser.add_argument('base')
+    compare_parser.add_argument('head')
+    compare_parser.add_argument('--threshold', type=float, default=0.10, help='relative change tolerated (0.10)')
+
+    args = parser.parse_args(argv)
+    if args.command == 'run':
+        return run(args)
+    return compare(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""Measurements of one endpoint: in-process (test client) and over HTTP."""
+import math
+import statistics
+import threading
+import time
+import tracemalloc
+import urllib.error
+import urllib.request
+from collections import Counter
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+WARMUP = 3
+# Requests whose allocations are traced (tracemalloc slows them down, so
+# they are not part of the latencies).
+TRACED_REQUESTS = 5
+
+
+def percentiles(seconds):
+    """p50/p95/p99 (nearest rank) and mean of latencies, in milliseconds."""
+    if not seconds:
+        return {'p50_ms': None, 'p95_ms': None, 'p99_ms': None, 'mean_ms': None}
+    ordered = sorted(seconds)
+
+    def rank(fraction):
+        return round(ordered[min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1)] * 1000, 3)
+
+    return {
+        'p50_ms': rank(0.50), 'p95_ms': rank(0.95), 'p99_ms': rank(0.99),
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 3),
+    }
+
+
+def get(client, path):
+    """GET through the test client, body read to its last byte. Returns (response, size)."""
+    response = client.get(path)
+    if response.streaming:
+        return response, sum(map(len, response.streaming_content))
+    return response, len(response.content)
+
+
+def in_process(client, path, requests):
+    """Sequential requests through the test client: latency, queries, size and peak allocation."""
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    for _ in range(WARMUP):
+        get(client, path)
+    latencies, queries, statuses = [], [], Counter()
+    size = 0
+    for _ in range(requests):
+        # A streaming response runs its queries and renders while its body
+        # is read: the read is part of the request.
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            response, size = get(client, path)
+            latencies.append(time.perf_counter() - start)
+        queries.append(len(captured))
+        statuses[response.status_code] += 1
+
+    peaks = []
+    for _ in range(TRACED_REQUESTS):
+        tracemalloc.start()
+        try:
+            get(client, path)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+        finally:
+            tracemalloc.stop()
+
+    return {
+        'requests': requests,
+        'statuses': {str(status): count for status, count in sorted(statuses.items())},
+        **percentiles(latencies),
+        'queries': statistics.median(queries),
+        'queries_max': max(queries),
+        'response_bytes': size,
+        'peak_alloc_kib': round(statistics.median(peaks) / 1024, 1),
+    }
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def serve(application):
+    """Starts `application` on a threaded WSGI server on a free port. Returns (server, base URL)."""
+    server = make_server(
+        '127.0.0.1', 0, application, server_class=ThreadingWSGIServer, handler_class=QuietHandler,
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+
+def fetch(url, headers):
+    """GET `url`, body read to its last byte. Returns the status."""
+    request = urllib.request.Request(url, headers=headers)
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as exc:
+        exc.read()
+        return exc.code
+
+
+def over_http(base_url, path, headers, requests, concurrency):
+    """`requests` GETs from `concurrency` client threads: throughput and latency under load."""
+    for _ in range(WARMUP):
+        fetch(base_url + path, headers)
+    remaining = iter(range(requests))
+    lock = threading.Lock()
+    latencies, statuses = [], Counter()
+
+    def client():
+        while True:
+            with lock:
+                if next(remaining, None) is None:
+                    return
+            # Up to the last byte of the body: fetch() reads all of it.
+            start = time.perf_counter()
+            try:
+                status = fetch(base_url + path, headers)
+            except OSError:
+                status = 0
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                statuses[status] += 1
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return {
+        'requests': requests,
+        'concurrency': concurrency,
+        'statuses': {str(status): count for status, count in sorted(statuses.items())},
+        'throughput_rps': round(requests / elapsed, 1),
+        **percentiles(latencies),
+    }
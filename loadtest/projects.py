@@ -0,0 +1,97 @@
+"""
+The projects and endpoints load tested by loadtest.
+
+Endpoint paths are formatted with the values the project's seeder returns
+({book_id}, {library_id}...). `auth` is how the client identifies itself:
+None, 'token' (a DRF token of a regular user), 'admin-token' (of a
+superuser), or 'admin-session' (a logged in superuser, e.g. for the admin).
+"""
+from dataclasses import dataclass, field
+
+
+@dataclass
+class Endpoint:
+    name: str
+    path: str
+    auth: str = None
+
+
+@dataclass
+class Project:
+    name: str
+    # Directory of manage.py, from the repository root.
+    directory: str
+    settings: str
+    seeder: str
+    endpoints: list = field(default_factory=list)
+
+
+PROJECTS = [
+    Project(
+        'advanced-api-project', 'advanced-api-project', 'advanced_api_project.settings', 'api_books',
+        [
+            Endpoint('book-list', '/api/books/'),
+            Endpoint('book-list-100', '/api/books/?page_size=100'),
+            Endpoint('book-list-expand', '/api/books/?page_size=100&expand=author'),
+            Endpoint('book-list-fields', '/api/books/?page_size=100&fields=id,title'),
+            Endpoint('book-search', '/api/books/?search={word}'),
+            Endpoint('book-filter-order', '/api/books/?publication_year={year}&ordering=-title'),
+            Endpoint('book-detail', '/api/books/{book_id}/'),
+            Endpoint('async-book-list', '/api/async/books/?page_size=100'),
+            Endpoint('author-list', '/api/authors/'),
+            Endpoint('author-detail', '/api/authors/{author_id}/?expand=books'),
+        ],
+    ),
+    Project(
+        'api_project', 'api_project', 'api_project.settings', 'api_project_books',
+        [
+            Endpoint('book-list', '/api/book/', 'token'),
+            Endpoint('book-list-fields', '/api/book/?fields=id,title', 'token'),
+            Endpoint('books-all', '/api/books_all/', 'admin-token'),
+            Endpoint('book-detail', '/api/books_all/{book_id}/', 'admin-token'),
+            Endpoint('async-book-list', '/api/async/book/', 'token'),
+        ],
+    ),
+    Project(
+        'django-models', 'django-models/LibraryProject', 'LibraryProject.settings', 'libraries',
+        [
+            Endpoint('list-books', '/relationship/books/'),
+            Endpoint('library-detail', '/relationship/library/{library_id}/'),
+            Endpoint('library-books', '/relationship/library/{library_id}/books/'),
+            Endpoint('library-books-stream', '/relationship/library/{library_id}/books/stream/'),
+            Endpoint('admin-books', '/admin/bookshelf/book/', 'admin-session'),
+        ],
+    ),
+    Project(
+        'advanced_features_and_security', 'advanced_features_and_security/LibraryProject', 'LibraryProject.settings',
+        'libraries',
+        [
+            Endpoint('list-books', '/relationship/books/'),
+            Endpoint('library-detail', '/relationship/library/{library_id}/'),
+            Endpoint('library-books', '/relationship/library/{library_id}/books/'),
+            Endpoint('library-books-stream', '/relationship/library/{library_id}/books/stream/'),
+            Endpoint('admin-books', '/admin/bookshelf/book/', 'admin-session'),
+        ],
+    ),
+    Project(
+        'Introduction_to_Django', 'Introduction_to_Django/LibraryProject', 'LibraryProject.settings', 'bookshelf',
+        [
+            Endpoint('admin-books', '/admin/bookshelf/book/', 'admin-session'),
+            Endpoint('admin-books-search', '/admin/bookshelf/book/?q={word}', 'admin-session'),
+        ],
+    ),
+    Project(
+        'django_blog', 'django_blog', 'django_blog.settings', 'blog',
+        [
+            Endpoint('admin-posts', '/admin/blog/post/', 'admin-session'),
+            Endpoint('profile', '/profile/', 'admin-session'),
+        ],
+    ),
+]
+
+
+def get_project(name):
+    for project in PROJECTS:
+        if project.name == name:
+            return project
+    raise KeyError(name)
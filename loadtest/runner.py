@@ -0,0 +1,121 @@
+"""
+Load tests one project, in the current process: `python -m loadtest` runs
+it once per project, since each project is a Django site of its own.
+
+    python -m loadtest.runner --project advanced-api-project --output result.json
+"""
+import argparse
+import json
+import logging
+import os
+import resource
+import sys
+import tempfile
+import time
+
+from .measure import in_process, over_http, serve
+from .projects import get_project
+from .seeders import SEEDERS
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def configure(database):
+    """
+    Points the project at a throwaway SQLite database, and turns off what would skew
+    or block the measurements: throttling (every request comes from one
+    client), profiling samples, DEBUG's query log and HTTPS redirects.
+    """
+    from django.conf import settings
+
+    default = settings.DATABASES['default']
+    if default['ENGINE'] != 'django.db.backends.sqlite3':
+        # Projects configured for a server database are measured on SQLite too.
+        default = {'ENGINE': 'django.db.backends.sqlite3'}
+    settings.DATABASES = {'default': {**default, 'NAME': database, 'TEST': {}}}
+    settings.DATABASE_REPLICAS = []
+    settings.DEBUG = False
+    settings.ALLOWED_HOSTS = ['*']
+    settings.SECURE_SSL_REDIRECT = False
+    settings.SESSION_COOKIE_SECURE = False
+    settings.CSRF_COOKIE_SECURE = False
+    settings.API_PROFILING_SAMPLE_RATE = 0
+    settings.REST_FRAMEWORK = {**getattr(settings, 'REST_FRAMEWORK', {}), 'DEFAULT_THROTTLE_CLASSES': []}
+
+
+def authenticate(auth, context):
+    """A test client and the HTTP headers identifying the client as `auth` (see loadtest.projects)."""
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.test import Client
+
+    if auth is None:
+        return Client(), {}
+    if auth in ('token', 'admin-token'):
+        header = f"Token {context['token' if auth == 'token' else 'admin_token']}"
+        return Client(HTTP_AUTHORIZATION=header), {'Authorization': header}
+    client = Client()
+    client.force_login(get_user_model().objects.get(username='admin'))
+    session = client.cookies[settings.SESSION_COOKIE_NAME].value
+    return client, {'Cookie': f'{settings.SESSION_COOKIE_NAME}={session}'}
+
+
+def run(project, scale, requests, http_requests, concurrency):
+    sys.path.insert(0, os.path.join(REPO_ROOT, project.directory))
+    os.environ['DJANGO_SETTINGS_MODULE'] = project.settings
+    import django
+    from django.core.management import call_command
+    from django.core.wsgi import get_wsgi_application
+
+    with tempfile.TemporaryDirectory() as directory:
+        configure(os.path.join(directory, 'db.sqlite3'))
+        django.setup()
+        for name in ('django.request', 'django.server'):
+            logging.getLogger(name).setLevel(logging.CRITICAL)
+        call_command('migrate', verbosity=0, interactive=False)
+
+        start = time.perf_counter()
+        context = SEEDERS[project.seeder](scale)
+        seed_seconds = time.perf_counter() - start
+
+        server, base_url = serve(get_wsgi_application())
+        endpoints = {}
+        try:
+            for endpoint in project.endpoints:
+                path = endpoint.path.format(**context)
+                client, headers = authenticate(endpoint.auth, context)
+                endpoints[endpoint.name] = {
+                    'path': path,
+                    'in_process': in_process(client, path, requests),
+                    'http': over_http(base_url, path, headers, http_requests, concurrency),
+                }
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    return {
+        'status': 'ok',
+        'seed_seconds': round(seed_seconds, 2),
+        'endpoints': endpoints,
+        # Kilobytes on Linux.
+        'max_rss_mib': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--project', required=True)
+    parser.add_argument('--scale', type=int, default=1000)
+    parser.add_argument('--requests', type=int, default=200, help='sequential in-process requests per endpoint')
+    parser.add_argument('--http-requests', type=int, default=500, help='HTTP requests per endpoint')
+    parser.add_argument('--concurrency', type=int, default=8, help='concurrent HTTP clients')
+    parser.add_argument('--output', required=True)
+    args = parser.parse_args(argv)
+
+    result = run(get_project(args.project), args.scale, args.requests, args.http_requests, args.concurrency)
+    with open(args.output, 'w') as output:
+        json.dump(result, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
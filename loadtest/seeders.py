@@ -0,0 +1,188 @@
+"""
+Seeders of loadtest: each fills a project's freshly migrated database at a
+given scale (about `scale` books or posts) and returns the values its
+endpoint paths are formatted with.
+
+Titles and names are drawn from small word lists, deterministically, so
+that searches and filters match a realistic share of the rows and two runs
+at the same scale seed the same data.
+"""
+import random
+
+WORDS = (
+    'abbey age air autumn bell bird blood bridge castle city cloud crown dark dawn '
+    'desert dream earth east empire evening fire flower forest garden ghost glass gold '
+    'harbour heart hill home house island journey king lady lake light lion love '
+    'moon mountain night north ocean orchard palace queen rain river road rose sea '
+    'secret shadow ship silence silver sky snow song spring star stone storm summer '
+    'sun tide tower town tree valley voice war water west wind winter wolf world'
+).split()
+FIRST_NAMES = 'Ada Bram Charlotte Daniel Edith Frances George Henry Iris Jane Kurt Leo Mary Nora Oscar'.split()
+LAST_NAMES = 'Austen Bronte Collins Dickens Eliot Forster Gaskell Hardy Irving James Kipling Lawrence'.split()
+BATCH_SIZE = 5000
+
+
+def title(rng):
+    return ' '.join(rng.choice(WORDS).title() for _ in range(rng.randint(1, 4)))
+
+
+def person(rng, index):
+    return f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {index}'
+
+
+def create_users():
+    """A regular user and a superuser, for the endpoints that need them."""
+    from django.contrib.auth import get_user_model
+
+    User = get_user_model()
+    user = User.objects.create_user(username='reader', password='reader-password')
+    admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='admin-password')
+    return user, admin
+
+
+def api_books(scale, seed=0):
+    """advanced-api-project: api.Author and api.Book, ten books per author."""
+    from api.models import Author, Book
+
+    rng = random.Random(seed)
+    Author.objects.bulk_create(
+        [Author(name=person(rng, index)) for index in range(max(1, scale // 10))], batch_size=BATCH_SIZE,
+    )
+    author_ids = list(Author.objects.values_list('id', flat=True))
+    for start in range(0, scale, BATCH_SIZE):
+        Book.objects.bulk_create(
+            [
+                Book(title=title(rng), publication_year=1800 + index % 225, author_id=author_ids[index % len(author_ids)])
+                for index in range(start, min(start + BATCH_SIZE, scale))
+            ],
+            batch_size=BATCH_SIZE,
+        )
+    create_users()
+    return {
+        'book_id': Book.objects.order_by('id').values_list('id', flat=True)[scale // 2],
+        'author_id': author_ids[len(author_ids) // 2],
+        'word': 'river',
+        'year': 1900,
+    }
+
+
+def api_project_books(scale, seed=0):
+    """api_project: api.Book, and tokens for a user and an admin."""
+    from rest_framework.authtoken.models import Token
+    from api.models import Book
+
+    rng = random.Random(seed)
+    for start in range(0, scale, BATCH_SIZE):
+        Book.objects.bulk_create(
+            [Book(title=title(rng), author=person(rng, index)) for index in range(start, min(start + BATCH_SIZE, scale))],
+            batch_size=BATCH_SIZE,
+        )
+    user, admin = create_users()
+    return {
+        'book_id': Book.objects.order_by('id').values_list('id', flat=True)[scale // 2],
+        'token': Token.objects.create(user=user).key,
+        'admin_token': Token.objects.create(user=admin).key,
+    }
+
+
+def bookshelf_books(scale, rng):
+    from bookshelf.models import Book
+
+    for start in range(0, scale, BATCH_SIZE):
+        Book.objects.bulk_create(
+            [
+                Book(title=title(rng), author=person(rng, index), publication_year=1800 + index % 225)
+                for index in range(start, min(start + BATCH_SIZE, scale))
+            ],
+            batch_size=BATCH_SIZE,
+        )
+
+
+def bookshelf(scale, seed=0):
+    """Introduction_to_Django: bookshelf.Book."""
+    bookshelf_books(scale, random.Random(seed))
+    create_users()
+    return {'word': 'river'}
+
+
+def libraries(scale, seed=0):
+    """
+    LibraryProjects: relationship_app Author/Book/Library/Librarian (a
+    hundred books per library, each book in two libraries) and bookshelf.Book.
+    """
+    from relationship_app.counters import recount_libraries
+    from relationship_app.models import Author, Book, Librarian, Library
+
+    rng = random.Random(seed)
+    Author.objects.bulk_create(
+        [Author(name=person(rng, index)) for index in range(max(1, scale // 10))], batch_size=BATCH_SIZE,
+    )
+    author_ids = list(Author.objects.values_list('id', flat=True))
+    for start in range(0, scale, BATCH_SIZE):
+        Book.objects.bulk_create(
+            [
+                Book(title=title(rng), author_id=author_ids[index % len(author_ids)])
+                for index in range(start, min(start + BATCH_SIZE, scale))
+            ],
+            batch_size=BATCH_SIZE,
+        )
+    book_ids = list(Book.objects.values_list('id', flat=True))
+    Library.objects.bulk_create(
+        [Library(name=f'{rng.choice(WORDS).title()} Library {index}') for index in range(max(1, scale // 50))],
+        batch_size=BATCH_SIZE,
+    )
+    library_ids = list(Library.objects.values_list('id', flat=True))
+    Librarian.objects.bulk_create(
+        [Librarian(name=person(rng, index), library_id=library_id) for index, library_id in enumerate(library_ids)],
+        batch_size=BATCH_SIZE,
+    )
+    Through = Library.books.through
+    per_library = min(100, len(book_ids))
+    Through.objects.bulk_create(
+        [
+            Through(library_id=library_id, book_id=book_id)
+            for index, library_id in enumerate(library_ids)
+            for book_id in book_ids[index * per_library // 2:][:per_library]
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    # Bulk created through rows send no m2m_changed: count the books.
+    recount_libraries()
+    bookshelf_books(scale, rng)
+    create_users()
+    return {'library_id': library_ids[len(library_ids) // 2]}
+
+
+def blog(scale, seed=0):
+    """django_blog: blog.Post, fifty per author."""
+    from django.contrib.auth import get_user_model
+    from blog.models import Post
+
+    rng = random.Random(seed)
+    User = get_user_model()
+    User.objects.bulk_create(
+        [User(username=f'writer{index}') for index in range(max(1, scale // 50))], batch_size=BATCH_SIZE,
+    )
+    author_ids = list(User.objects.values_list('id', flat=True))
+    for start in range(0, scale, BATCH_SIZE):
+        Post.objects.bulk_create(
+            [
+                Post(
+                    title=title(rng), content=' '.join(rng.choice(WORDS) for _ in range(200)),
+                    author_id=author_ids[index % len(author_ids)],
+                )
+                for index in range(start, min(start + BATCH_SIZE, scale))
+            ],
+            batch_size=BATCH_SIZE,
+        )
+    create_users()
+    return {}
+
+
+SEEDERS = {
+    'api_books': api_books,
+    'api_project_books': api_project_books,
+    'bookshelf': bookshelf,
+    'libraries': libraries,
+    'blog': blog,
+}